@@ -0,0 +1,146 @@
+import asyncio
+import json
+import os
+import statistics
+import time
+from collections import defaultdict, deque
+from typing import Dict, List
+
+from models.agents import ActivityProfile, MistralAgentParams
+from logger import get_logger
+
+logger = get_logger(__name__)
+
+MIN_SAMPLES = 20
+WINDOW = 1000
+# start_to_close is set to the p99 latency times this margin, within these bounds.
+P99_MARGIN = 1.5
+MIN_START_TO_CLOSE_SECONDS = 5.
+MAX_START_TO_CLOSE_SECONDS = 600.
+# Leave room for this many attempts within schedule_to_close.
+ATTEMPTS_BUDGET = 4
+
+
+# Latencies are buffered and appended in batches: every FLUSH_EVERY calls or FLUSH_INTERVAL_SECONDS.
+FLUSH_EVERY = 50
+FLUSH_INTERVAL_SECONDS = 60.
+# Past this size, the log is compacted to the last WINDOW latencies per agent.
+MAX_LOG_BYTES = 1_000_000
+
+
+class LatencyLog:
+    """Latencies of one JSONL log, buffered in memory until a batch is due."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._pending: List[str] = []
+        self._flushed_at = time.monotonic()
+
+    def add(self, agent: str, seconds: float) -> List[str]:
+        """Buffer one latency; returns the batch to write when one is due, an empty list otherwise."""
+        self._pending.append(json.dumps({"agent": agent, "seconds": round(seconds, 3)}) + "\n")
+        if len(self._pending) < FLUSH_EVERY and time.monotonic() - self._flushed_at < FLUSH_INTERVAL_SECONDS:
+            return []
+        return self.take()
+
+    def take(self) -> List[str]:
+        lines, self._pending = self._pending, []
+        self._flushed_at = time.monotonic()
+        return lines
+
+    def write(self, lines: List[str]):
+        if not lines:
+            return
+        # One append per batch: appends are atomic with O_APPEND, so several workers can share the file.
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write("".join(lines))
+        if os.path.getsize(self.path) > MAX_LOG_BYTES:
+            compact_latencies(self.path)
+
+
+_logs: Dict[str, LatencyLog] = {}
+
+
+async def record_latency(path: str, agent: str, seconds: float):
+    """Record one successful call latency for load_latencies; batches are written from a thread."""
+    log = _logs.setdefault(path, LatencyLog(path))
+    lines = log.add(agent, seconds)
+    if lines:
+        await asyncio.to_thread(log.write, lines)
+
+
+def flush_latencies():
+    """Write the latencies still buffered, e.g. when the worker stops."""
+    for log in _logs.values():
+        log.write(log.take())
+
+
+def compact_latencies(path: str):
+    """
+    Rewrite the log with only the last WINDOW latencies per agent, so that it stays bounded.
+
+    Latencies appended by another worker while the log is rewritten are lost, which only
+    shrinks the sample.
+    """
+    latencies = load_latencies(path)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        for agent, values in latencies.items():
+            f.writelines(json.dumps({"agent": agent, "seconds": seconds}) + "\n" for seconds in values)
+    os.replace(tmp_path, path)
+
+
+def load_latencies(path: str) -> Dict[str, List[float]]:
+    """The last WINDOW recorded latencies per agent."""
+    latencies = defaultdict(lambda: deque(maxlen=WINDOW))
+    if not os.path.exists(path):
+        return {}
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+                latencies[record["agent"]].append(float(record["seconds"]))
+            except (ValueError, KeyError):
+                continue
+    return {agent: list(values) for agent, values in latencies.items()}
+
+
+def derive_profile(latencies: List[float], base: ActivityProfile) -> ActivityProfile:
+    """
+    Derive an agent's activity profile from its recorded latencies.
+
+    Args:
+        latencies: Latencies of successful calls, in seconds
+        base: Static profile, returned unchanged when there are fewer than MIN_SAMPLES latencies
+
+    Returns:
+        A profile whose start_to_close follows the p99 latency and whose schedule_to_close
+        leaves room for ATTEMPTS_BUDGET attempts
+    """
+    if len(latencies) < MIN_SAMPLES:
+        return base
+    p99 = statistics.quantiles(latencies, n=100, method="inclusive")[98]
+    start_to_close = min(max(p99 * P99_MARGIN, MIN_START_TO_CLOSE_SECONDS), MAX_START_TO_CLOSE_SECONDS)
+    backoff = sum(
+        min(base.initial_interval_seconds * base.backoff_coefficient ** attempt, base.maximum_interval_seconds)
+        for attempt in range(ATTEMPTS_BUDGET - 1)
+    )
+    return base.model_copy(update={
+        "start_to_close_seconds": round(start_to_close, 1),
+        "schedule_to_close_seconds": round(start_to_close * ATTEMPTS_BUDGET + backoff, 1),
+    })
+
+
+def apply_latency_profiles(
+        agents_params: Dict[str, MistralAgentParams],
+        path: str,
+) -> Dict[str, MistralAgentParams]:
+    """Replace each agent's static activity profile with one derived from the latency log."""
+    latencies = load_latencies(path)
+    updated = {}
+    for key, params in agents_params.items():
+        profile = derive_profile(latencies.get(key, []), params.activity_profile)
+        if profile != params.activity_profile:
+            logger.info(f"Adaptive activity profile for {key}: {profile}")
+        updated[key] = params.model_copy(update={"activity_profile": profile})
+    return updated
@@ -1,7 +1,12 @@
 from config import settings
-from models.agents import MistralAgentParams
+from models.agents import ActivityProfile, MistralAgentParams
+from agents.activity_profiles import apply_latency_profiles
+from agents.model_router import model_for
 
-MODEL = "mistral-medium-2505"
+# Summarising search results is simple enough for the small tier; see agents/model_router.py
+# for the fallback on rate limits and the escalation on invalid output.
+MODEL = model_for("medium")
+SMALL_MODEL = model_for("small")
 financials_mcp_url = settings.financials_mcp_url
 prices_mcp_url = settings.prices_mcp_url
 
@@ -14,10 +19,11 @@ AGENTS_PARAMS = {
         prompt_name="planner_prompt",
         response_format="FinancialSearchPlan",
         temperature=0.3,
+        activity_profile=ActivityProfile(start_to_close_seconds=30, schedule_to_close_seconds=150),
     ),
 
     "SEARCH": MistralAgentParams(
-        model=MODEL,
+        model=SMALL_MODEL,
         name="FinancialSearchAgent",
         description="Agent to perform web searches",
         mcp_server_url=financials_mcp_url,
@@ -25,6 +31,8 @@ AGENTS_PARAMS = {
         response_format="AnalysisSummary",
         temperature=0.1,
         tools=[{"type": "web_search"}],
+        activity_profile=ActivityProfile(start_to_close_seconds=45, schedule_to_close_seconds=240),
+        cache_ttl_seconds=6 * 3600,
     ),
 
     "FUNDAMENTALS": MistralAgentParams(
@@ -34,6 +42,7 @@ AGENTS_PARAMS = {
         mcp_server_url=financials_mcp_url,
         prompt_name="financials_prompt",
         response_format="AnalysisSummary",
+        activity_profile=ActivityProfile(start_to_close_seconds=45, schedule_to_close_seconds=240),
     ),
 
     "RISK": MistralAgentParams(
@@ -44,6 +53,7 @@ AGENTS_PARAMS = {
         prompt_name="risk_prompt",
         response_format="AnalysisSummary",
         temperature=0.1,
+        activity_profile=ActivityProfile(start_to_close_seconds=45, schedule_to_close_seconds=240),
     ),
 
     "VERIFIER": MistralAgentParams(
@@ -53,6 +63,7 @@ AGENTS_PARAMS = {
         mcp_server_url=financials_mcp_url,
         prompt_name="verifier_prompt",
         response_format="VerificationResult",
+        activity_profile=ActivityProfile(start_to_close_seconds=45, schedule_to_close_seconds=240),
     ),
 
     "WRITER": MistralAgentParams(
@@ -63,10 +74,12 @@ AGENTS_PARAMS = {
         prompt_name="writer_prompt",
         response_format="FinancialReportData",
         temperature=0.,
+        activity_profile=ActivityProfile(start_to_close_seconds=120, schedule_to_close_seconds=600),
+        cache_ttl_seconds=3600,
     ),
 
     "ANALYST": MistralAgentParams(
-        model="mistral-medium-latest",
+        model=MODEL,
         name="price-analyst-agent",
         description="Analyzes stock prices using real-time data",
         mcp_server_url=prices_mcp_url,
@@ -74,5 +87,10 @@ AGENTS_PARAMS = {
         temperature=0.7,
         max_tokens=1000,
         response_format="AnalysisSummary",
+        activity_profile=ActivityProfile(start_to_close_seconds=90, schedule_to_close_seconds=450),
     ),
 }
+
+# Optionally derive timeouts from the latencies recorded by the workers (see agents/activity_profiles.py).
+if settings.adaptive_activity_profiles and settings.agent_latency_log:
+    AGENTS_PARAMS = apply_latency_profiles(AGENTS_PARAMS, settings.agent_latency_log)
@@ -1,52 +1,58 @@
-from typing import Any
+import time
+from collections import defaultdict
+from functools import cache
+from typing import Any, AsyncIterator, Callable, Dict, List, Tuple, TYPE_CHECKING
 
-from mcp.client.sse import sse_client
-from mcp import ClientSession
-from mistralai import Mistral, MessageOutputEntry, Agent
-from mistralai.extra.run.context import RunContext
-from mistralai.extra.mcp.sse import MCPClientSSE, SSEServerParams
-import logfire
+from pydantic import ValidationError
 
 from models.agents import MistralAgentParams, AgentCreationModel, AgentRunInputModel
+from models.ledger import AgentRunResult, AgentUsage
 from models.structured_output import get_mistral_response_format, RESPONSE_FORMAT_REGISTRY
+from agents.telemetry import GenAIEvent
+from agents.model_router import estimate_cost, route
+from agents.cache import cache_key, get_conversation_cache
 
 from config import settings
 from logger import get_logger
+from observability import get_logfire
+from metrics import CACHE_TOKENS_SAVED, CONVERSATION_RESUMES, record_cache_lookup, record_llm_call
+
+if TYPE_CHECKING:
+    from mistralai import Mistral, Agent, MessageOutputEntry
 
 logger = get_logger(__name__)
 
-try:
-    logfire.configure(
-        token=settings.logfire_token,
-        service_name="mistral-mcp-temporal",
-    )
-    logfire = logfire.with_settings(custom_scope_suffix='mistral_agents')
-except Exception as e:
-    logger.warning(e)
+# Receives progress details of a conversation as keyword arguments, see `tasks.utils.heartbeat.Progress.update`.
+ProgressCallback = Callable[..., None]
+
+# The Mistral and MCP SDKs are imported inside the functions that use them so that importing
+# this module (and the worker that registers its activities) stays cheap.
 
 async def get_prompt(server_url: str, prompt_name: str) -> str:
-    async with sse_client(server_url) as (read_stream, write_stream):
-        async with ClientSession(read_stream, write_stream) as session:
-            await session.initialize()
+    from agents.mcp_transport import mcp_session
 
-            logger.info(f"Connected to MCP server: {server_url}")
+    async with mcp_session(server_url) as session:
+        logger.info(f"Connected to MCP server: {server_url}")
 
-            prompts = await session.list_prompts()
+        prompts = await session.list_prompts()
 
-            available_prompts = [prompt.name for prompt in prompts.prompts]
+        available_prompts = [prompt.name for prompt in prompts.prompts]
 
-            logger.info("Available prompts: %s", available_prompts)
+        logger.info("Available prompts: %s", available_prompts)
 
-            if prompt_name not in available_prompts:
-                raise ValueError(f"Prompt {prompt_name} is not available in server '{server_url}'")
+        if prompt_name not in available_prompts:
+            raise ValueError(f"Prompt {prompt_name} is not available in server '{server_url}'")
 
-            prompt = await session.get_prompt(prompt_name)
+        prompt = await session.get_prompt(prompt_name)
 
-            prompt = prompt.messages[0].content.text
+        prompt = prompt.messages[0].content.text
 
-            return prompt
+        return prompt
+
+@cache
+def get_client() -> "Mistral":
+    from mistralai import Mistral
 
-def get_client() -> Mistral:
     try:
         return Mistral(api_key=settings.mistral_api_key)
     except Exception as e:
@@ -79,18 +85,139 @@ async def create_agent_async(params: MistralAgentParams) -> AgentCreationModel:
 
     return AgentCreationModel(id=agent.id)
 
-async def get_agent_async(params: AgentCreationModel) -> Agent:
+async def get_agent_async(params: AgentCreationModel) -> "Agent":
     client = get_client()
     agent = await client.beta.agents.get_async(agent_id=params.id)
     return agent
 
-async def start_conversation_async(params: AgentRunInputModel) -> Any:
+def _agent_config(agent: "Agent", model: str) -> Dict[str, Any]:
+    """Conversation arguments running the agent's instructions, tools and completion args on `model`, without using the agent itself."""
+    return dict(
+        model=model,
+        instructions=agent.instructions,
+        tools=agent.tools,
+        completion_args=agent.completion_args,
+    )
+
+def _agent_fingerprint(agent: "Agent") -> Dict[str, Any]:
+    """Everything about an agent that determines its output, but not its id (agents are created per workflow)."""
+    return dict(
+        model=agent.model,
+        instructions=agent.instructions,
+        tools=[tool.model_dump(mode="json") for tool in agent.tools or []],
+        completion_args=agent.completion_args.model_dump(mode="json") if agent.completion_args else None,
+    )
+
+def _noop_progress(**details: Any):
+    pass
+
+def _agent_usage(usage: Dict[str, Any], started: float, cached: bool = False) -> AgentUsage:
+    """Usage of an agent call from the tokens it paid for (none when cached) and the time since `started`."""
+    model = usage.get("model")
+    input_tokens, output_tokens = (0, 0) if cached else (usage.get("input_tokens", 0), usage.get("output_tokens", 0))
+    return AgentUsage(
+        model=model,
+        input_tokens=input_tokens,
+        output_tokens=output_tokens,
+        cost_usd=estimate_cost(model, input_tokens, output_tokens),
+        seconds=round(time.perf_counter() - started, 3),
+        cached=cached,
+    )
+
+def _resumed_usage(usage: Dict[str, Any], model: str):
+    """Usage of an output reused from the previous attempt's conversation: its model, no tokens paid."""
+    usage.setdefault("model", model)
+    usage.setdefault("input_tokens", 0)
+    usage.setdefault("output_tokens", 0)
+
+def _message_text(entry: "MessageOutputEntry") -> str:
+    from mistralai.extra.run.result import as_text
+
+    return as_text(entry)
+
+def _validated_output(entry: "MessageOutputEntry", response_format: str) -> Any | None:
+    try:
+        return RESPONSE_FORMAT_REGISTRY[response_format].model_validate_json(_message_text(entry))
+    except ValidationError:
+        return None
+
+async def _conversation_entries(conversation_id: str) -> List[Any]:
+    """Entries of a stored conversation, empty when it cannot be read."""
+    from mistralai import SDKError
+
+    try:
+        history = await get_client().beta.conversations.get_history_async(conversation_id=conversation_id)
+    except SDKError as e:
+        logger.warning(f"Cannot read conversation {conversation_id} to resume it: {e}")
+        return []
+    return list(history.entries)
+
+async def _consume_stream(stream: AsyncIterator[Any], on_progress: ProgressCallback) -> Tuple[str | None, List[Any], Any]:
+    """
+    Read a conversation event stream, reporting the conversation id as soon as the server assigns it.
+
+    Returns:
+        The conversation id, the output entries and the token usage of the response.
+    """
+    from mistralai import MessageOutputEvent, ResponseDoneEvent, ResponseErrorEvent, ResponseStartedEvent
+    from mistralai.extra.run.result import reconstitue_entries
+
+    conversation_id, usage = None, None
+    received: Dict[int, List[Any]] = defaultdict(list)
+    output_chars = 0
+    async for event in stream:
+        data = event.data
+        if isinstance(data, ResponseStartedEvent):
+            conversation_id = data.conversation_id
+            on_progress(conversation_id=conversation_id)
+        elif isinstance(data, ResponseDoneEvent):
+            usage = data.usage
+        elif isinstance(data, ResponseErrorEvent):
+            raise RuntimeError(f"Conversation {conversation_id} failed: {data.message} (code {data.code})")
+        elif isinstance(data, MessageOutputEvent) and isinstance(data.content, str):
+            output_chars += len(data.content)
+            on_progress(output_chars=output_chars)
+        output_index = getattr(data, "output_index", None)
+        if output_index is not None:
+            received[output_index].append(data)
+    return conversation_id, reconstitue_entries(received), usage
+
+async def start_conversation_async(
+        params: AgentRunInputModel,
+        resume_from: str | None = None,
+        on_progress: ProgressCallback = _noop_progress,
+) -> AgentRunResult:
+    """
+    Run one turn of an agent conversation and validate its output against the response format.
+
+    The response is streamed so the conversation id is known (and reported through
+    `on_progress`) before generation ends. Given the conversation of a previous attempt,
+    its output is reused when the server finished generating it. The tokens returned with the
+    output are those paid for by this call, including a re-run on another model.
+
+    Args:
+        params: Agent, inputs and response format
+        resume_from: Conversation started by the previous attempt of the activity
+        on_progress: Called with progress details (`conversation_id`, `output_chars`)
+    """
+    from mistralai import MessageOutputEntry
+
     client = get_client()
-    with logfire.span(
+    started = time.perf_counter()
+    with get_logfire("mistral_agents").span(
             "Mistral Agents trace: Agent workflow",
             agent_id=params.id,
             _tags=["LLM"],
     ) as span:
+        event = GenAIEvent(
+            "Responses API",
+            {
+                'gen_ai.system': 'mistral',
+                'gen_ai.agent.id': params.id,
+                'gen_ai.input.messages': params.inputs,
+                'gen_ai.output.type': params.response_format,
+            },
+        )
         try:
             try:
                 agent = await get_agent_async(AgentCreationModel(id=params.id))
@@ -98,51 +225,154 @@ async def start_conversation_async(params: AgentRunInputModel) -> Any:
                 logger.error(f"Failed to fetch agent metadata: {e}")
                 raise
 
-            response = await client.beta.conversations.start_async(
-                agent_id=params.id,
-                inputs=params.inputs,
-            )
+            usage = {}
+
+            async def resume() -> Any | None:
+                entries = await _conversation_entries(resume_from)
+                if entries and isinstance(entries[-1], MessageOutputEntry):
+                    output = _validated_output(entries[-1], params.response_format)
+                    if output is not None:
+                        CONVERSATION_RESUMES.labels(operation="start_conversation", outcome="completed").inc()
+                        logger.info(f"Reused the output of conversation {resume_from} from the previous attempt")
+                        # This attempt did not pay for the output.
+                        _resumed_usage(usage, entries[-1].model)
+                        event.update(**{'gen_ai.conversation.id': resume_from, 'gen_ai.conversation.resumed': True})
+                        return output
+                CONVERSATION_RESUMES.labels(operation="start_conversation", outcome="restarted").inc()
+                return None
+
+            async def start(model: str | None) -> Any:
+                target = dict(agent_id=params.id) if model is None else _agent_config(agent, model)
+                call_started = time.perf_counter()
+                stream = await client.beta.conversations.start_stream_async(
+                    inputs=params.inputs,
+                    **target,
+                )
+                conversation_id, entries, response_usage = await _consume_stream(stream, on_progress)
+                elapsed = time.perf_counter() - call_started
+
+                outputs = [entry for entry in entries if isinstance(entry, MessageOutputEntry)]
+                if not outputs:
+                    raise ValueError(f"Conversation {conversation_id} ended without an output message")
+                model = outputs[-1].model
+                usage.update(
+                    model=model,
+                    input_tokens=usage.get("input_tokens", 0) + response_usage.prompt_tokens,
+                    output_tokens=usage.get("output_tokens", 0) + response_usage.completion_tokens,
+                )
+                record_llm_call(
+                    agent=agent.name,
+                    model=model,
+                    operation="start_conversation",
+                    seconds=elapsed,
+                    input_tokens=response_usage.prompt_tokens,
+                    output_tokens=response_usage.completion_tokens,
+                    cost=estimate_cost(model, response_usage.prompt_tokens, response_usage.completion_tokens),
+                )
+                event.update(
+                    f"Responses API with {model}",
+                    **{
+                        'gen_ai.agent.description': agent.description,
+                        'gen_ai.agent.name': agent.name,
+                        'gen_ai.system_instructions': agent.instructions,
+                        'gen_ai.request.model': agent.model,
+                        'gen_ai.response.model': model,
+                        'gen_ai.usage.input_tokens': response_usage.prompt_tokens,
+                        'gen_ai.usage.output_tokens': response_usage.completion_tokens,
+                        'gen_ai.conversation.id': conversation_id,
+                        'gen_ai.output.messages': entries,
+                    }
+                )
 
-            outputs = []
-            for output in response.outputs:
-                if isinstance(output, MessageOutputEntry):
-                    outputs.append(output)
-
-            model = outputs[-1].model
-            logfire.info(
-                f"Responses API with {model}",
-                **{
-                    'gen_ai.system': 'mistral',
-                    'gen_ai.agent.id': params.id,
-                    'gen_ai.agent.description': agent.description,
-                    'gen_ai.agent.name': agent.name,
-                    'gen_ai.system_instructions': agent.instructions,
-                    'gen_ai.response.model': model,
-                    'gen_ai.usage.input_tokens': response.usage.prompt_tokens,
-                    'gen_ai.usage.output_tokens': response.usage.completion_tokens,
-                    'gen_ai.conversation.id': response.conversation_id,
-                    'gen_ai.input.messages': params.inputs,
-                    'gen_ai.output.messages': response.outputs,
-                    'gen_ai.output.type': params.response_format
-                }
-            )
+                model_class = RESPONSE_FORMAT_REGISTRY[params.response_format]
+                return model_class.model_validate_json(_message_text(outputs[-1]))
+
+            async def call() -> Any:
+                if resume_from:
+                    output = await resume()
+                    if output is not None:
+                        return output
+                return await route(agent, start)
+
+            if not (settings.conversation_cache_enabled and params.cache_ttl_seconds):
+                output = await call()
+                return AgentRunResult(output=output, usage=_agent_usage(usage, started))
+
+            async def compute() -> Dict[str, Any]:
+                output = await call()
+                return {"output": output.model_dump(mode="json"), **usage}
+
+            key = cache_key(_agent_fingerprint(agent), params.response_format, params.inputs)
+            cached, hit = await get_conversation_cache().get_or_compute(key, params.cache_ttl_seconds, compute)
+            record_cache_lookup("conversation", hit)
+            event.update(**{'gen_ai.cache.hit': hit})
+            if hit:
+                # Entries cached from a reused output before they carried token counts have none.
+                CACHE_TOKENS_SAVED.labels(agent=agent.name, model=cached["model"], direction="input").inc(cached.get("input_tokens", 0))
+                CACHE_TOKENS_SAVED.labels(agent=agent.name, model=cached["model"], direction="output").inc(cached.get("output_tokens", 0))
 
-            response = outputs[-1].content
             model_class = RESPONSE_FORMAT_REGISTRY[params.response_format]
-            response = model_class.model_validate_json(response)
-            return response
+            return AgentRunResult(
+                output=model_class.model_validate(cached["output"]),
+                usage=_agent_usage(cached, started, cached=hit),
+            )
 
         except Exception as e:
             span.record_exception(e)
+            event.fail(e)
             raise
+        finally:
+            event.emit()
+
+def _pending_function_calls(entries: List[Any]) -> List[Any]:
+    """Function calls at the end of a conversation that no function result answers yet."""
+    from mistralai import FunctionCallEntry
+
+    pending = []
+    for entry in reversed(entries):
+        if not isinstance(entry, FunctionCallEntry):
+            break
+        pending.append(entry)
+    return pending[::-1]
+
+async def run_async(
+        params: AgentRunInputModel,
+        resume_from: str | None = None,
+        on_progress: ProgressCallback = _noop_progress,
+) -> AgentRunResult:
+    """
+    Run an agent conversation, executing the MCP tool calls it makes until it answers.
+
+    Given the conversation of a previous attempt, its output is reused when the server finished
+    generating it, and tool calls it left unanswered are executed and appended to it, so the
+    tool rounds already done are not paid for again.
+
+    Args:
+        params: Agent, inputs, response format and MCP server
+        resume_from: Conversation started by the previous attempt of the activity
+        on_progress: Called with progress details (`conversation_id`, `tool_results`)
+    """
+    from mistralai import MessageOutputEntry, ResponseDoneEvent, ResponseStartedEvent
+    from mistralai.extra.run.context import RunContext
+    from mistralai.extra.run.result import FunctionResultEvent, RunResult
+    from agents.mcp_transport import mcp_client
 
-async def run_async(params: AgentRunInputModel) -> Any:
     client = get_client()
-    with logfire.span(
+    started = time.perf_counter()
+    with get_logfire("mistral_agents").span(
             "Mistral Agents trace: Agent workflow",
             agent_id=params.id,
             _tags=["LLM"],
     ) as span:
+        event = GenAIEvent(
+            "Responses API",
+            {
+                'gen_ai.system': 'mistral',
+                'gen_ai.agent.id': params.id,
+                'gen_ai.input.messages': params.inputs,
+                'gen_ai.output.type': params.response_format,
+            },
+        )
         try:
             try:
                 agent = await get_agent_async(AgentCreationModel(id=params.id))
@@ -150,51 +380,119 @@ async def run_async(params: AgentRunInputModel) -> Any:
                 logger.error(f"Failed to fetch agent metadata: {e}")
                 raise
 
-            async with RunContext(
-                agent_id=agent.id,
-                continue_on_fn_error=False,
-            ) as run_ctx:
-                mcp_client = MCPClientSSE(SSEServerParams(url=params.mcp_server_url))
-                print("MCP Server URL")
-                print(params.mcp_server_url)
-                await run_ctx.register_mcp_clients(mcp_clients=[mcp_client])
-
-                response = await client.beta.conversations.run_async(
-                    inputs=params.inputs,
-                    run_ctx=run_ctx,
-                )
+            usage = {}
+
+            async def execute(run_ctx: RunContext, inputs: Any, operation: str, target: Dict[str, Any]) -> Any:
+                """Run the conversation in `run_ctx`, whose MCP clients the caller has registered."""
+                call_started = time.perf_counter()
+                response, tool_results, input_tokens, output_tokens = None, 0, 0, 0
+                stream = await client.beta.conversations.run_stream_async(inputs=inputs, run_ctx=run_ctx, **target)
+                async for item in stream:
+                    if isinstance(item, RunResult):
+                        response = item
+                    elif isinstance(item.data, ResponseStartedEvent):
+                        on_progress(conversation_id=item.data.conversation_id)
+                    elif isinstance(item.data, ResponseDoneEvent):
+                        # One response per round of tool calls.
+                        input_tokens += item.data.usage.prompt_tokens or 0
+                        output_tokens += item.data.usage.completion_tokens or 0
+                    elif isinstance(item.data, FunctionResultEvent):
+                        tool_results += 1
+                        on_progress(tool_results=tool_results)
+                elapsed = time.perf_counter() - call_started
 
                 result = None
-                for output in response.output_entries:
+                for output in reversed(response.output_entries):
                     if isinstance(output, MessageOutputEntry):
                         result = output
                         break
 
                 if not result:
-                    logger.error("Failed to find output message")
-                    raise
+                    raise ValueError(f"Conversation {response.conversation_id} ended without an output message")
 
                 model = result.model
-                logfire.info(
+                usage.update(
+                    model=model,
+                    input_tokens=usage.get("input_tokens", 0) + input_tokens,
+                    output_tokens=usage.get("output_tokens", 0) + output_tokens,
+                )
+                record_llm_call(
+                    agent=agent.name,
+                    model=model,
+                    operation=operation,
+                    seconds=elapsed,
+                    input_tokens=input_tokens,
+                    output_tokens=output_tokens,
+                    cost=estimate_cost(model, input_tokens, output_tokens),
+                )
+                event.update(
                     f"Responses API with {model}",
                     **{
-                        'gen_ai.system': 'mistral',
-                        'gen_ai.agent.id': params.id,
                         'gen_ai.agent.description': agent.description,
                         'gen_ai.agent.name': agent.name,
                         'gen_ai.system_instructions': agent.instructions,
+                        'gen_ai.request.model': agent.model,
                         'gen_ai.response.model': model,
+                        'gen_ai.usage.input_tokens': input_tokens,
+                        'gen_ai.usage.output_tokens': output_tokens,
                         'gen_ai.conversation.id': response.conversation_id,
-                        'gen_ai.input.messages': params.inputs,
                         'gen_ai.output.messages': response.output_entries,
-                        'gen_ai.output.type': params.response_format
                     }
                 )
 
                 model_class = RESPONSE_FORMAT_REGISTRY[params.response_format]
-                response = model_class.model_validate_json(result.content)
-                return response
+                return model_class.model_validate_json(_message_text(result))
+
+            async def resume() -> Any | None:
+                entries = await _conversation_entries(resume_from)
+                if entries and isinstance(entries[-1], MessageOutputEntry):
+                    output = _validated_output(entries[-1], params.response_format)
+                    if output is not None:
+                        CONVERSATION_RESUMES.labels(operation="run", outcome="completed").inc()
+                        _resumed_usage(usage, entries[-1].model)
+                        logger.info(f"Reused the output of conversation {resume_from} from the previous attempt")
+                        event.update(**{'gen_ai.conversation.id': resume_from, 'gen_ai.conversation.resumed': True})
+                        return output
+
+                pending = _pending_function_calls(entries)
+                if not pending:
+                    CONVERSATION_RESUMES.labels(operation="run", outcome="restarted").inc()
+                    return None
+
+                logger.info(f"Continuing conversation {resume_from} with {len(pending)} pending tool calls")
+                on_progress(conversation_id=resume_from)
+                run_ctx = RunContext(model=agent.model, conversation_id=resume_from, continue_on_fn_error=False)
+                async with run_ctx:
+                    await run_ctx.register_mcp_clients(mcp_clients=[mcp_client(params.mcp_server_url)])
+                    results = await run_ctx.execute_function_calls(pending)
+                    if not results:
+                        # Nothing to send back: the conversation cannot continue without new inputs.
+                        logger.info(f"No tool results for the pending calls of {resume_from}, starting over")
+                        CONVERSATION_RESUMES.labels(operation="run", outcome="restarted").inc()
+                        return None
+                    CONVERSATION_RESUMES.labels(operation="run", outcome="continued").inc()
+                    inputs = [result.model_dump(mode="json") for result in results]
+                    return await execute(run_ctx, inputs, "run_resumed", {})
+
+            async def run(model: str | None) -> Any:
+                # Always a model context with the agent's configuration: a context on the agent id would
+                # add the MCP tools to the agent itself (and drop its response format), and agents are
+                # shared with start_conversation runs through the worker's agent cache.
+                target = _agent_config(agent, model or agent.model)
+                run_ctx = RunContext(model=target.pop("model"), continue_on_fn_error=False)
+
+                async with run_ctx:
+                    await run_ctx.register_mcp_clients(mcp_clients=[mcp_client(params.mcp_server_url)])
+                    return await execute(run_ctx, params.inputs, "run", target)
+
+            output = await resume() if resume_from else None
+            if output is None:
+                output = await route(agent, run)
+            return AgentRunResult(output=output, usage=_agent_usage(usage, started))
 
         except Exception as e:
             span.record_exception(e)
+            event.fail(e)
             raise
+        finally:
+            event.emit()
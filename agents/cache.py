@@ -0,0 +1,208 @@
+import asyncio
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Tuple
+
+from config import settings
+from logger import get_logger
+
+logger = get_logger(__name__)
+
+# Expired entries are deleted from the disk tier at most this often, by the process writing at the time.
+PURGE_INTERVAL_SECONDS = 300.
+
+
+def cache_key(*parts: Any) -> str:
+    """sha256 of the JSON encoding of `parts` (agent config, response format, inputs, ...)."""
+    encoded = json.dumps(parts, sort_keys=True, default=str).encode("utf-8")
+    return hashlib.sha256(encoded).hexdigest()
+
+
+class TTLCache:
+    """
+    Two-tier cache of JSON-serialisable values with a TTL per entry.
+
+    Lookups go to an in-memory LRU first, then to an optional SQLite file shared by the
+    worker processes of a host. Concurrent misses on the same key within a process are
+    coalesced: only the first caller computes the value, the others await its result.
+    `get_or_compute` runs the SQLite reads and writes in a thread, off the event loop.
+    """
+
+    def __init__(self, max_entries: int = 1024, path: str | None = None, clock: Callable[[], float] = time.time):
+        self.max_entries = max_entries
+        self.path = path
+        self._clock = clock
+        self._memory: OrderedDict[str, Tuple[float, Any]] = OrderedDict()
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._db: sqlite3.Connection | None = None
+        self._db_lock = threading.Lock()
+        self._purged_at = float("-inf")
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._db is None:
+            self._db = sqlite3.connect(self.path, isolation_level=None, check_same_thread=False)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS entries (key TEXT PRIMARY KEY, value TEXT, expires_at REAL)"
+            )
+            self._db.execute("CREATE INDEX IF NOT EXISTS entries_expires_at ON entries (expires_at)")
+        return self._db
+
+    def _remember(self, key: str, expires_at: float, value: Any):
+        self._memory[key] = (expires_at, value)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def _memory_get(self, key: str, now: float) -> Tuple[bool, Any]:
+        entry = self._memory.get(key)
+        if entry is not None:
+            expires_at, value = entry
+            if expires_at > now:
+                self._memory.move_to_end(key)
+                return True, value
+            del self._memory[key]
+        return False, None
+
+    def _disk_get(self, key: str, now: float) -> Tuple[float, Any] | None:
+        try:
+            with self._db_lock:
+                row = self._connect().execute(
+                    "SELECT value, expires_at FROM entries WHERE key = ? AND expires_at > ?", (key, now)
+                ).fetchone()
+        except sqlite3.Error as e:
+            logger.warning(f"Cache disk tier read failed: {e}")
+            return None
+        if row is None:
+            return None
+        return row[1], json.loads(row[0])
+
+    def _disk_set(self, key: str, value: Any, expires_at: float):
+        try:
+            with self._db_lock:
+                db = self._connect()
+                db.execute(
+                    "INSERT OR REPLACE INTO entries (key, value, expires_at) VALUES (?, ?, ?)",
+                    (key, json.dumps(value), expires_at),
+                )
+                now = self._clock()
+                if now - self._purged_at >= PURGE_INTERVAL_SECONDS:
+                    db.execute("DELETE FROM entries WHERE expires_at <= ?", (now,))
+                    self._purged_at = now
+        except sqlite3.Error as e:
+            logger.warning(f"Cache disk tier write failed: {e}")
+
+    def get(self, key: str) -> Tuple[bool, Any]:
+        """Returns (found, value)."""
+        now = self._clock()
+        found, value = self._memory_get(key, now)
+        if found or self.path is None:
+            return found, value
+        entry = self._disk_get(key, now)
+        if entry is None:
+            return False, None
+        self._remember(key, *entry)
+        return True, entry[1]
+
+    def set(self, key: str, value: Any, ttl_seconds: float):
+        expires_at = self._clock() + ttl_seconds
+        self._remember(key, expires_at, value)
+        if self.path is not None:
+            self._disk_set(key, value, expires_at)
+
+    async def set_async(self, key: str, value: Any, ttl_seconds: float):
+        """Like `set`, writing the disk tier in a thread."""
+        expires_at = self._clock() + ttl_seconds
+        self._remember(key, expires_at, value)
+        if self.path is not None:
+            await asyncio.to_thread(self._disk_set, key, value, expires_at)
+
+    async def get_or_compute(self, key: str, ttl_seconds: float, compute: Callable[[], Awaitable[Any]]) -> Tuple[Any, bool]:
+        """
+        Cached value for `key`, computing and storing it on a miss.
+
+        Args:
+            key: Cache key, see `cache_key`
+            ttl_seconds: Time to live of a computed value
+            compute: Computes the value on a miss; failures are not cached
+
+        Returns:
+            The value and whether it came from the cache (or from a concurrent identical call).
+        """
+        found, value = self._memory_get(key, self._clock())
+        if found:
+            return value, True
+
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            try:
+                return await asyncio.shield(inflight), True
+            except asyncio.CancelledError:
+                if not inflight.cancelled():
+                    raise
+                # The call we were waiting for was cancelled, not us: compute it ourselves.
+                return await self.get_or_compute(key, ttl_seconds, compute)
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            # Registered as in flight first, so concurrent callers wait for the disk lookup too.
+            entry = None
+            if self.path is not None:
+                entry = await asyncio.to_thread(self._disk_get, key, self._clock())
+            if entry is not None:
+                self._remember(key, *entry)
+                value = entry[1]
+            else:
+                value = await compute()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            # Mark the exception as retrieved when no other caller was waiting for it.
+            future.exception()
+            raise
+        finally:
+            del self._inflight[key]
+
+        future.set_result(value)
+        if entry is not None:
+            return value, True
+        await self.set_async(key, value, ttl_seconds)
+        return value, False
+
+
+_conversation_cache: TTLCache | None = None
+
+
+def get_conversation_cache() -> TTLCache:
+    """The process-wide cache of deterministic agent conversations."""
+    global _conversation_cache
+    if _conversation_cache is None:
+        _conversation_cache = TTLCache(
+            max_entries=settings.conversation_cache_max_entries,
+            path=settings.conversation_cache_path,
+        )
+    return _conversation_cache
+
+
+_agent_cache: TTLCache | None = None
+
+
+def get_agent_cache() -> TTLCache:
+    """
+    Mistral agents created by this worker, by agent parameters.
+
+    Agents are stateless server-side configurations, so workflows with the same parameters can
+    share them. Entries expire after `agent_cache_ttl_seconds` so prompt changes on the MCP
+    server are picked up.
+    """
+    global _agent_cache
+    if _agent_cache is None:
+        _agent_cache = TTLCache(max_entries=256)
+    return _agent_cache
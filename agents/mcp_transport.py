@@ -0,0 +1,46 @@
+from contextlib import AsyncExitStack, asynccontextmanager
+from typing import AsyncIterator
+
+from mcp import ClientSession
+from mcp.client.sse import sse_client
+from mcp.client.streamable_http import streamablehttp_client
+from mistralai.extra.mcp.base import MCPClientBase
+from mistralai.extra.mcp.sse import MCPClientSSE, SSEServerParams
+
+# Imported lazily by agents/base.py: the MCP and Mistral SDKs are only needed once an activity runs.
+
+
+def is_streamable_http(url: str) -> bool:
+    """Streamable HTTP endpoints are mounted at `/mcp`, SSE ones at `/sse` (see mcp_server/main.py)."""
+    return url.rstrip("/").endswith("/mcp")
+
+
+def _transport(url: str):
+    return streamablehttp_client(url) if is_streamable_http(url) else sse_client(url)
+
+
+@asynccontextmanager
+async def mcp_session(url: str) -> AsyncIterator[ClientSession]:
+    """An initialized MCP client session over the transport of `url`."""
+    async with _transport(url) as streams:
+        async with ClientSession(streams[0], streams[1]) as session:
+            await session.initialize()
+            yield session
+
+
+class MCPClientStreamableHTTP(MCPClientBase):
+    """Mistral run-context MCP client over stateless streamable HTTP."""
+
+    def __init__(self, url: str, name: str | None = None):
+        super().__init__(name=name)
+        self.url = url
+
+    async def _get_transport(self, exit_stack: AsyncExitStack):
+        return await exit_stack.enter_async_context(streamablehttp_client(self.url))
+
+
+def mcp_client(url: str) -> MCPClientBase:
+    """The Mistral run-context MCP client for the transport of `url`."""
+    if is_streamable_http(url):
+        return MCPClientStreamableHTTP(url)
+    return MCPClientSSE(SSEServerParams(url=url))
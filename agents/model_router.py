@@ -0,0 +1,85 @@
+from typing import TYPE_CHECKING, Awaitable, Callable, Dict, Tuple, TypeVar
+
+from pydantic import ValidationError
+
+from models.agents import ModelTier
+from config import settings
+from logger import get_logger
+from metrics import LLM_REROUTES
+
+if TYPE_CHECKING:
+    from mistralai import Agent
+
+logger = get_logger(__name__)
+
+T = TypeVar("T")
+
+TIERS: Tuple[ModelTier, ...] = ("small", "medium", "large")
+
+# USD per million (input, output) tokens, used to estimate the cost of each call.
+MODEL_PRICES: Dict[str, Tuple[float, float]] = {
+    "ministral-8b-latest": (0.1, 0.1),
+    "mistral-small-latest": (0.1, 0.3),
+    "mistral-medium-2505": (0.4, 2.),
+    "mistral-medium-latest": (0.4, 2.),
+    "mistral-large-latest": (2., 6.),
+}
+
+
+def model_for(tier: ModelTier) -> str:
+    return settings.model_tiers[tier]
+
+
+def escalation_model(model: str) -> str | None:
+    """The model of the next tier up, or None when the model is not in a tier or already the largest."""
+    for tier, larger in zip(TIERS, TIERS[1:]):
+        if settings.model_tiers.get(tier) == model:
+            return model_for(larger)
+    return None
+
+
+def fallback_model(model: str) -> str | None:
+    return settings.model_fallbacks.get(model)
+
+
+def estimate_cost(model: str, input_tokens: int | None, output_tokens: int | None) -> float | None:
+    if model not in MODEL_PRICES or input_tokens is None or output_tokens is None:
+        return None
+    input_price, output_price = MODEL_PRICES[model]
+    return (input_tokens * input_price + output_tokens * output_price) / 1_000_000
+
+
+async def route(agent: "Agent", call: Callable[[str | None], Awaitable[T]]) -> T:
+    """
+    Run an agent call on the agent's own model, re-running it once on another model when needed.
+
+    A call rejected with 429 is re-run on the model's fallback, and a call whose output does not
+    validate against the response format is re-run on the next tier up. Anything else, or a
+    failure of the re-run, is raised to the activity so Temporal retries it.
+
+    Args:
+        agent: The Mistral agent being run
+        call: Runs the conversation: `call(None)` uses the stored agent, `call(model)` runs the
+            agent's instructions, tools and completion args on `model`
+
+    Returns:
+        The validated output of the call
+    """
+    from mistralai import SDKError
+
+    try:
+        return await call(None)
+    except SDKError as e:
+        model = fallback_model(agent.model)
+        if e.status_code != 429 or model is None:
+            raise
+        reason = "rate_limited"
+    except ValidationError:
+        model = escalation_model(agent.model)
+        if model is None:
+            raise
+        reason = "invalid_output"
+
+    logger.warning(f"Re-running agent '{agent.name}' on {model} ({reason} on {agent.model})")
+    LLM_REROUTES.labels(agent=agent.name, model=model, reason=reason).inc()
+    return await call(model)
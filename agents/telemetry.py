@@ -0,0 +1,142 @@
+import hashlib
+import random
+import time
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, Tuple
+
+import pydantic_core
+
+from config import settings
+from logger import get_logger
+from observability import get_logfire
+
+logger = get_logger(__name__)
+
+_SCALAR_TYPES = (bool, int, float, type(None))
+_random = random.Random()
+
+
+@dataclass
+class TelemetryStats:
+    events_emitted: int = 0
+    events_sampled_out: int = 0
+    attributes_truncated: int = 0
+    bytes_truncated: int = 0
+    overhead_seconds: float = 0.
+
+
+_stats = TelemetryStats()
+
+
+def get_telemetry_stats() -> Dict[str, Any]:
+    """Snapshot of the gen_ai telemetry counters for this process."""
+    return asdict(_stats)
+
+
+def reset_telemetry_stats() -> None:
+    global _stats
+    _stats = TelemetryStats()
+
+
+def cap_attribute(value: Any, max_bytes: int) -> Tuple[Any, Dict[str, Any]]:
+    """
+    Cap the serialized size of a span attribute.
+
+    Args:
+        value: Attribute value (str, pydantic model, list of entries, ...)
+        max_bytes: Maximum number of UTF-8 bytes kept for the attribute
+
+    Returns:
+        The value to log (unchanged when small enough, otherwise a truncated JSON/text string)
+        and extra attributes describing the truncation (original size and sha256 of the full content).
+    """
+    if isinstance(value, _SCALAR_TYPES):
+        return value, {}
+
+    if isinstance(value, str):
+        encoded = value.encode("utf-8")
+    else:
+        encoded = pydantic_core.to_json(value, fallback=str)
+
+    if len(encoded) <= max_bytes:
+        return value, {}
+
+    truncated = encoded[:max_bytes].decode("utf-8", errors="ignore")
+    return truncated, {
+        "bytes": len(encoded),
+        "sha256": hashlib.sha256(encoded).hexdigest(),
+    }
+
+
+def sampling_decision(head_sampled: bool, duration: float, error: BaseException | None) -> str | None:
+    """Returns why an event is kept ("error", "slow" or "head"), or None when it is sampled out."""
+    if error is not None:
+        return "error"
+    if duration >= settings.genai_telemetry_slow_call_seconds:
+        return "slow"
+    if head_sampled:
+        return "head"
+    return None
+
+
+def _export(message: str, attributes: Dict[str, Any]) -> None:
+    get_logfire("mistral_agents").info(message, **attributes)
+
+
+class GenAIEvent:
+    """
+    A gen_ai log event that is sampled and size-capped before export.
+
+    The head sampling decision is taken when the event is created; errors and slow calls
+    are always kept (tail sampling). Content attributes larger than the configured cap are
+    truncated and annotated with their original size and hash. Kept events are handed to
+    logfire, whose batch processor exports them from a background thread through a bounded
+    queue; events that do not fit are dropped and counted in telemetry_spans_dropped_total.
+    """
+
+    def __init__(self, message: str, attributes: Dict[str, Any]):
+        self.message = message
+        self.attributes = dict(attributes)
+        self.error: BaseException | None = None
+        self._head_sampled = _random.random() < settings.genai_telemetry_sample_rate
+        self._started = time.perf_counter()
+
+    def update(self, message: str | None = None, **attributes: Any) -> None:
+        if message is not None:
+            self.message = message
+        self.attributes.update(attributes)
+
+    def fail(self, error: BaseException) -> None:
+        self.error = error
+
+    def emit(self) -> None:
+        duration = time.perf_counter() - self._started
+        started = time.perf_counter()
+        try:
+            reason = sampling_decision(self._head_sampled, duration, self.error)
+            if reason is None:
+                _stats.events_sampled_out += 1
+                return
+
+            attributes = {}
+            for key, value in self.attributes.items():
+                value, truncation = cap_attribute(value, settings.genai_telemetry_max_attribute_bytes)
+                attributes[key] = value
+                if truncation:
+                    _stats.attributes_truncated += 1
+                    _stats.bytes_truncated += truncation["bytes"] - settings.genai_telemetry_max_attribute_bytes
+                    attributes[f"{key}.bytes"] = truncation["bytes"]
+                    attributes[f"{key}.sha256"] = truncation["sha256"]
+
+            attributes["gen_ai.client.operation.duration"] = duration
+            attributes["gen_ai.telemetry.sampled_by"] = reason
+            if self.error is not None:
+                attributes["error.type"] = type(self.error).__name__
+
+            try:
+                _export(self.message, attributes)
+                _stats.events_emitted += 1
+            except Exception as e:
+                logger.warning(f"Failed to export gen_ai event: {e}")
+        finally:
+            _stats.overhead_seconds += time.perf_counter() - started
@@ -0,0 +1,186 @@
+import asyncio
+import time
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Dict, Literal, Tuple
+
+from temporalio.api.enums.v1 import TaskQueueType
+from temporalio.api.taskqueue.v1 import TaskQueue
+from temporalio.api.workflowservice.v1 import DescribeTaskQueueRequest
+from temporalio.client import Client
+
+from config import settings
+from logger import get_logger
+from metrics import ADMISSION_DECISIONS, ADMISSION_PENDING
+from models.agents import QueryModel
+from tasks.utils.tenancy import task_queue_for
+
+logger = get_logger(__name__)
+
+AdmissionPolicy = Literal["queue", "reject", "degrade"]
+# Under the degrade policy, requests are refused once running workflows reach this multiple of the limit.
+_DEGRADED_HEADROOM = 2
+
+
+@dataclass
+class LoadSignals:
+    running_workflows: int
+    backlog: int
+    """Activity tasks waiting in the lane's task queue."""
+
+    backlog_age_seconds: float
+    """Age of the oldest waiting activity task: the schedule-to-start latency new activities will see."""
+
+
+class AdmissionRejected(Exception):
+    def __init__(self, message: str, retry_after_seconds: int):
+        super().__init__(message)
+        self.retry_after_seconds = retry_after_seconds
+
+
+def temporal_load_signals(client: Client, workflow_type: str) -> Callable[[str], Awaitable[LoadSignals]]:
+    """Reads the load of a task queue from Temporal: running workflows from visibility, backlog from the task queue stats."""
+    async def fetch(task_queue: str) -> LoadSignals:
+        running, description = await asyncio.gather(
+            client.count_workflows(
+                f"WorkflowType = '{workflow_type}' AND ExecutionStatus = 'Running' AND TaskQueue = '{task_queue}'"
+            ),
+            client.workflow_service.describe_task_queue(DescribeTaskQueueRequest(
+                namespace=client.namespace,
+                task_queue=TaskQueue(name=task_queue),
+                task_queue_type=TaskQueueType.TASK_QUEUE_TYPE_ACTIVITY,
+                report_stats=True,
+            )),
+        )
+        return LoadSignals(
+            running_workflows=running.count,
+            backlog=description.stats.approximate_backlog_count,
+            backlog_age_seconds=description.stats.approximate_backlog_age.ToTimedelta().total_seconds(),
+        )
+
+    return fetch
+
+
+class AdmissionController:
+    """
+    Decides whether a new workflow starts now, waits, runs degraded or is refused.
+
+    A lane is overloaded when its running workflows or the age of its activity backlog exceed
+    their limits. Signals are read at most every `refresh_seconds` per lane; every admission
+    in between counts as one more running workflow, so a burst cannot slip through between
+    two reads. When the signals cannot be read, requests are admitted.
+
+    Policies for an overloaded lane:
+    - queue: wait (at most `max_pending` requests, each up to `queue_timeout_seconds`) until
+      the lane has room, refuse otherwise
+    - reject: refuse immediately
+    - degrade: admit with at most `degraded_max_searches` searches, refuse past twice the
+      running workflows limit
+    """
+
+    def __init__(
+            self,
+            fetch_signals: Callable[[str], Awaitable[LoadSignals]],
+            policy: AdmissionPolicy = "queue",
+            max_running_workflows: int = 200,
+            max_backlog_age_seconds: float = 10.,
+            max_pending: int = 100,
+            queue_timeout_seconds: float = 20.,
+            refresh_seconds: float = 1.,
+            retry_after_seconds: int = 10,
+            degraded_max_searches: int = 2,
+            clock: Callable[[], float] = time.monotonic,
+    ):
+        self.fetch_signals = fetch_signals
+        self.policy = policy
+        self.max_running_workflows = max_running_workflows
+        self.max_backlog_age_seconds = max_backlog_age_seconds
+        self.max_pending = max_pending
+        self.queue_timeout_seconds = queue_timeout_seconds
+        self.refresh_seconds = refresh_seconds
+        self.retry_after_seconds = retry_after_seconds
+        self.degraded_max_searches = degraded_max_searches
+        self._clock = clock
+        self._signals: Dict[str, Tuple[float, LoadSignals]] = {}
+        self._pending = 0
+
+    @classmethod
+    def from_settings(cls, client: Client, workflow_type: str) -> "AdmissionController":
+        return cls(
+            temporal_load_signals(client, workflow_type),
+            policy=settings.admission_policy,
+            max_running_workflows=settings.admission_max_running_workflows,
+            max_backlog_age_seconds=settings.admission_max_backlog_age_seconds,
+            max_pending=settings.admission_max_pending,
+            queue_timeout_seconds=settings.admission_queue_timeout_seconds,
+            refresh_seconds=settings.admission_refresh_seconds,
+            retry_after_seconds=settings.admission_retry_after_seconds,
+            degraded_max_searches=settings.admission_degraded_max_searches,
+        )
+
+    async def signals(self, task_queue: str) -> LoadSignals | None:
+        cached = self._signals.get(task_queue)
+        if cached is not None and cached[0] > self._clock():
+            return cached[1]
+        try:
+            signals = await self.fetch_signals(task_queue)
+        except Exception as e:
+            logger.warning(f"Admission control cannot read the load of {task_queue}, admitting: {e}")
+            return None
+        self._signals[task_queue] = (self._clock() + self.refresh_seconds, signals)
+        return signals
+
+    def overloaded(self, signals: LoadSignals | None, running_limit: float | None = None) -> bool:
+        if signals is None:
+            return False
+        running_limit = running_limit or self.max_running_workflows
+        return signals.running_workflows >= running_limit or signals.backlog_age_seconds >= self.max_backlog_age_seconds
+
+    def _admitted(self, signals: LoadSignals | None, decision: str, lane: str):
+        if signals is not None:
+            signals.running_workflows += 1
+        ADMISSION_DECISIONS.labels(decision=decision, lane=lane).inc()
+
+    def _rejected(self, reason: str, lane: str) -> AdmissionRejected:
+        ADMISSION_DECISIONS.labels(decision="rejected", lane=lane).inc()
+        return AdmissionRejected(reason, self.retry_after_seconds)
+
+    async def admit(self, params: QueryModel) -> QueryModel:
+        """
+        Wait for room when needed, then return the query to start (degraded or not).
+
+        Raises:
+            AdmissionRejected: The workflow should not be started; retry after `retry_after_seconds`.
+        """
+        lane = params.priority
+        task_queue = task_queue_for(lane)
+        signals = await self.signals(task_queue)
+        if not self.overloaded(signals):
+            self._admitted(signals, "admitted", lane)
+            return params
+
+        if self.policy == "reject":
+            raise self._rejected(f"{lane} lane is overloaded", lane)
+
+        if self.policy == "degrade":
+            if self.overloaded(signals, self.max_running_workflows * _DEGRADED_HEADROOM):
+                raise self._rejected(f"{lane} lane is overloaded, even for degraded requests", lane)
+            self._admitted(signals, "degraded", lane)
+            max_searches = min(params.max_searches or self.degraded_max_searches, self.degraded_max_searches)
+            return params.model_copy(update={"max_searches": max_searches})
+
+        if self._pending >= self.max_pending:
+            raise self._rejected("Admission queue is full", lane)
+        self._pending += 1
+        ADMISSION_PENDING.inc()
+        try:
+            deadline = self._clock() + self.queue_timeout_seconds
+            while self._clock() < deadline:
+                await asyncio.sleep(self.refresh_seconds)
+                signals = await self.signals(task_queue)
+                if not self.overloaded(signals):
+                    self._admitted(signals, "queued", lane)
+                    return params
+        finally:
+            self._pending -= 1
+            ADMISSION_PENDING.dec()
+        raise self._rejected(f"{lane} lane stayed overloaded for {self.queue_timeout_seconds:.0f}s", lane)
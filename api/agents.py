@@ -1,12 +1,25 @@
 import asyncio
-from uuid import uuid4
+from typing import List
 
-from fastapi import APIRouter, HTTPException, Request, status
+from fastapi import APIRouter, HTTPException, Query, Request, status
 
+from api.admission import AdmissionRejected
 from models.agents import QueryModel, WorkflowIDModel
+from models.ledger import UsageLedger, WorkflowBudget
 from models.structured_output import FinancialReportWorkflowOutput
+from models.workflow import CriticalPathSummary, WorkflowStatusName, WorkflowStatusPage
+from tasks.utils.critical_path import get_critical_path
+from tasks.utils.tenancy import (
+    DEFAULT_TENANT,
+    new_workflow_id,
+    running_batch_workflows_query,
+    task_queue_for,
+    workflow_priority,
+)
+from tasks.utils.workflow_status import list_workflow_statuses
 from tasks.workflows.financial_agents import FinancialResearchWorkflow
 from config import settings
+from metrics import TENANT_QUOTA_REJECTIONS, WORKFLOWS_STARTED
 
 router = APIRouter()
 
@@ -18,15 +31,67 @@ async def start_agent_workflow(
         params: QueryModel,
         request: Request
 ):
+    """
+    Start a research workflow in the lane given by `priority`.
+
+    Batch workflows are refused with 429 while the tenant already has
+    `TENANT_MAX_RUNNING_WORKFLOWS` batch workflows running, on a best-effort basis. When the lane is overloaded, the
+    admission policy makes the request wait, refuses it with 429 or runs it with fewer searches.
+    Queries without a budget get the default one (`WORKFLOW_MAX_TOKENS`, `WORKFLOW_MAX_SECONDS`), and
+    use the local corpus for searches as `SEARCH_LOCAL_CORPUS` says unless they choose.
+    """
+    client = request.app.state.temporal_client
+    if params.search_local_corpus is None:
+        params = params.model_copy(update={"search_local_corpus": settings.search_local_corpus})
+    if params.budget is None and (settings.workflow_max_tokens or settings.workflow_max_seconds):
+        params = params.model_copy(update={"budget": WorkflowBudget(
+            max_tokens=settings.workflow_max_tokens,
+            max_seconds=settings.workflow_max_seconds,
+        )})
+    if params.priority == "batch":
+        # Best effort: counting and starting are not atomic, and visibility lags behind new starts, so
+        # concurrent requests of a tenant can all pass the check and briefly exceed the quota.
+        try:
+            running = (await client.count_workflows(running_batch_workflows_query(params.tenant))).count
+        except Exception as e:
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=str(e)
+            )
+        if running >= settings.tenant_max_running_workflows:
+            TENANT_QUOTA_REJECTIONS.labels(tenant=params.tenant or DEFAULT_TENANT, stage="workflow").inc()
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail=f"{running} batch workflows already running for this tenant",
+                headers={"Retry-After": str(int(settings.tenant_quota_retry_seconds))},
+            )
+
     try:
-        client = request.app.state.temporal_client
-        workflow_id = f"financial-research-workflow-{uuid4()}"
+        params = await request.app.state.admission.admit(params)
+    except AdmissionRejected as e:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail=str(e),
+            headers={"Retry-After": str(e.retry_after_seconds)},
+        )
+
+    try:
+        workflow_id = new_workflow_id(params.tenant)
         await client.start_workflow(
             FinancialResearchWorkflow.run,
             params,
             id=workflow_id,
-            task_queue=settings.task_queue_url
+            task_queue=task_queue_for(params.priority),
+            priority=workflow_priority(params.tenant, params.priority),
+            memo={
+                "query": params.query,
+                "stage": "queued",
+                "tenant": params.tenant,
+                "priority": params.priority,
+                "max_searches": params.max_searches,
+            },
         )
+        WORKFLOWS_STARTED.labels(workflow=FinancialResearchWorkflow.__name__).inc()
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -35,6 +100,27 @@ async def start_agent_workflow(
 
     return WorkflowIDModel(workflow_id=workflow_id)
 
+@router.post(
+    "/cancel-agent-workflow",
+    response_model=WorkflowIDModel,
+)
+async def cancel_agent_workflow(
+        params: WorkflowIDModel,
+        request: Request
+):
+    """Cancel a research workflow; its in-flight activities stop at their next heartbeat."""
+    try:
+        client = request.app.state.temporal_client
+        handle = client.get_workflow_handle(params.workflow_id)
+        await handle.cancel()
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=str(e)
+        )
+
+    return params
+
 @router.get(
     "/get-agent-workflow-result",
     response_model=FinancialReportWorkflowOutput | None,
@@ -43,10 +129,16 @@ async def get_agent_workflow_result(
         workflow_id: str,
         request: Request
 ):
+    """The report from the report store, or by querying the workflow (which makes a worker replay it) when it is not stored."""
+    store = request.app.state.report_store
+    stored = await asyncio.to_thread(store.get, workflow_id) if store is not None else None
+    if stored is not None:
+        return stored.output
+
     try:
         client = request.app.state.temporal_client
         handle = client.get_workflow_handle(workflow_id)
-        response = await asyncio.wait_for(handle.query("get_final_report"), timeout=10)
+        response = await asyncio.wait_for(handle.query(FinancialResearchWorkflow.get_final_report), timeout=10)
         return response
 
     except Exception as e:
@@ -54,3 +146,81 @@ async def get_agent_workflow_result(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=str(e)
         )
+
+@router.get(
+    "/get-agent-workflow-ledger",
+    response_model=UsageLedger | None,
+)
+async def get_agent_workflow_ledger(
+        workflow_id: str,
+        request: Request
+):
+    """Tokens, cost and time per agent call: from the stored report once completed, by querying the workflow while it runs."""
+    store = request.app.state.report_store
+    stored = await asyncio.to_thread(store.get, workflow_id) if store is not None else None
+    if stored is not None:
+        return stored.output.ledger
+
+    try:
+        client = request.app.state.temporal_client
+        handle = client.get_workflow_handle(workflow_id)
+        return await asyncio.wait_for(handle.query(FinancialResearchWorkflow.get_ledger), timeout=10)
+
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=str(e)
+        )
+
+@router.get(
+    "/get-agent-workflow-critical-path",
+    response_model=CriticalPathSummary,
+)
+async def get_agent_workflow_critical_path(
+        workflow_id: str,
+        request: Request
+):
+    """Where the workflow's time went: queue wait vs execution per stage, from its event history."""
+    try:
+        client = request.app.state.temporal_client
+        return await get_critical_path(client, workflow_id)
+
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=str(e)
+        )
+
+@router.get(
+    "/list-agent-workflows",
+    response_model=WorkflowStatusPage,
+)
+async def list_agent_workflows(
+        request: Request,
+        page_size: int = Query(50, ge=1, le=1000),
+        next_page_token: str | None = None,
+        workflow_status: WorkflowStatusName | None = Query(None, alias="status"),
+        include_results: List[str] = Query([]),
+):
+    """
+    Status, stage and timing of research workflows from Temporal visibility, one page per call.
+
+    Results are only fetched for the completed workflows listed in `include_results`.
+    """
+    try:
+        client = request.app.state.temporal_client
+        return await list_workflow_statuses(
+            client,
+            FinancialResearchWorkflow.__name__,
+            page_size=page_size,
+            next_page_token=next_page_token,
+            status=workflow_status,
+            include_results=include_results,
+            results_concurrency=settings.workflow_results_concurrency,
+        )
+
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=str(e)
+        )
@@ -1,33 +1,44 @@
-from contextlib import asynccontextmanager
+import os
 
-from fastapi import FastAPI
-import logfire
+# Skip pydantic's plugin scan at start-up, see tasks/worker.py.
+os.environ.setdefault("PYDANTIC_DISABLE_PLUGINS", "__all__")
 
-from tasks.utils.common import get_temporal_client
-from api.agents import router as agents_router
-from config import settings
-from logger import get_logger
+from contextlib import asynccontextmanager  # noqa: E402
+
+from fastapi import FastAPI  # noqa: E402
+
+from tasks.utils.common import get_temporal_client  # noqa: E402
+from tasks.utils.report_store import get_report_store  # noqa: E402
+from tasks.workflows.financial_agents import FinancialResearchWorkflow  # noqa: E402
+from api.admission import AdmissionController  # noqa: E402
+from api.agents import router as agents_router  # noqa: E402
+from api.reports import router as reports_router  # noqa: E402
+from metrics import mark_process_dead, metrics_endpoint  # noqa: E402
+from logger import get_logger  # noqa: E402
+from observability import configure_logfire  # noqa: E402
 
 logger = get_logger(__name__)
 
 @asynccontextmanager
 async def lifespan(_app: FastAPI):
     _app.state.temporal_client = await get_temporal_client()
+    _app.state.report_store = get_report_store()
+    _app.state.admission = AdmissionController.from_settings(
+        _app.state.temporal_client, FinancialResearchWorkflow.__name__
+    )
     try:
         yield
     finally:
-        pass
+        mark_process_dead()
 app = FastAPI(
     title="API to Manage Agents Workflows",
     lifespan=lifespan,
 )
 app.include_router(agents_router, prefix="/agents", tags=["Mistral Agents"])
+app.include_router(reports_router, prefix="/reports", tags=["Reports"])
+app.add_route("/metrics", metrics_endpoint, include_in_schema=False)
 
 try:
-    logfire.configure(
-        token=settings.logfire_token,
-        service_name="mistral-mcp-temporal",
-    )
-    logfire.instrument_fastapi(app=app)
+    configure_logfire().instrument_fastapi(app=app)
 except Exception as e:
     logger.warning(e)
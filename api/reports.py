@@ -0,0 +1,51 @@
+import asyncio
+from datetime import datetime
+from typing import List
+
+from fastapi import APIRouter, HTTPException, Query, Request, status
+
+from models.reports import ReportSearchHit, StoredReport
+from tasks.utils.report_store import ReportStore
+
+router = APIRouter()
+
+
+def _store(request: Request) -> ReportStore:
+    store = request.app.state.report_store
+    if store is None:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Report store is not configured (REPORT_STORE_PATH)"
+        )
+    return store
+
+@router.get(
+    "/search",
+    response_model=List[ReportSearchHit],
+)
+async def search_reports(
+        request: Request,
+        q: str | None = Query(None, description="Words that must all appear in the report"),
+        ticker: str | None = None,
+        since: datetime | None = None,
+        until: datetime | None = None,
+        limit: int = Query(20, ge=1, le=200),
+):
+    """Stored reports by full-text search, ticker and creation date, without going through Temporal."""
+    return await asyncio.to_thread(_store(request).search, text=q, ticker=ticker, since=since, until=until, limit=limit)
+
+@router.get(
+    "/{workflow_id}",
+    response_model=StoredReport,
+)
+async def get_report(
+        workflow_id: str,
+        request: Request
+):
+    report = await asyncio.to_thread(_store(request).get, workflow_id)
+    if report is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"No stored report for workflow {workflow_id}"
+        )
+    return report
@@ -0,0 +1,67 @@
+import json
+
+import pytest
+from httpx import Response
+
+from models.structured_output import AnalysisSummary, FinancialReportData
+
+# Sizes mirror a typical report: the planner asks for 5-15 searches, each search
+# summary is capped at ~300 words and the writer produces a multi-section report.
+N_FINDINGS = 15
+WORDS_PER_FINDING = 300
+REPORT_SECTIONS = 12
+PARAGRAPHS_PER_SECTION = 4
+
+
+def _words(n: int) -> str:
+    vocabulary = ["revenue", "margin", "guidance", "quarter", "growth", "NVDA", "12.4%", "datacenter", "risk", "EPS"]
+    return " ".join(vocabulary[i % len(vocabulary)] for i in range(n))
+
+
+@pytest.fixture(scope="session")
+def search_results() -> list[AnalysisSummary]:
+    return [AnalysisSummary(summary=_words(WORDS_PER_FINDING)) for _ in range(N_FINDINGS)]
+
+
+@pytest.fixture(scope="session")
+def large_report_json() -> str:
+    sections = []
+    for i in range(REPORT_SECTIONS):
+        paragraphs = "\n\n".join(_words(120) for _ in range(PARAGRAPHS_PER_SECTION))
+        sections.append(f"## Section {i}\n\n{paragraphs}")
+    report = FinancialReportData(
+        short_summary=_words(60),
+        markdown_report="# Report\n\n" + "\n\n".join(sections),
+        follow_up_questions=[_words(20) for _ in range(10)],
+        key_metrics={f"metric_{i}": i * 1.5 for i in range(40)},
+    )
+    return report.model_dump_json()
+
+
+@pytest.fixture(scope="session")
+def http_responses() -> list[Response]:
+    return [
+        Response(429, headers={"retry-after-ms": "1500"}),
+        Response(429, headers={"retry-after": "3"}),
+        Response(503, headers={"retry-after": "Wed, 21 Oct 2015 07:28:00 GMT"}),
+        Response(500),
+        Response(408),
+        Response(400, headers={"x-should-retry": "true"}),
+        Response(422),
+    ]
+
+
+@pytest.fixture(scope="session")
+def nested_schema() -> str:
+    """A deeply nested JSON schema, serialized so each round can start from a fresh copy."""
+    leaf = {"type": "object", "properties": {"value": {"type": "string"}}}
+    node = leaf
+    for depth in range(8):
+        node = {
+            "type": "object",
+            "properties": {
+                f"child_{depth}": node,
+                f"items_{depth}": {"type": "array", "items": node},
+            },
+        }
+    return json.dumps(node)
@@ -0,0 +1,102 @@
+"""
+Import-time profile of the service entrypoints.
+
+Each module is imported in a fresh interpreter with `-X importtime`, so the numbers are
+cold-start numbers. Usage:
+
+    PYTHONPATH=. uv run python -m benchmarks.import_time [module ...] [--top 15]
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+from dataclasses import dataclass
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# Cold import budgets in seconds. The worker is autoscaled and must be ready well under a
+# second; the API and MCP server also configure logfire instrumentation at import time.
+ENTRYPOINTS = {
+    "tasks.worker": 0.8,
+    "api.main": 1.5,
+    "mcp_server.main": 1.5,
+}
+
+# SDKs that must only be imported when first used by the worker.
+WORKER_LAZY_MODULES = ("mistralai", "logfire", "mcp", "yfinance")
+
+_SCRIPT = (
+    "import json, sys, time\n"
+    "started = time.perf_counter()\n"
+    "import {module}\n"
+    "elapsed = time.perf_counter() - started\n"
+    "print(json.dumps({{'seconds': elapsed, 'modules': sorted(sys.modules)}}))\n"
+)
+
+
+@dataclass
+class ImportProfile:
+    module: str
+    seconds: float
+    loaded_modules: set[str]
+    cumulative_us: dict[str, int]
+
+    def top(self, n: int) -> list[tuple[str, int]]:
+        return sorted(self.cumulative_us.items(), key=lambda item: item[1], reverse=True)[:n]
+
+
+def budget_for(module: str) -> float:
+    """Budget for a module, scaled by IMPORT_TIME_BUDGET_SCALE for slower machines."""
+    return ENTRYPOINTS[module] * float(os.environ.get("IMPORT_TIME_BUDGET_SCALE", "1"))
+
+
+def profile_import(module: str) -> ImportProfile:
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [str(ROOT), env.get("PYTHONPATH")]))
+    # Without a token logfire never reaches the network while configuring.
+    env.pop("LOGFIRE_TOKEN", None)
+
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", _SCRIPT.format(module=module)],
+        cwd=ROOT,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+    cumulative_us = {}
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line.removeprefix("import time:").split("|")
+        cumulative_us[name.strip()] = int(cumulative)
+
+    result = json.loads(completed.stdout.strip().splitlines()[-1])
+    return ImportProfile(
+        module=module,
+        seconds=result["seconds"],
+        loaded_modules=set(result["modules"]),
+        cumulative_us=cumulative_us,
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("modules", nargs="*", default=list(ENTRYPOINTS))
+    parser.add_argument("--top", type=int, default=15, help="Number of slowest imports to show")
+    args = parser.parse_args()
+
+    for module in args.modules:
+        profile = profile_import(module)
+        budget = budget_for(module) if module in ENTRYPOINTS else None
+        status = "" if budget is None else f" (budget {budget:.2f}s{', OVER' if profile.seconds > budget else ''})"
+        print(f"{module}: {profile.seconds:.3f}s{status}")
+        for name, micros in profile.top(args.top):
+            print(f"  {micros / 1e6:8.3f}s  {name}")
+
+
+if __name__ == "__main__":
+    main()
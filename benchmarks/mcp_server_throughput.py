@@ -0,0 +1,115 @@
+"""
+Requests/sec of the MCP server over stateless streamable HTTP, across uvicorn worker counts.
+
+Each run starts `uvicorn mcp_server.main:app --workers N` on a free local port and sends
+`prompts/get` JSON-RPC requests (no upstream calls, so the MCP server itself is measured)
+from concurrent clients for a fixed duration. Usage:
+
+    PYTHONPATH=. uv run python -m benchmarks.mcp_server_throughput [--workers 1 2 4] [--concurrency 64] [--duration 10]
+"""
+import argparse
+import asyncio
+import os
+import socket
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import httpx
+
+ROOT = Path(__file__).resolve().parent.parent
+
+REQUEST = {
+    "jsonrpc": "2.0",
+    "id": 1,
+    "method": "prompts/get",
+    "params": {"name": "planner_prompt"},
+}
+HEADERS = {"Accept": "application/json, text/event-stream"}
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_server(workers: int, port: int) -> subprocess.Popen:
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [str(ROOT), env.get("PYTHONPATH")]))
+    # Without a token logfire never reaches the network.
+    env.pop("LOGFIRE_TOKEN", None)
+    return subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "mcp_server.main:app", "--port", str(port),
+         "--workers", str(workers), "--log-level", "warning", "--no-access-log"],
+        cwd=ROOT,
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+
+
+async def wait_until_ready(url: str, timeout: float = 30.):
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient() as client:
+        while time.monotonic() < deadline:
+            try:
+                if (await client.get(url)).status_code == 200:
+                    return
+            except httpx.TransportError:
+                pass
+            await asyncio.sleep(0.2)
+    raise TimeoutError(f"MCP server not ready at {url}")
+
+
+async def measure(url: str, concurrency: int, duration: float) -> tuple[int, int]:
+    """Returns the number of successful and failed requests sent within `duration` seconds."""
+    ok = failed = 0
+    deadline = time.monotonic() + duration
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+    async with httpx.AsyncClient(limits=limits, timeout=30) as client:
+        async def user():
+            nonlocal ok, failed
+            while time.monotonic() < deadline:
+                try:
+                    response = await client.post(url, json=REQUEST, headers=HEADERS)
+                    response.raise_for_status()
+                    ok += 1
+                except httpx.HTTPError:
+                    failed += 1
+
+        await asyncio.gather(*[user() for _ in range(concurrency)])
+    return ok, failed
+
+
+async def run(workers: int, concurrency: int, duration: float) -> tuple[float, int]:
+    port = _free_port()
+    server = start_server(workers, port)
+    try:
+        await wait_until_ready(f"http://127.0.0.1:{port}/metrics")
+        url = f"http://127.0.0.1:{port}/financials/mcp"
+        await measure(url, concurrency, 1.)  # warm-up
+        ok, failed = await measure(url, concurrency, duration)
+        return ok / duration, failed
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", nargs="*", type=int, default=[1, 2, 4])
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--duration", type=float, default=10.)
+    args = parser.parse_args()
+
+    print(f"{'workers':>8} {'req/s':>10} {'errors':>8}")
+    for workers in args.workers:
+        rps, failed = asyncio.run(run(workers, args.concurrency, args.duration))
+        print(f"{workers:>8} {rps:>10.1f} {failed:>8}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+"""
+Record workflow histories and measure how long the worker takes to replay them.
+
+Replay is what a worker does on every workflow cache miss (after an eviction or a restart),
+so replay time is the worker CPU cost per workflow task. Histories are recorded from a
+Temporal server after local load-test runs and replayed with `Replayer`, which also fails
+on non-determinism. Usage:
+
+    PYTHONPATH=. uv run python -m benchmarks.replay record --limit 20 --out tests/histories
+    PYTHONPATH=. uv run python -m benchmarks.replay run tests/histories --repeat 5 --output replay.json
+    PYTHONPATH=. uv run python -m benchmarks.replay run tests/histories --compare replay.json
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import sys
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Iterable, List
+
+from temporalio.client import WorkflowHistory
+from temporalio.contrib.pydantic import pydantic_data_converter
+from temporalio.worker import Replayer, WorkflowRunner
+
+from tasks.utils.common import workflow_runner
+from tasks.utils.critical_path import activity_timings
+from tasks.workflows.financial_agents import FinancialResearchWorkflow
+
+WORKFLOWS = [FinancialResearchWorkflow]
+RECORD_QUERY = f"WorkflowType = '{FinancialResearchWorkflow.__name__}' AND ExecutionStatus = 'Completed'"
+
+
+@dataclass
+class ReplayTiming:
+    workflow_id: str
+    events: int
+    search_items: int
+    history_bytes: int
+    mean_ms: float
+    min_ms: float
+
+
+def load_histories(paths: Iterable[str]) -> List[WorkflowHistory]:
+    """Histories from JSON files (as written by `record` or exported from the Temporal UI/CLI), named after the workflow id."""
+    files = []
+    for path in map(Path, paths):
+        files.extend(sorted(path.glob("*.json")) if path.is_dir() else [path])
+    return [WorkflowHistory.from_json(file.stem, file.read_text()) for file in files]
+
+
+def new_replayer(runner: WorkflowRunner | None = None) -> Replayer:
+    # Same converter and sandbox as the workers, or typed activity results would not decode.
+    return Replayer(
+        workflows=WORKFLOWS,
+        data_converter=pydantic_data_converter,
+        workflow_runner=runner or workflow_runner(),
+    )
+
+
+async def replay_timing(replayer: Replayer, history: WorkflowHistory, repeat: int) -> ReplayTiming:
+    durations = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        await replayer.replay_workflow(history)
+        durations.append((time.perf_counter() - started) * 1000)
+    return ReplayTiming(
+        workflow_id=history.workflow_id,
+        events=len(history.events),
+        search_items=sum(timing.name == "SEARCH" for timing in activity_timings(history.events)),
+        history_bytes=len(history.to_json()),
+        mean_ms=statistics.mean(durations),
+        min_ms=min(durations),
+    )
+
+
+async def record(limit: int, out: Path, query: str):
+    from tasks.utils.common import get_temporal_client
+
+    client = await get_temporal_client()
+    out.mkdir(parents=True, exist_ok=True)
+    recorded = 0
+    async for execution in client.list_workflows(query, limit=limit):
+        history = await client.get_workflow_handle(execution.id, run_id=execution.run_id).fetch_history()
+        (out / f"{execution.id}.json").write_text(history.to_json())
+        recorded += 1
+    print(f"Recorded {recorded} histories in {out}")
+
+
+async def run(paths: List[str], repeat: int) -> List[ReplayTiming]:
+    replayer = new_replayer()
+    return [await replay_timing(replayer, history, repeat) for history in load_histories(paths)]
+
+
+def report(timings: List[ReplayTiming]):
+    print(f"{'workflow':<60} {'events':>7} {'searches':>9} {'KiB':>7} {'mean ms':>9} {'min ms':>8}")
+    for t in sorted(timings, key=lambda t: t.events):
+        print(f"{t.workflow_id:<60} {t.events:>7} {t.search_items:>9} {t.history_bytes / 1024:>7.1f} {t.mean_ms:>9.1f} {t.min_ms:>8.1f}")
+    if timings:
+        per_kilo_event = sum(t.mean_ms for t in timings) / sum(t.events for t in timings) * 1000
+        print(f"\n{len(timings)} histories, {per_kilo_event:.1f} ms of replay per 1000 events")
+
+
+def regressions(timings: List[ReplayTiming], baseline: List[dict], max_regression: float) -> List[str]:
+    """Workflows whose mean replay time grew by more than `max_regression` (fraction) over the baseline."""
+    previous = {entry["workflow_id"]: entry["mean_ms"] for entry in baseline}
+    return [
+        f"{t.workflow_id}: {previous[t.workflow_id]:.1f} ms -> {t.mean_ms:.1f} ms"
+        for t in timings
+        if t.workflow_id in previous and t.mean_ms > previous[t.workflow_id] * (1 + max_regression)
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    record_parser = subparsers.add_parser("record", help="Save histories of completed workflows")
+    record_parser.add_argument("--limit", type=int, default=20)
+    record_parser.add_argument("--out", type=Path, default=Path("tests/histories"))
+    record_parser.add_argument("--query", default=RECORD_QUERY)
+    run_parser = subparsers.add_parser("run", help="Replay histories and report timings")
+    run_parser.add_argument("paths", nargs="+")
+    run_parser.add_argument("--repeat", type=int, default=5)
+    run_parser.add_argument("--output", type=Path, help="Save the timings as JSON")
+    run_parser.add_argument("--compare", type=Path, help="Fail when slower than a saved run")
+    run_parser.add_argument("--max-regression", type=float, default=0.25)
+    args = parser.parse_args()
+
+    if args.command == "record":
+        asyncio.run(record(args.limit, args.out, args.query))
+        return
+
+    timings = asyncio.run(run(args.paths, args.repeat))
+    report(timings)
+    if args.output:
+        args.output.write_text(json.dumps([asdict(t) for t in timings], indent=2))
+    if args.compare:
+        slower = regressions(timings, json.loads(args.compare.read_text()), args.max_regression)
+        if slower:
+            print("\nReplay regressions:\n" + "\n".join(slower))
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
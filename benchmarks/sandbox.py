@@ -0,0 +1,106 @@
+"""
+Measure what the workflow sandbox costs per workflow run, for several sandbox configurations.
+
+Every workflow run (and every replay after a cache eviction) gets a fresh sandbox: the workflow
+module and every module it imports that is not passed through are imported again, and their
+objects live as long as the run stays in the worker's cache. Without histories, only the
+sandbox creation is measured; with histories, each one is replayed in full. Usage:
+
+    PYTHONPATH=. uv run python -m benchmarks.sandbox --repeat 50
+    PYTHONPATH=. uv run python -m benchmarks.sandbox tests/histories --repeat 5
+"""
+import argparse
+import asyncio
+import statistics
+import time
+import tracemalloc
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Dict, List
+
+from temporalio.worker import UnsandboxedWorkflowRunner, WorkflowRunner
+from temporalio.worker.workflow_sandbox import SandboxedWorkflowRunner
+from temporalio.workflow import _Definition
+
+from benchmarks.replay import WORKFLOWS, load_histories, new_replayer
+from tasks.utils.common import workflow_runner
+
+RUNNERS: Dict[str, Callable[[], WorkflowRunner]] = {
+    "default": SandboxedWorkflowRunner,
+    "tuned": workflow_runner,
+    "unsandboxed": UnsandboxedWorkflowRunner,
+}
+
+
+@dataclass
+class SandboxTiming:
+    runner: str
+    runs: int
+    mean_ms: float
+    min_ms: float
+    peak_kib: float
+    """Largest memory allocated by Python during one run (tracemalloc)."""
+
+
+async def measure(runner: str, run: Callable[[], Awaitable[None]], repeat: int) -> SandboxTiming:
+    await run()  # Warm-up: the first run also imports the passed-through modules into the host.
+    durations, peaks = [], []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        await run()
+        durations.append((time.perf_counter() - started) * 1000)
+        tracemalloc.start()
+        await run()
+        peaks.append(tracemalloc.get_traced_memory()[1] / 1024)
+        tracemalloc.stop()
+    return SandboxTiming(runner, repeat, statistics.mean(durations), min(durations), statistics.mean(peaks))
+
+
+def sandbox_creation(runner: WorkflowRunner) -> Callable[[], Awaitable[None]]:
+    """Creates the sandboxed instances of the workflows, as a worker does for each new run."""
+    definitions = [_Definition.must_from_class(workflow) for workflow in WORKFLOWS]
+
+    async def run():
+        for definition in definitions:
+            runner.prepare_workflow(definition)
+
+    return run
+
+
+def history_replay(runner: WorkflowRunner, paths: List[str]) -> Callable[[], Awaitable[None]]:
+    replayer = new_replayer(runner)
+    histories = load_histories(paths)
+
+    async def run():
+        for history in histories:
+            await replayer.replay_workflow(history)
+
+    return run
+
+
+async def run_all(paths: List[str], repeat: int) -> List[SandboxTiming]:
+    timings = []
+    for name, new_runner in RUNNERS.items():
+        if name == "unsandboxed" and not paths:
+            continue  # Nothing to create without a sandbox.
+        runner = new_runner()
+        run = history_replay(runner, paths) if paths else sandbox_creation(runner)
+        timings.append(await measure(name, run, repeat))
+    return timings
+
+
+def report(timings: List[SandboxTiming]):
+    print(f"{'runner':<12} {'runs':>5} {'mean ms':>9} {'min ms':>8} {'peak KiB':>9}")
+    for t in timings:
+        print(f"{t.runner:<12} {t.runs:>5} {t.mean_ms:>9.2f} {t.min_ms:>8.2f} {t.peak_kib:>9.0f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("paths", nargs="*", help="Histories to replay (files or directories)")
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+    report(asyncio.run(run_all(args.paths, args.repeat)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,10 @@
+import pytest
+
+from benchmarks.import_time import ENTRYPOINTS, budget_for, profile_import
+
+
+@pytest.mark.parametrize("module", ENTRYPOINTS)
+def test_cold_import_within_budget(module):
+    profile = profile_import(module)
+    slowest = ", ".join(f"{name}={micros / 1e6:.3f}s" for name, micros in profile.top(5))
+    assert profile.seconds <= budget_for(module), f"{module} took {profile.seconds:.3f}s ({slowest})"
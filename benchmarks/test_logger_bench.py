@@ -0,0 +1,6 @@
+from logger import get_logger
+
+
+def test_bench_get_logger(benchmark):
+    logger = benchmark(get_logger, "benchmarks.logger")
+    assert logger.name == "benchmarks.logger"
@@ -0,0 +1,79 @@
+"""
+Cost of one activity result or workflow output through Temporal's payload converters.
+
+The default converter writes models through `.dict()` and reads them back as dicts, which the
+workflow then rebuilt into models by hand; the pydantic converter reads them straight into the
+type hint. Both write the same JSON, so histories recorded with either one replay with the other.
+"""
+import warnings
+
+import pytest
+from temporalio.contrib.pydantic import pydantic_data_converter
+from temporalio.converter import default
+
+from models.ledger import AgentRunResult, AgentUsage, UsageLedger
+from models.structured_output import (
+    AnalysisSummary,
+    FinancialReportData,
+    FinancialReportWorkflowOutput,
+    FinancialSearchItem,
+    FinancialSearchPlan,
+    VerificationResult,
+)
+
+USAGE = AgentUsage(model="mistral-small-latest", input_tokens=1200, output_tokens=400, cost_usd=0.00024, seconds=3.2)
+
+
+@pytest.fixture(scope="module")
+def workflow_output(large_report_json, search_results) -> FinancialReportWorkflowOutput:
+    ledger = UsageLedger()
+    for stage in ["ANALYST", "PLANNER", *["SEARCH"] * len(search_results), "RISK", "FUNDAMENTALS", "WRITER", "VERIFIER"]:
+        ledger.record(stage, USAGE)
+    return FinancialReportWorkflowOutput(
+        search_plan=FinancialSearchPlan(searches=[FinancialSearchItem(reason="r", query=f"q{i}") for i in range(len(search_results))]),
+        report=FinancialReportData.model_validate_json(large_report_json),
+        verification=VerificationResult(verified=True, issues=""),
+        risk_analysis=search_results[0],
+        fundamentals_analysis=search_results[1],
+        price_analysis=search_results[2],
+        search_results=search_results,
+        ledger=ledger,
+    )
+
+
+def _default_round_trip(value, model_class):
+    converter = default().payload_converter
+    with warnings.catch_warnings():
+        # The default converter falls back to pydantic's deprecated `.dict()`.
+        warnings.simplefilter("ignore")
+        payloads = converter.to_payloads([value])
+    decoded, = converter.from_payloads(payloads)
+    return model_class(**decoded)
+
+
+def _pydantic_round_trip(value, type_hint):
+    converter = pydantic_data_converter.payload_converter
+    decoded, = converter.from_payloads(converter.to_payloads([value]), [type_hint])
+    return decoded
+
+
+def test_bench_default_converter_search_result(benchmark, search_results):
+    value = AgentRunResult(output=search_results[0], usage=USAGE)
+    result = benchmark(_default_round_trip, value, AgentRunResult[AnalysisSummary])
+    assert result.output == search_results[0]
+
+
+def test_bench_pydantic_converter_search_result(benchmark, search_results):
+    value = AgentRunResult(output=search_results[0], usage=USAGE)
+    result = benchmark(_pydantic_round_trip, value, AgentRunResult[AnalysisSummary])
+    assert result.output == search_results[0]
+
+
+def test_bench_default_converter_workflow_output(benchmark, workflow_output):
+    result = benchmark(_default_round_trip, workflow_output, FinancialReportWorkflowOutput)
+    assert result == workflow_output
+
+
+def test_bench_pydantic_converter_workflow_output(benchmark, workflow_output):
+    result = benchmark(_pydantic_round_trip, workflow_output, FinancialReportWorkflowOutput)
+    assert result == workflow_output
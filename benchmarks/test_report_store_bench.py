@@ -0,0 +1,61 @@
+import random
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from models.structured_output import (
+    AnalysisSummary,
+    FinancialReportData,
+    FinancialReportWorkflowOutput,
+    FinancialSearchPlan,
+    VerificationResult,
+)
+from tasks.utils.report_store import ReportStore
+
+# About a year of reports for a coverage list of ~10 tickers at ~15 reports a day.
+N_REPORTS = 5000
+TICKERS = ["NVDA", "AAPL", "MSFT", "AMZN", "GOOGL", "META", "TSLA", "AMD", "INTC", "ORCL"]
+T0 = datetime(2025, 1, 1, tzinfo=timezone.utc)
+
+
+def _text(rng: random.Random, n: int) -> str:
+    return " ".join(f"term{int(rng.paretovariate(1.2)) % 5000}" for _ in range(n))
+
+
+@pytest.fixture(scope="module")
+def store(tmp_path_factory) -> ReportStore:
+    rng = random.Random(0)
+    store = ReportStore(str(tmp_path_factory.mktemp("reports") / "reports.sqlite"))
+    for i in range(N_REPORTS):
+        ticker = TICKERS[i % len(TICKERS)]
+        summary = AnalysisSummary(summary=_text(rng, 60))
+        output = FinancialReportWorkflowOutput(
+            search_plan=FinancialSearchPlan(searches=[]),
+            report=FinancialReportData(
+                short_summary=f"{ticker} datacenter revenue guidance {_text(rng, 40)}",
+                markdown_report=f"# {ticker}\n\n{_text(rng, 1500)}",
+                follow_up_questions=[],
+            ),
+            verification=VerificationResult(verified=True, issues=""),
+            risk_analysis=summary,
+            fundamentals_analysis=summary,
+            price_analysis=summary,
+            search_results=[AnalysisSummary(summary=_text(rng, 200)) for _ in range(5)],
+        )
+        store.save(f"wf-{i}", f"Analyze {ticker}", output, T0 + timedelta(hours=2 * i))
+    return store
+
+
+def test_bench_get(benchmark, store):
+    report = benchmark(store.get, "wf-4247")
+    assert report.tickers == ["AMD"]
+
+
+def test_bench_search_text(benchmark, store):
+    hits = benchmark(store.search, "datacenter term7 term123")
+    assert hits
+
+
+def test_bench_search_ticker_and_date(benchmark, store):
+    hits = benchmark(store.search, ticker="NVDA", since=T0 + timedelta(days=300))
+    assert hits and all(hit.tickers == ["NVDA"] for hit in hits)
@@ -0,0 +1,29 @@
+from tasks.utils.retry_llm_call import (
+    _parse_retry_after_header,
+    _should_retry,
+    http_response_to_application_error,
+)
+
+
+def test_bench_parse_retry_after_header(benchmark, http_responses):
+    def parse_all():
+        return [_parse_retry_after_header(response.headers) for response in http_responses]
+
+    delays = benchmark(parse_all)
+    assert delays[0] == 1.5
+
+
+def test_bench_should_retry(benchmark, http_responses):
+    def classify_all():
+        return [_should_retry(response) for response in http_responses]
+
+    decisions = benchmark(classify_all)
+    assert decisions[-1][0] is False
+
+
+def test_bench_http_response_to_application_error(benchmark, http_responses):
+    def convert_all():
+        return [http_response_to_application_error(response) for response in http_responses]
+
+    errors = benchmark(convert_all)
+    assert errors[-1].non_retryable is True
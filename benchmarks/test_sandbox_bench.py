@@ -0,0 +1,24 @@
+import asyncio
+
+import pytest
+from temporalio.worker.workflow_sandbox import SandboxedWorkflowRunner
+
+from benchmarks.sandbox import sandbox_creation
+from tasks.utils.common import workflow_runner
+
+
+@pytest.fixture
+def loop():
+    loop = asyncio.new_event_loop()
+    yield loop
+    loop.close()
+
+
+def test_bench_default_sandbox_creation(benchmark, loop):
+    run = sandbox_creation(SandboxedWorkflowRunner())
+    benchmark(lambda: loop.run_until_complete(run()))
+
+
+def test_bench_tuned_sandbox_creation(benchmark, loop):
+    run = sandbox_creation(workflow_runner())
+    benchmark(lambda: loop.run_until_complete(run()))
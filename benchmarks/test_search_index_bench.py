@@ -0,0 +1,57 @@
+import random
+
+import pytest
+
+from mcp_server.search_index import SearchIndex
+from models.search import CorpusDocument
+
+# A corpus the size of a few years of filings and transcripts for a coverage list of ~50 tickers.
+N_DOCUMENTS = 5000
+WORDS_PER_DOCUMENT = 800
+VOCABULARY_SIZE = 20000
+TICKERS = ["NVDA", "AAPL", "MSFT", "AMZN", "GOOGL", "META", "TSLA", "AMD", "INTC", "ORCL"]
+
+
+def _corpus(n: int, seed: int = 0) -> list[CorpusDocument]:
+    rng = random.Random(seed)
+    vocabulary = [f"term{i}" for i in range(VOCABULARY_SIZE)]
+    weights = [1 / (rank + 1) for rank in range(VOCABULARY_SIZE)]  # Zipf-like, like natural text
+    documents = []
+    for i in range(n):
+        ticker = TICKERS[i % len(TICKERS)]
+        words = rng.choices(vocabulary, weights, k=WORDS_PER_DOCUMENT)
+        documents.append(CorpusDocument(
+            id=f"doc-{i}",
+            title=f"{ticker} 10-Q {2020 + i % 5}",
+            text=f"{ticker} revenue guidance datacenter " + " ".join(words),
+            source="filings",
+        ))
+    return documents
+
+
+@pytest.fixture(scope="module")
+def corpus() -> list[CorpusDocument]:
+    return _corpus(N_DOCUMENTS)
+
+
+@pytest.fixture(scope="module")
+def index(corpus, tmp_path_factory) -> SearchIndex:
+    index = SearchIndex(tmp_path_factory.mktemp("index"))
+    index.add(corpus)
+    return index
+
+
+def test_bench_index_build(benchmark, corpus, tmp_path_factory):
+    def build():
+        SearchIndex(tmp_path_factory.mktemp("build")).add(corpus)
+
+    benchmark.pedantic(build, rounds=3, iterations=1)
+
+
+def test_bench_query(benchmark, index):
+    hits = benchmark(index.search, "NVDA datacenter revenue guidance term42 term1337")
+    assert hits and hits[0].title.startswith("NVDA")
+
+
+def test_bench_query_rare_terms(benchmark, index):
+    benchmark(index.search, "term15001 term17777 term19999")
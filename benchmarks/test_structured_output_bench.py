@@ -0,0 +1,40 @@
+import json
+
+from models.structured_output import (
+    FinancialReportData,
+    RESPONSE_FORMAT_REGISTRY,
+    _add_additional_properties_false,
+    format_search_results,
+    get_mistral_response_format,
+)
+
+
+def test_bench_get_mistral_response_format_report(benchmark):
+    result = benchmark(get_mistral_response_format, "FinancialReportData")
+    assert result["json_schema"]["schema"]["additionalProperties"] is False
+
+
+def test_bench_get_mistral_response_format_search_plan(benchmark):
+    result = benchmark(get_mistral_response_format, "FinancialSearchPlan")
+    assert result["json_schema"]["name"] == "FinancialSearchPlan"
+
+
+def test_bench_add_additional_properties_false(benchmark, nested_schema):
+    # The function mutates its input, so every round gets a fresh copy.
+    result = benchmark.pedantic(
+        _add_additional_properties_false,
+        setup=lambda: ((json.loads(nested_schema),), {}),
+        rounds=200,
+    )
+    assert result["additionalProperties"] is False
+
+
+def test_bench_registry_validate_large_report(benchmark, large_report_json):
+    model_class = RESPONSE_FORMAT_REGISTRY["FinancialReportData"]
+    report = benchmark(model_class.model_validate_json, large_report_json)
+    assert isinstance(report, FinancialReportData)
+
+
+def test_bench_format_search_results(benchmark, search_results):
+    formatted = benchmark(format_search_results, search_results)
+    assert formatted.count("## Finding") == len(search_results)
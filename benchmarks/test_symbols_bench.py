@@ -0,0 +1,16 @@
+from mcp_server.symbols import get_symbol_table
+
+
+def test_bench_resolve_exact_name(benchmark):
+    table = get_symbol_table()
+    assert benchmark(table.resolve, "Nvidia")[0].ticker == "NVDA"
+
+
+def test_bench_resolve_prefix(benchmark):
+    table = get_symbol_table()
+    assert benchmark(table.resolve, "berksh")[0].ticker == "BRK-B"
+
+
+def test_bench_resolve_misspelling(benchmark):
+    table = get_symbol_table()
+    assert benchmark(table.resolve, "Mircosoft")[0].ticker == "MSFT"
@@ -0,0 +1,33 @@
+import logfire
+import pytest
+
+from agents import telemetry
+from agents.telemetry import GenAIEvent, cap_attribute
+from config import settings
+
+
+@pytest.fixture
+def local_logfire(monkeypatch):
+    # Export through a local, non-sending logfire instance: the global configuration is left untouched.
+    instance = logfire.configure(local=True, send_to_logfire=False, console=False)
+    monkeypatch.setattr(telemetry, "_export", lambda message, attributes: instance.info(message, **attributes))
+    return instance
+
+
+def test_bench_cap_attribute_large_output(benchmark, search_results):
+    value, truncation = benchmark(cap_attribute, search_results, settings.genai_telemetry_max_attribute_bytes)
+    assert truncation["bytes"] > settings.genai_telemetry_max_attribute_bytes
+
+
+def test_bench_genai_event_emit_and_export(benchmark, local_logfire, large_report_json, search_results):
+    def emit():
+        event = GenAIEvent(
+            "Responses API",
+            {
+                "gen_ai.input.messages": large_report_json,
+                "gen_ai.output.messages": search_results,
+            },
+        )
+        event.emit()
+
+    benchmark(emit)
@@ -1,3 +1,5 @@
+from typing import Dict, Literal
+
 from dotenv import load_dotenv
 from pydantic import Field, computed_field
 from pydantic_settings import BaseSettings
@@ -10,15 +12,107 @@ class Settings(BaseSettings):
     mistral_api_key:        str | None = Field(None, alias="MISTRAL_API_KEY")
     temporal_server_url:    str | None = Field(..., alias="TEMPORAL_SERVER_URL")
     task_queue_url:         str | None = Field("financial-research-task-queue", alias="TASK_QUEUE_URL")
+    worker_metrics_port:    int = Field(9464, alias="WORKER_METRICS_PORT")
+    # Task queue of batch workflows; interactive ones use TASK_QUEUE_URL.
+    batch_task_queue:       str = Field("financial-research-batch-task-queue", alias="BATCH_TASK_QUEUE")
+    # MCP transport used by the agents: "sse" or stateless "streamable-http" (needed when the MCP server runs several workers).
+    mcp_transport:          Literal["sse", "streamable-http"] = Field("sse", alias="MCP_TRANSPORT")
+
+    # Agent activities stop heartbeating and fail (retryably) after this long without streaming progress, 0 disables it.
+    activity_stall_seconds:                  float = Field(120.0, alias="ACTIVITY_STALL_SECONDS")
+
+    # Maximum number of workflow results fetched concurrently by the list endpoint.
+    workflow_results_concurrency:            int = Field(10, alias="WORKFLOW_RESULTS_CONCURRENCY")
+
+    # gen_ai telemetry: head sampling rate, slow calls and errors are always kept.
+    genai_telemetry_sample_rate:             float = Field(1.0, alias="GENAI_TELEMETRY_SAMPLE_RATE")
+    genai_telemetry_slow_call_seconds:       float = Field(30.0, alias="GENAI_TELEMETRY_SLOW_CALL_SECONDS")
+    genai_telemetry_max_attribute_bytes:     int = Field(8192, alias="GENAI_TELEMETRY_MAX_ATTRIBUTE_BYTES")
+
+    # Spans and events waiting to be exported by logfire, beyond this they are dropped (telemetry_spans_dropped_total).
+    telemetry_export_queue_size:             int = Field(2048, alias="TELEMETRY_EXPORT_QUEUE_SIZE")
+
+    # Per-agent latency log written by the workers, and whether activity timeouts are derived from it.
+    agent_latency_log:                       str | None = Field(None, alias="AGENT_LATENCY_LOG")
+    adaptive_activity_profiles:              bool = Field(False, alias="ADAPTIVE_ACTIVITY_PROFILES")
+
+    # Worker slots per lane, and per-tenant quotas of the batch lane (running workflows, and LLM calls per worker process).
+    # Quota rejections are retried: batch activities get TENANT_QUOTA_MAX_REJECTIONS extra attempts and retry delays.
+    interactive_max_concurrent_activities:   int = Field(50, alias="INTERACTIVE_MAX_CONCURRENT_ACTIVITIES")
+    batch_max_concurrent_activities:         int = Field(20, alias="BATCH_MAX_CONCURRENT_ACTIVITIES")
+    tenant_max_running_workflows:            int = Field(10, alias="TENANT_MAX_RUNNING_WORKFLOWS")
+    tenant_max_concurrent_llm_calls:         int = Field(4, alias="TENANT_MAX_CONCURRENT_LLM_CALLS")
+    tenant_quota_retry_seconds:              float = Field(5.0, alias="TENANT_QUOTA_RETRY_SECONDS")
+    tenant_quota_max_rejections:             int = Field(12, alias="TENANT_QUOTA_MAX_REJECTIONS")
+
+    # Admission control of new workflows: when running workflows or the activity backlog age of a lane exceed their limits,
+    # requests wait in a bounded queue ("queue"), are refused with 429 ("reject") or run with fewer searches ("degrade").
+    admission_policy:                        Literal["queue", "reject", "degrade"] = Field("queue", alias="ADMISSION_POLICY")
+    admission_max_running_workflows:         int = Field(200, alias="ADMISSION_MAX_RUNNING_WORKFLOWS")
+    admission_max_backlog_age_seconds:       float = Field(10.0, alias="ADMISSION_MAX_BACKLOG_AGE_SECONDS")
+    admission_max_pending:                   int = Field(100, alias="ADMISSION_MAX_PENDING")
+    admission_queue_timeout_seconds:         float = Field(20.0, alias="ADMISSION_QUEUE_TIMEOUT_SECONDS")
+    admission_refresh_seconds:               float = Field(1.0, alias="ADMISSION_REFRESH_SECONDS")
+    admission_retry_after_seconds:           int = Field(10, alias="ADMISSION_RETRY_AFTER_SECONDS")
+    admission_degraded_max_searches:         int = Field(2, alias="ADMISSION_DEGRADED_MAX_SEARCHES")
+
+    # Default budget of a workflow (tokens across its agents, seconds since it started), for queries without one.
+    # Past it, the workflow skips its optional stages: extra searches and the verifier.
+    workflow_max_tokens:                     int | None = Field(None, alias="WORKFLOW_MAX_TOKENS")
+    workflow_max_seconds:                    float | None = Field(None, alias="WORKFLOW_MAX_SECONDS")
+
+    # Circuit breakers shared by the activities of a worker process, per dependency.
+    circuit_breaker_failure_threshold:       int = Field(5, alias="CIRCUIT_BREAKER_FAILURE_THRESHOLD")
+    circuit_breaker_window_seconds:          float = Field(30.0, alias="CIRCUIT_BREAKER_WINDOW_SECONDS")
+    circuit_breaker_cooldown_seconds:        float = Field(30.0, alias="CIRCUIT_BREAKER_COOLDOWN_SECONDS")
+    circuit_breaker_half_open_max_calls:     int = Field(1, alias="CIRCUIT_BREAKER_HALF_OPEN_MAX_CALLS")
+
+    # Opt-in cache of deterministic agent conversations (agents with a cache TTL), memory LRU + optional SQLite file.
+    conversation_cache_enabled:              bool = Field(False, alias="CONVERSATION_CACHE_ENABLED")
+    conversation_cache_max_entries:          int = Field(1024, alias="CONVERSATION_CACHE_MAX_ENTRIES")
+    conversation_cache_path:                 str | None = Field(None, alias="CONVERSATION_CACHE_PATH")
+
+    # Local full-text index served by the financials MCP server, and whether the search agent uses it before web search.
+    search_index_path:                       str | None = Field(None, alias="SEARCH_INDEX_PATH")
+    search_local_corpus:                     bool = Field(False, alias="SEARCH_LOCAL_CORPUS")
+
+    # Opt-in SQLite file of completed reports, written by the workers and read by the API (same host or shared volume).
+    report_store_path:                       str | None = Field(None, alias="REPORT_STORE_PATH")
+
+    # Budget of a paginated MCP tool response (about 4 bytes per token); the rest is served through a cursor.
+    mcp_response_max_bytes:                  int = Field(16000, alias="MCP_RESPONSE_MAX_BYTES")
+
+    # Symbol table of the ticker resolver (CSV: ticker,name,exchange,aliases), the bundled one when unset.
+    symbols_path:                            str | None = Field(None, alias="SYMBOLS_PATH")
+
+    # How long a created Mistral agent is reused by later workflows on the same worker.
+    agent_cache_ttl_seconds:                 float = Field(600.0, alias="AGENT_CACHE_TTL_SECONDS")
+
+    # Model per tier (agents pick a tier), and the model a call falls back to when rate limited.
+    model_tiers:                             Dict[str, str] = Field({
+        "small": "mistral-small-latest",
+        "medium": "mistral-medium-2505",
+        "large": "mistral-large-latest",
+    }, alias="MODEL_TIERS")
+    model_fallbacks:                         Dict[str, str] = Field({
+        "mistral-large-latest": "mistral-medium-2505",
+        "mistral-medium-2505": "mistral-small-latest",
+        "mistral-medium-latest": "mistral-small-latest",
+        "mistral-small-latest": "ministral-8b-latest",
+    }, alias="MODEL_FALLBACKS")
+
+    @property
+    def _mcp_endpoint(self) -> str:
+        return "sse" if self.mcp_transport == "sse" else "mcp"
 
     @computed_field
     @property
     def financials_mcp_url(self) -> str:
-        return f"{self.mcp_server_url}/financials/sse"
+        return f"{self.mcp_server_url}/financials/{self._mcp_endpoint}"
 
     @computed_field
     @property
     def prices_mcp_url(self) -> str:
-        return f"{self.mcp_server_url}/prices/sse"
+        return f"{self.mcp_server_url}/prices/{self._mcp_endpoint}"
 
 settings = Settings()
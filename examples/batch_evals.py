@@ -0,0 +1,168 @@
+"""
+Batch evaluation of research reports with DeepEval (Faithfulness and Bias).
+
+Reports are read from JSON files holding a `FinancialReportWorkflowOutput` (optionally with
+the original `query`), as returned by the API. Every report/metric pair is scored
+concurrently under a concurrency cap, and verdicts are cached by content hash so reports
+that did not change are not re-scored. Usage:
+
+    PYTHONPATH=. uv run --env-file .env examples/batch_evals.py reports/*.json --concurrency 8 --output eval_summary.md
+"""
+import argparse
+import asyncio
+import json
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List
+
+from pydantic import BaseModel
+
+from agents.cache import TTLCache, cache_key
+from models.structured_output import FinancialReportWorkflowOutput
+
+JUDGE_MODEL = "mistral/mistral-large-latest"
+CACHE_TTL_SECONDS = 30 * 24 * 3600
+
+
+class EvalCase(BaseModel):
+    name: str
+    input: str
+    actual_output: str
+    retrieval_context: List[str]
+
+
+class EvalResult(BaseModel):
+    case: str
+    metric: str
+    score: float | None
+    success: bool | None
+    reason: str | None = None
+    error: str | None = None
+    cached: bool = False
+
+
+def load_cases(paths: Iterable[str]) -> List[EvalCase]:
+    """Evaluation cases from stored workflow outputs: the report against the search results it was written from."""
+    cases = []
+    for path in map(Path, paths):
+        data = json.loads(path.read_text())
+        output = FinancialReportWorkflowOutput.model_validate(data)
+        cases.append(EvalCase(
+            name=path.stem,
+            input=data.get("query") or output.report.short_summary,
+            actual_output=output.report.markdown_report,
+            retrieval_context=[result.summary for result in output.search_results],
+        ))
+    return cases
+
+
+def deepeval_metrics() -> Dict[str, Callable[[], Any]]:
+    """Factories of the DeepEval metrics; metrics keep per-measurement state, so each measurement gets its own."""
+    from deepeval.metrics import BiasMetric, FaithfulnessMetric
+    from deepeval.models import LiteLLMModel
+
+    from config import settings
+
+    judge = LiteLLMModel(
+        model=JUDGE_MODEL,
+        api_key=settings.mistral_api_key,
+        temperature=0,
+        generation_kwargs={
+            "max_tokens": 2000,
+            "response_format": {"type": "json_object"},
+        }
+    )
+    return {
+        "faithfulness": lambda: FaithfulnessMetric(threshold=0.7, model=judge, include_reason=True, async_mode=True),
+        "bias": lambda: BiasMetric(threshold=0.5, model=judge, include_reason=True, async_mode=True),
+    }
+
+
+def _test_case(case: EvalCase):
+    from deepeval.test_case import LLMTestCase
+
+    return LLMTestCase(input=case.input, actual_output=case.actual_output, retrieval_context=case.retrieval_context)
+
+
+async def run_batch(
+        cases: List[EvalCase],
+        metrics: Dict[str, Callable[[], Any]],
+        cache: TTLCache,
+        concurrency: int = 8,
+        make_test_case: Callable[[EvalCase], Any] = _test_case,
+) -> List[EvalResult]:
+    """
+    Score every case with every metric, at most `concurrency` measurements at a time.
+
+    Args:
+        cases: Reports to evaluate
+        metrics: Metric name to a factory of fresh metric instances
+        cache: Verdict cache, keyed by metric, judge model and case content
+        concurrency: Maximum number of concurrent measurements (judge LLM calls)
+        make_test_case: Builds the object passed to `metric.a_measure`
+
+    Returns:
+        One result per case and metric; failed measurements carry the error and are not cached.
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def measure(case: EvalCase, name: str) -> EvalResult:
+        async def compute() -> Dict[str, Any]:
+            async with semaphore:
+                metric = metrics[name]()
+                await metric.a_measure(make_test_case(case))
+                return {"score": metric.score, "success": metric.success, "reason": metric.reason}
+
+        key = cache_key(name, JUDGE_MODEL, case.input, case.actual_output, case.retrieval_context)
+        try:
+            verdict, cached = await cache.get_or_compute(key, CACHE_TTL_SECONDS, compute)
+        except Exception as e:
+            return EvalResult(case=case.name, metric=name, score=None, success=None, error=str(e))
+        return EvalResult(case=case.name, metric=name, cached=cached, **verdict)
+
+    return await asyncio.gather(*[measure(case, name) for case in cases for name in metrics])
+
+
+def summary_table(results: List[EvalResult]) -> str:
+    """Markdown table of the results followed by the pass rate and mean score per metric."""
+    lines = ["| Report | Metric | Score | Passed | Cached | Reason |", "|---|---|---|---|---|---|"]
+    for result in results:
+        score = f"{result.score:.2f}" if result.score is not None else "-"
+        passed = {True: "yes", False: "no", None: "error"}[result.success]
+        reason = (result.error or result.reason or "").replace("|", "/").replace("\n", " ")
+        lines.append(f"| {result.case} | {result.metric} | {score} | {passed} | {'yes' if result.cached else 'no'} | {reason} |")
+
+    lines += ["", "| Metric | Reports | Passed | Mean score | Errors |", "|---|---|---|---|---|"]
+    for name in dict.fromkeys(result.metric for result in results):
+        scored = [r for r in results if r.metric == name and r.score is not None]
+        errors = sum(1 for r in results if r.metric == name and r.error)
+        passed = sum(1 for r in scored if r.success)
+        mean = sum(r.score for r in scored) / len(scored) if scored else 0.
+        lines.append(f"| {name} | {len(scored) + errors} | {passed} | {mean:.2f} | {errors} |")
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("reports", nargs="+", help="JSON files holding a FinancialReportWorkflowOutput")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--cache", default="examples/.eval_cache.sqlite")
+    parser.add_argument("--output", default="eval_summary.md")
+    args = parser.parse_args()
+
+    cases = load_cases(args.reports)
+    cache = TTLCache(max_entries=len(cases) * 2 + 1, path=args.cache)
+
+    started = time.perf_counter()
+    results = asyncio.run(run_batch(cases, deepeval_metrics(), cache, args.concurrency))
+    elapsed = time.perf_counter() - started
+
+    table = summary_table(results)
+    Path(args.output).write_text(table + "\n")
+    print(table)
+    cached = sum(result.cached for result in results)
+    print(f"\n{len(cases)} reports, {len(results)} measurements ({cached} cached) in {elapsed:.1f}s -> {args.output}")
+
+
+if __name__ == "__main__":
+    main()
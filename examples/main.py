@@ -4,6 +4,7 @@ from tasks.utils.common import get_temporal_client
 from tasks.workflows.financial_agents import FinancialResearchWorkflow
 from models.agents import QueryModel
 from config import settings
+from observability import configure_logfire
 
 from logger import get_logger
 logger = get_logger(__name__)
@@ -20,12 +21,13 @@ async def main():
     logger.info(f"Starting financial research for: {query}")
     logger.info("This may take several minutes to complete...\n")
 
-    result = await client.execute_workflow(
-        FinancialResearchWorkflow.run,
-        args=[QueryModel(query=query)],
-        id=f"financial-research-{hash(query)}",
-        task_queue=settings.task_queue_url,
-    )
+    with configure_logfire().span("Financial research: {query}", query=query):
+        result = await client.execute_workflow(
+            FinancialResearchWorkflow.run,
+            args=[QueryModel(query=query, search_local_corpus=settings.search_local_corpus)],
+            id=f"financial-research-{hash(query)}",
+            task_queue=settings.task_queue_url,
+        )
 
     print(result)
 
@@ -38,6 +38,19 @@ def force_all_loggers_to_use_root_handler():
             logger.propagate = True
 
 
+_configured = False
+
+
+def configure_logging(force: bool = False):
+    """Apply LOGGING_CONFIG once per process (or again when force=True)."""
+    global _configured
+    if _configured and not force:
+        return
+    logging.config.dictConfig(LOGGING_CONFIG)
+    force_all_loggers_to_use_root_handler()
+    _configured = True
+
+
 def get_logger(service_name: str) -> logging.Logger:
     """
     Get a configured logger for the given service.
@@ -48,7 +61,6 @@ def get_logger(service_name: str) -> logging.Logger:
     Returns:
         Configured logger instance
     """
-    logging.config.dictConfig(LOGGING_CONFIG)
-    force_all_loggers_to_use_root_handler()
+    configure_logging()
     logger = logging.getLogger(service_name)
     return logger
\ No newline at end of file
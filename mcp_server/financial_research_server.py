@@ -1,6 +1,15 @@
+from functools import cache
+
 from mcp.server.fastmcp import FastMCP
+from pydantic import TypeAdapter
+
+from config import settings
+from mcp_server.search_index import SearchIndex
+from metrics import instrument_tool
+from models.search import CorpusSearchHit
 
-mcp = FastMCP("Financial Research Server")
+# Stateless, JSON responses: any worker process can answer any streamable HTTP request.
+mcp = FastMCP("Financial Research Server", stateless_http=True, json_response=True)
 
 @mcp.prompt()
 def financials_prompt():
@@ -34,7 +43,10 @@ def search_prompt():
     "You are a research assistant specializing in financial topics. "
     "Given a search term, use web search to retrieve up‑to‑date context and "
     "produce a short summary of at most 300 words. Focus on key numbers, events, "
-    "or quotes that will be useful to a financial analyst."
+    "or quotes that will be useful to a financial analyst. "
+    "If the search_local_corpus tool is available, call it first: when it returns relevant "
+    "passages (filings, transcripts, prior research), answer from them and only use web "
+    "search for what they do not cover."
 )
 
 @mcp.prompt()
@@ -68,3 +80,30 @@ def writer_prompt():
         "You may call additional analysis tools (e.g., fundamentals_analysis, risk_analysis) if deeper "
         "specialist insights are needed beyond the provided payloads."
     )
+
+_HITS = TypeAdapter(list[CorpusSearchHit])
+
+@cache
+def get_search_index() -> SearchIndex | None:
+    return SearchIndex(settings.search_index_path) if settings.search_index_path else None
+
+@mcp.tool()
+@instrument_tool("financials")
+async def search_local_corpus(query: str, limit: int = 5) -> str:
+    """
+    Use this function to search our local corpus of 10-K/10-Q filings, earnings call transcripts
+    and prior research summaries before searching the web.
+
+    Args:
+        query (str): Keywords to search for, e.g. a company name or ticker and a topic.
+        limit (int): Maximum number of passages to return. Defaults to 5.
+
+    Returns:
+        str: JSON list of matching documents (title, source, score, snippet), best first.
+             An empty list means nothing relevant is held locally.
+    """
+    index = get_search_index()
+    if index is None:
+        return "[]"
+    index.refresh()
+    return _HITS.dump_json(index.search(query, limit)).decode()
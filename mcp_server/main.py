@@ -1,20 +1,51 @@
-from fastapi import FastAPI
+import os
 
-import logfire
+# Skip pydantic's plugin scan at start-up, see tasks/worker.py.
+os.environ.setdefault("PYDANTIC_DISABLE_PLUGINS", "__all__")
 
-from mcp_server.financial_research_server import mcp as mcp_financial_server
-from mcp_server.prices_analysis_server import mcp as prices_server
-from config import settings
-from logger import get_logger
+from contextlib import AsyncExitStack, asynccontextmanager  # noqa: E402
+
+from fastapi import FastAPI  # noqa: E402
+from mcp.server.fastmcp import FastMCP  # noqa: E402
+from starlette.applications import Starlette  # noqa: E402
+
+from mcp_server.financial_research_server import mcp as mcp_financial_server  # noqa: E402
+from mcp_server.prices_analysis_server import mcp as prices_server  # noqa: E402
+from metrics import mark_process_dead, metrics_endpoint  # noqa: E402
+from logger import get_logger  # noqa: E402
+from observability import configure_logfire  # noqa: E402
 
 logger = get_logger(__name__)
 
 try:
-    logfire.configure(token=settings.logfire_token, service_name='server')
-    logfire.instrument_mcp()
+    configure_logfire(service_name='server').instrument_mcp()
 except Exception as e:
     logger.warning(e)
 
-app = FastAPI()
-app.mount("/financials", mcp_financial_server.sse_app())
-app.mount("/prices", prices_server.sse_app())
+SERVERS = {"/financials": mcp_financial_server, "/prices": prices_server}
+
+
+def mcp_app(server: FastMCP) -> Starlette:
+    """
+    Both transports of a FastMCP server: SSE (`/sse`, `/messages/`) and stateless streamable HTTP (`/mcp`).
+
+    SSE ties a client to the process holding its stream; streamable HTTP requests are
+    independent, so the server can run with several uvicorn workers behind a load balancer.
+    """
+    return Starlette(routes=[*server.sse_app().routes, *server.streamable_http_app().routes])
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Mounted apps do not get lifespan events: run the streamable HTTP session managers here.
+    async with AsyncExitStack() as stack:
+        for server in SERVERS.values():
+            await stack.enter_async_context(server.session_manager.run())
+        stack.callback(mark_process_dead)
+        yield
+
+
+app = FastAPI(lifespan=lifespan)
+app.add_route("/metrics", metrics_endpoint, include_in_schema=False)
+for path, server in SERVERS.items():
+    app.mount(path, mcp_app(server))
@@ -1,15 +1,29 @@
+from typing import List
+
 from mcp.server.fastmcp import FastMCP
-import yfinance as yf
+from pydantic import TypeAdapter
+
+from mcp_server.responses import call_key, frame_records, paginate
+from mcp_server.symbols import get_symbol_table
+from metrics import instrument_tool
+from models.symbols import PriceSummary, SymbolMatch
 
-mcp = FastMCP("Financial Research Server")
+# yfinance (and pandas behind it) is imported inside the tools: it is only needed when a tool
+# is called and dominates the server's import time otherwise.
+
+# Stateless, JSON responses: any worker process can answer any streamable HTTP request.
+mcp = FastMCP("Financial Research Server", stateless_http=True, json_response=True)
 
 @mcp.prompt()
 def price_analyst_prompt():
     return (
         "You are a stock price analyst. When given a company name, you should:\n"
-        "1. Determine the stock ticker symbol (e.g., 'Nvidia' -> 'NVDA')\n"
-        "2. Use get_current_stock_price to fetch the current price\n"
-        "3. Use get_historical_stock_prices to analyze recent trends (default 1mo)\n"
+        "1. Call resolve_ticker with the company name to get its ticker symbol (e.g., 'Nvidia' -> 'NVDA'); "
+        "use the first candidate unless the context clearly points to another one\n"
+        "2. Call get_price_summary once with all the tickers you need (the company and any peers) to get "
+        "their latest close and change over the period (default 1mo)\n"
+        "3. Use get_historical_stock_prices or get_current_stock_price only when you need more detail; "
+        "large results come in pages: read the summary first and pass next_cursor only if you need more rows\n"
         "4. Provide a concise analysis including:\n"
         "   - Current price\n"
         "   - Recent trend (up/down, percentage change)\n"
@@ -22,6 +36,7 @@ def price_analyst_prompt():
     )
 
 @mcp.tool()
+@instrument_tool("prices")
 async def get_current_stock_price(symbol: str) -> str:
     """
     Use this function to get the current stock price for a given symbol.
@@ -32,6 +47,8 @@ async def get_current_stock_price(symbol: str) -> str:
     Returns:
         str: The current stock price or error message.
     """
+    import yfinance as yf
+
     try:
         stock = yf.Ticker(symbol)
         current_price = stock.info.get("regularMarketPrice", stock.info.get("currentPrice"))
@@ -40,7 +57,8 @@ async def get_current_stock_price(symbol: str) -> str:
         return f"Error fetching current price for {symbol}: {e}"
 
 @mcp.tool()
-async def get_historical_stock_prices(symbol: str, period: str = "1mo", interval: str = "1d") -> str:
+@instrument_tool("prices")
+async def get_historical_stock_prices(symbol: str, period: str = "1mo", interval: str = "1d", cursor: str | None = None) -> str:
     """
     Use this function to get the historical stock price for a given symbol.
 
@@ -50,31 +68,126 @@ async def get_historical_stock_prices(symbol: str, period: str = "1mo", interval
                       Valid periods: 1d,5d,1mo,3mo,6mo,1y,2y,5y,10y,ytd,max
         interval (str): The interval between data points. Defaults to "1d".
                         Valid intervals: 1d,5d,1wk,1mo,3mo
+        cursor (str): next_cursor of the previous page, to get the following rows. Omit for the first page.
 
     Returns:
-        str: The historical stock price or error message.
+        str: JSON page of price rows (Date, Open, High, Low, Close, Volume, ...) oldest first, with a
+             summary of the whole period (last close, change %, high, low) on the first page and a
+             next_cursor while rows remain, or an error message.
     """
+    import yfinance as yf
+
     try:
         stock = yf.Ticker(symbol)
-        historical_price = stock.history(period=period, interval=interval)
-        return historical_price.to_json(orient="index")
+        historical_price = stock.history(period=period, interval=interval).round(4)
+        summary = _summarize(symbol, historical_price["Close"].dropna()).model_dump(exclude_none=True)
+        return paginate(
+            frame_records(historical_price),
+            call_key("get_historical_stock_prices", symbol, period, interval),
+            cursor,
+            summary=summary,
+        )
     except Exception as e:
         return f"Error fetching historical prices for {symbol}: {e}"
 
 @mcp.tool()
-async def get_analyst_recommendations(symbol: str) -> str:
+@instrument_tool("prices")
+async def get_analyst_recommendations(symbol: str, cursor: str | None = None) -> str:
     """
     Use this function to get analyst recommendations for a given stock symbol.
 
     Args:
         symbol (str): The stock symbol.
+        cursor (str): next_cursor of the previous page, to get the following rows. Omit for the first page.
 
     Returns:
-        str: JSON containing analyst recommendations or error message.
+        str: JSON page of recommendation counts per period (most recent first), with the most recent
+             row as summary on the first page and a next_cursor while rows remain, or an error message.
     """
+    import yfinance as yf
+
     try:
         stock = yf.Ticker(symbol)
-        recommendations = stock.recommendations
-        return recommendations.to_json(orient="index")
+        records = frame_records(stock.recommendations)
+        return paginate(
+            records,
+            call_key("get_analyst_recommendations", symbol),
+            cursor,
+            summary={"symbol": symbol, "latest": records[0] if records else None},
+        )
     except Exception as e:
         return f"Error fetching analyst recommendations for {symbol}: {e}"
+
+_MATCHES = TypeAdapter(List[SymbolMatch])
+_SUMMARIES = TypeAdapter(List[PriceSummary])
+
+@mcp.tool()
+@instrument_tool("prices")
+async def resolve_ticker(company: str, limit: int = 5) -> str:
+    """
+    Use this function to find the ticker symbol of a company before calling any price tool.
+
+    Args:
+        company (str): Company name, brand, alias or ticker, e.g. "Nvidia", "Google", "Berkshire".
+        limit (int): Maximum number of candidates. Defaults to 5.
+
+    Returns:
+        str: JSON list of candidates (ticker, name, exchange, score, match), best first.
+             A score of 1 is an exact match; an empty list means the company is not in the table.
+    """
+    return _MATCHES.dump_json(get_symbol_table().resolve(company, limit)).decode()
+
+def _summarize(symbol: str, closes) -> PriceSummary:
+    if closes is None or closes.empty:
+        return PriceSummary(symbol=symbol, error="No price data")
+    first, last = float(closes.iloc[0]), float(closes.iloc[-1])
+    return PriceSummary(
+        symbol=symbol,
+        last_close=round(last, 4),
+        change_pct=round((last / first - 1) * 100, 2) if first else None,
+        high=round(float(closes.max()), 4),
+        low=round(float(closes.min()), 4),
+        start=closes.index[0].strftime("%Y-%m-%d"),
+        end=closes.index[-1].strftime("%Y-%m-%d"),
+    )
+
+def price_summaries(history, symbols: List[str]) -> List[PriceSummary]:
+    """Summaries of a `yfinance.download` frame, one per symbol (columns grouped by ticker)."""
+    summaries = []
+    for symbol in symbols:
+        try:
+            closes = history[symbol]["Close"].dropna()
+        except KeyError:
+            closes = None
+        summaries.append(_summarize(symbol, closes))
+    return summaries
+
+@mcp.tool()
+@instrument_tool("prices")
+async def get_price_summary(symbols: List[str], period: str = "1mo") -> str:
+    """
+    Use this function to get the latest close and the trend of several stocks in one call.
+
+    Args:
+        symbols (list[str]): Ticker symbols, e.g. ["NVDA", "AMD"].
+        period (str): Period of the trend. Defaults to "1mo".
+                      Valid periods: 5d,1mo,3mo,6mo,1y,2y,5y,10y,ytd,max
+
+    Returns:
+        str: JSON list with, per symbol, the last close, the change over the period in percent,
+             the period's high and low closes and its first and last trading days, or an error.
+    """
+    import yfinance as yf
+
+    symbols = list(dict.fromkeys(symbol.strip().upper() for symbol in symbols if symbol.strip()))
+    if not symbols:
+        return "[]"
+    try:
+        # One request for all symbols instead of one per symbol.
+        history = yf.download(
+            symbols, period=period, interval="1d", group_by="ticker",
+            auto_adjust=True, progress=False, threads=False, multi_level_index=True,
+        )
+    except Exception as e:
+        return f"Error fetching prices for {', '.join(symbols)}: {e}"
+    return _SUMMARIES.dump_json(price_summaries(history, symbols)).decode()
@@ -0,0 +1,93 @@
+"""
+Size-bounded, paginated MCP tool responses.
+
+Tools that can return large tables (price histories, recommendations) return a page of
+records that fits in `MCP_RESPONSE_MAX_BYTES`, a summary of the whole table on the first
+page, and a cursor for the next page. Cursors are stateless: they encode the offset and a
+fingerprint of the call, and the tool recomputes its table when called with one, so any
+server process can serve any page.
+"""
+import base64
+import hashlib
+import json
+from typing import Any, Dict, List
+
+from config import settings
+
+_SEPARATORS = (",", ":")
+
+
+def call_key(*parts: Any) -> str:
+    """Fingerprint of a tool call; a cursor is only valid for calls with the same arguments."""
+    return hashlib.sha256(json.dumps(parts, default=str).encode()).hexdigest()[:16]
+
+
+def encode_cursor(offset: int, key: str) -> str:
+    return base64.urlsafe_b64encode(json.dumps({"offset": offset, "key": key}, separators=_SEPARATORS).encode()).decode()
+
+
+def decode_cursor(cursor: str, key: str) -> int:
+    """Offset encoded in the cursor; ValueError when it is malformed or was issued for another call."""
+    try:
+        data = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        offset, cursor_key = int(data["offset"]), data["key"]
+    except (ValueError, KeyError, TypeError) as e:
+        raise ValueError(f"Invalid cursor: {e}") from e
+    if cursor_key != key or offset < 0:
+        raise ValueError("Invalid cursor: it was issued for a call with other arguments")
+    return offset
+
+
+def frame_records(frame) -> List[Dict[str, Any]]:
+    """Records of a pandas DataFrame, index included, with ISO dates and NaN as null."""
+    return json.loads(frame.reset_index().to_json(orient="records", date_format="iso"))
+
+
+def _size(value: Any) -> int:
+    return len(json.dumps(value, separators=_SEPARATORS, default=str).encode())
+
+
+def paginate(
+        records: List[Dict[str, Any]],
+        key: str,
+        cursor: str | None = None,
+        summary: Dict[str, Any] | None = None,
+        max_bytes: int | None = None,
+) -> str:
+    """
+    JSON page of `records` starting at the cursor, within `max_bytes`.
+
+    Args:
+        records: The whole result, recomputed for every page
+        key: Fingerprint of the call, see `call_key`
+        cursor: `next_cursor` of the previous page, None for the first page
+        summary: Overview of all the records, only sent with the first page
+        max_bytes: Response budget, MCP_RESPONSE_MAX_BYTES by default
+
+    Returns:
+        {"summary", "total", "offset", "items", "next_cursor"}; at least one record per page
+        so paging always progresses, next_cursor is null on the last page.
+
+    Raises:
+        ValueError: The cursor is malformed or was issued for another call.
+    """
+    max_bytes = max_bytes or settings.mcp_response_max_bytes
+    offset = decode_cursor(cursor, key) if cursor else 0
+    page = {
+        "summary": summary if offset == 0 else None,
+        "total": len(records),
+        "offset": offset,
+        "items": [],
+        "next_cursor": encode_cursor(len(records), key),
+    }
+    used = _size(page)
+    end = offset
+    while end < len(records):
+        record_size = _size(records[end]) + (1 if end > offset else 0)
+        if end > offset and used + record_size > max_bytes:
+            break
+        used += record_size
+        end += 1
+    page["items"] = records[offset:end]
+    page["next_cursor"] = encode_cursor(end, key) if end < len(records) else None
+    return json.dumps(page, separators=_SEPARATORS, default=str)
@@ -0,0 +1,264 @@
+"""
+Local full-text index of filings, transcripts and prior research, ranked with BM25.
+
+The index is a directory of immutable segments, one per ingestion batch, listed in
+`segments.json`, which writers update under an exclusive lock on `segments.lock`. Each segment holds:
+
+- `<name>.postings`: (document, term frequency) pairs as native uint32, memory-mapped at query time
+- `<name>.text`: the documents' UTF-8 text, memory-mapped to build snippets
+- `<name>.json`: term dictionary (offset and document count of each posting list) and document table
+
+Ingesting a document whose id already exists shadows the older copy. Usage:
+
+    PYTHONPATH=. uv run python -m mcp_server.search_index ingest data/filings/*.txt --index data/index
+"""
+import argparse
+import fcntl
+import heapq
+import json
+import math
+import mmap
+import os
+import re
+import uuid
+from array import array
+from collections import Counter
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Tuple
+
+from models.search import CorpusDocument, CorpusSearchHit
+
+K1 = 1.2
+B = 0.75
+SNIPPET_CHARS = 400
+
+_TOKEN = re.compile(r"[a-z0-9]+(?:\.[0-9]+)?")
+STOPWORDS = frozenset(
+    "a an and are as at be by for from has have in is it its of on or that the this to was were will with".split()
+)
+
+
+def tokenize(text: str) -> List[str]:
+    return [token for token in _TOKEN.findall(text.lower()) if token not in STOPWORDS]
+
+
+def _mmap(path: Path) -> mmap.mmap | None:
+    if path.stat().st_size == 0:
+        return None
+    with open(path, "rb") as f:
+        return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+class Segment:
+    def __init__(self, directory: Path, name: str):
+        self.name = name
+        meta = json.loads((directory / f"{name}.json").read_text())
+        self.terms: Dict[str, Tuple[int, int]] = {term: tuple(entry) for term, entry in meta["terms"].items()}
+        self.docs: List[dict] = meta["docs"]
+        self.lengths: List[int] = [doc["length"] for doc in self.docs]
+        self._postings = _mmap(directory / f"{name}.postings")
+        self._text = _mmap(directory / f"{name}.text")
+        self.shadowed: set[int] = set()
+        """Documents replaced by a newer segment."""
+
+    def postings(self, term: str) -> memoryview | None:
+        """Interleaved (document, term frequency) pairs of a term."""
+        entry = self.terms.get(term)
+        if entry is None or self._postings is None:
+            return None
+        offset, n_docs = entry
+        return memoryview(self._postings).cast("I")[offset:offset + 2 * n_docs]
+
+    def text(self, doc: int) -> str:
+        offset, length = self.docs[doc]["text"]
+        return self._text[offset:offset + length].decode("utf-8") if self._text is not None else ""
+
+    @classmethod
+    def write(cls, directory: Path, documents: List[CorpusDocument]) -> str:
+        name = f"segment-{uuid.uuid4().hex[:12]}"
+        inverted: Dict[str, List[Tuple[int, int]]] = {}
+        docs = []
+        text_offset = 0
+        with open(directory / f"{name}.text", "wb") as text_file:
+            for doc_number, document in enumerate(documents):
+                tokens = tokenize(f"{document.title} {document.text}")
+                for term, frequency in Counter(tokens).items():
+                    inverted.setdefault(term, []).append((doc_number, frequency))
+                encoded = document.text.encode("utf-8")
+                text_file.write(encoded)
+                docs.append({
+                    "id": document.id,
+                    "title": document.title,
+                    "source": document.source,
+                    "length": len(tokens),
+                    "text": [text_offset, len(encoded)],
+                })
+                text_offset += len(encoded)
+
+        terms = {}
+        postings = array("I")
+        for term in sorted(inverted):
+            terms[term] = [len(postings), len(inverted[term])]
+            for doc_number, frequency in inverted[term]:
+                postings.extend((doc_number, frequency))
+        with open(directory / f"{name}.postings", "wb") as f:
+            postings.tofile(f)
+        (directory / f"{name}.json").write_text(json.dumps({"terms": terms, "docs": docs}))
+        return name
+
+
+class SearchIndex:
+    def __init__(self, directory: str | Path):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.segments: List[Segment] = []
+        self._manifest_mtime: float | None = None
+        self._n_docs = 0
+        self._avg_length = 1.
+        self.refresh()
+
+    @property
+    def _manifest(self) -> Path:
+        return self.directory / "segments.json"
+
+    @contextmanager
+    def _manifest_lock(self) -> Iterator[None]:
+        """Exclusive lock of the manifest across processes, held while it is read, modified and replaced."""
+        with open(self.directory / "segments.lock", "a") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+    def refresh(self):
+        """Reload the segment list when another process ingested documents."""
+        if not self._manifest.exists():
+            return
+        mtime = self._manifest.stat().st_mtime
+        if mtime == self._manifest_mtime:
+            return
+        loaded = {segment.name: segment for segment in self.segments}
+        names = json.loads(self._manifest.read_text())
+        self.segments = [loaded.get(name) or Segment(self.directory, name) for name in names]
+        self._manifest_mtime = mtime
+
+        # Newest copy of a document wins.
+        seen = set()
+        for segment in reversed(self.segments):
+            segment.shadowed = {n for n, doc in enumerate(segment.docs) if doc["id"] in seen}
+            seen.update(doc["id"] for doc in segment.docs)
+
+        live = [
+            doc["length"]
+            for segment in self.segments
+            for n, doc in enumerate(segment.docs)
+            if n not in segment.shadowed
+        ]
+        self._n_docs = len(live)
+        self._avg_length = sum(live) / len(live) if live and sum(live) else 1.
+
+    def add(self, documents: Iterable[CorpusDocument]) -> int:
+        """Ingest documents as a new segment, returns how many were added."""
+        documents = list(documents)
+        if not documents:
+            return 0
+        name = Segment.write(self.directory, documents)
+        with self._manifest_lock():
+            # Read the manifest again rather than trusting self.segments, which misses the segments
+            # other processes ingested since the last refresh.
+            names = json.loads(self._manifest.read_text()) if self._manifest.exists() else []
+            tmp = self._manifest.with_suffix(".tmp")
+            tmp.write_text(json.dumps(names + [name]))
+            os.replace(tmp, self._manifest)
+        self._manifest_mtime = None
+        self.refresh()
+        return len(documents)
+
+    def __len__(self) -> int:
+        return self._n_docs
+
+    def search(self, query: str, limit: int = 5) -> List[CorpusSearchHit]:
+        terms = set(tokenize(query))
+        n_docs, avg_length = self._n_docs, self._avg_length
+        if not terms or not n_docs:
+            return []
+
+        document_frequency = {
+            term: sum(segment.terms[term][1] for segment in self.segments if term in segment.terms)
+            for term in terms
+        }
+        scores: Dict[Tuple[int, int], float] = {}
+        for segment_number, segment in enumerate(self.segments):
+            for term in terms:
+                postings = segment.postings(term)
+                if postings is None:
+                    continue
+                df = document_frequency[term]
+                idf = math.log(1 + (n_docs - df + 0.5) / (df + 0.5))
+                lengths = segment.lengths
+                shadowed = segment.shadowed
+                for doc, frequency in zip(postings[0::2], postings[1::2]):
+                    if shadowed and doc in shadowed:
+                        continue
+                    norm = K1 * (1 - B + B * lengths[doc] / avg_length)
+                    key = (segment_number, doc)
+                    scores[key] = scores.get(key, 0.) + idf * frequency * (K1 + 1) / (frequency + norm)
+
+        hits = []
+        for (segment_number, doc), score in heapq.nlargest(limit, scores.items(), key=lambda item: item[1]):
+            segment = self.segments[segment_number]
+            meta = segment.docs[doc]
+            hits.append(CorpusSearchHit(
+                id=meta["id"],
+                title=meta["title"],
+                source=meta["source"],
+                score=round(score, 4),
+                snippet=_snippet(segment.text(doc), terms),
+            ))
+        return hits
+
+
+def _snippet(text: str, terms: set[str]) -> str:
+    lowered = text.lower()
+    positions = [position for term in terms if (position := lowered.find(term)) >= 0]
+    start = max(min(positions, default=0) - SNIPPET_CHARS // 4, 0)
+    return text[start:start + SNIPPET_CHARS].strip()
+
+
+def read_documents(paths: Iterable[str]) -> Iterable[CorpusDocument]:
+    """Documents from .jsonl files (one CorpusDocument per line) and text/markdown files (one document each)."""
+    for path in map(Path, paths):
+        if path.suffix == ".jsonl":
+            with open(path) as f:
+                for line in f:
+                    if line.strip():
+                        yield CorpusDocument.model_validate_json(line)
+        else:
+            yield CorpusDocument(id=str(path), title=path.stem, text=path.read_text(), source=str(path.parent))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    ingest = subparsers.add_parser("ingest", help="Add documents to the index as a new segment")
+    ingest.add_argument("paths", nargs="+")
+    ingest.add_argument("--index", default=os.environ.get("SEARCH_INDEX_PATH", "data/index"))
+    query = subparsers.add_parser("search", help="Query the index")
+    query.add_argument("query")
+    query.add_argument("--index", default=os.environ.get("SEARCH_INDEX_PATH", "data/index"))
+    query.add_argument("--limit", type=int, default=5)
+    args = parser.parse_args()
+
+    index = SearchIndex(args.index)
+    if args.command == "ingest":
+        added = index.add(read_documents(args.paths))
+        print(f"Ingested {added} documents, {len(index)} in the index")
+    else:
+        for hit in index.search(args.query, args.limit):
+            print(f"{hit.score:8.3f}  {hit.title}  ({hit.id})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,189 @@
+"""
+Company name to ticker resolution over a local symbol table.
+
+The table is a CSV (`ticker,name,exchange,aliases`, aliases separated by `|`) ordered by
+importance, e.g. market cap: when several companies match equally well, the first listed wins.
+Names and aliases are normalised (case, punctuation, legal suffixes) and indexed twice:
+- a prefix trie over every word-starting suffix of each name, for "nvid" -> NVIDIA and
+  "dynamics" -> General Dynamics
+- a trigram index, for misspellings such as "Nvidea" or "Mircosoft"
+"""
+import csv
+import re
+from collections import Counter
+from dataclasses import dataclass, field
+from functools import cache
+from pathlib import Path
+from typing import Dict, Iterable, List, Tuple
+
+from config import settings
+from models.symbols import SymbolMatch
+
+DEFAULT_SYMBOLS_PATH = Path(__file__).parent / "data" / "symbols.csv"
+
+# Candidates kept per trie node; the table order decides which ones.
+_TOP_K = 16
+_MIN_FUZZY_SIMILARITY = 0.4
+_LEGAL_SUFFIXES = {
+    "inc", "incorporated", "corp", "corporation", "co", "company", "ltd", "limited", "plc", "llc", "lp",
+    "holding", "holdings", "group", "sa", "nv", "ag", "se", "as", "the",
+}
+_SHARE_CLASS = re.compile(r"\bclass [a-z]\b")
+_NOT_ALPHANUMERIC = re.compile(r"[^a-z0-9]+")
+
+
+def normalize(name: str) -> str:
+    """'The Coca-Cola Company' -> 'coca cola', 'Novo Nordisk A/S' -> 'novo nordisk'."""
+    name = name.casefold().replace("&", " and ").replace(".", "").replace("'", "").replace("/", "")
+    name = _SHARE_CLASS.sub(" ", name)
+    words = _NOT_ALPHANUMERIC.sub(" ", name).split()
+    kept = [word for word in words if word not in _LEGAL_SUFFIXES]
+    return " ".join(kept or words)
+
+
+def _trigrams(key: str) -> Counter:
+    padded = f"  {key} "
+    return Counter(padded[i:i + 3] for i in range(len(padded) - 2))
+
+
+@dataclass
+class Symbol:
+    ticker: str
+    name: str
+    exchange: str | None = None
+    aliases: List[str] = field(default_factory=list)
+
+
+class _Node:
+    __slots__ = ("children", "candidates")
+
+    def __init__(self):
+        self.children: Dict[str, "_Node"] = {}
+        # Symbol index -> (length of its shortest key through this node, whether the prefix starts that key)
+        self.candidates: Dict[int, Tuple[int, bool]] = {}
+
+
+class SymbolTable:
+    """Ranked ticker candidates for a company name, alias or ticker, in microseconds."""
+
+    def __init__(self, symbols: Iterable[Symbol]):
+        self.symbols = list(symbols)
+        self._tickers: Dict[str, int] = {}
+        self._exact: Dict[str, List[int]] = {}
+        self._root = _Node()
+        self._keys: List[Tuple[str, int]] = []
+        self._trigram_postings: Dict[str, List[int]] = {}
+        self._trigram_counts: List[int] = []
+
+        for i, symbol in enumerate(self.symbols):
+            self._tickers.setdefault(symbol.ticker.upper(), i)
+            keys = dict.fromkeys(filter(None, map(normalize, [symbol.name, *symbol.aliases])))
+            for key in keys:
+                self._exact.setdefault(key, []).append(i)
+                self._insert(key, i)
+                trigrams = _trigrams(key)
+                for trigram in trigrams:
+                    self._trigram_postings.setdefault(trigram, []).append(len(self._keys))
+                self._trigram_counts.append(sum(trigrams.values()))
+                self._keys.append((key, i))
+
+    @classmethod
+    def from_csv(cls, path: str | Path) -> "SymbolTable":
+        with open(path, newline="", encoding="utf-8") as f:
+            return cls(
+                Symbol(
+                    ticker=row["ticker"].strip(),
+                    name=row["name"].strip(),
+                    exchange=(row.get("exchange") or "").strip() or None,
+                    aliases=[alias.strip() for alias in (row.get("aliases") or "").split("|") if alias.strip()],
+                )
+                for row in csv.DictReader(f)
+            )
+
+    def __len__(self) -> int:
+        return len(self.symbols)
+
+    def _insert(self, key: str, index: int):
+        starts = [0] + [m.end() for m in re.finditer(" ", key)]
+        for start in starts:
+            node = self._root
+            for char in key[start:]:
+                node = node.children.setdefault(char, _Node())
+                known = node.candidates.get(index)
+                if known is not None:
+                    node.candidates[index] = (min(known[0], len(key)), known[1] or start == 0)
+                elif len(node.candidates) < _TOP_K:
+                    node.candidates[index] = (len(key), start == 0)
+
+    def _prefix(self, query: str) -> Dict[int, float]:
+        node = self._root
+        for char in query:
+            node = node.children.get(char)
+            if node is None:
+                return {}
+        # Longer prefixes of shorter names score higher; matches inside a name score lower.
+        return {
+            index: (0.7 if initial else 0.6) + 0.25 * len(query) / key_length
+            for index, (key_length, initial) in node.candidates.items()
+        }
+
+    def _fuzzy(self, query: str) -> Dict[int, float]:
+        trigrams = _trigrams(query)
+        size = sum(trigrams.values())
+        shared: Counter = Counter()
+        for trigram, count in trigrams.items():
+            for key_index in self._trigram_postings.get(trigram, ()):
+                shared[key_index] += count
+        scores: Dict[int, float] = {}
+        for key_index, common in shared.items():
+            similarity = 2 * common / (size + self._trigram_counts[key_index])
+            if similarity >= _MIN_FUZZY_SIMILARITY:
+                index = self._keys[key_index][1]
+                scores[index] = max(scores.get(index, 0.), 0.8 * similarity)
+        return scores
+
+    def resolve(self, query: str, limit: int = 5) -> List[SymbolMatch]:
+        """
+        Best ticker candidates for a company name, alias or ticker.
+
+        Args:
+            query: "Nvidia", "nvda", "$NVDA", "Berkshire Hathaway", "Mircosoft", ...
+            limit: Maximum number of candidates
+
+        Returns:
+            Candidates by decreasing score: 1 for an exact ticker or name, at most 0.95 for a
+            prefix of a name and 0.8 for a misspelling.
+        """
+        matches: Dict[int, Tuple[float, str]] = {}
+
+        def add(scores: Dict[int, float], kind: str):
+            for index, score in scores.items():
+                if score > matches.get(index, (0., ""))[0]:
+                    matches[index] = (score, kind)
+
+        ticker = query.strip().lstrip("$").upper().replace(".", "-")
+        if ticker in self._tickers:
+            add({self._tickers[ticker]: 1.}, "ticker")
+        key = normalize(query)
+        if key:
+            add(dict.fromkeys(self._exact.get(key, ()), 1.), "name")
+            add(self._prefix(key), "prefix")
+            if len(matches) < limit or max(score for score, _ in matches.values()) < 1.:
+                add(self._fuzzy(key), "fuzzy")
+
+        ranked = sorted(matches.items(), key=lambda item: (-item[1][0], item[0]))[:limit]
+        return [
+            SymbolMatch(
+                ticker=self.symbols[index].ticker,
+                name=self.symbols[index].name,
+                exchange=self.symbols[index].exchange,
+                score=round(score, 3),
+                match=kind,
+            )
+            for index, (score, kind) in ranked
+        ]
+
+
+@cache
+def get_symbol_table() -> SymbolTable:
+    return SymbolTable.from_csv(settings.symbols_path or DEFAULT_SYMBOLS_PATH)
@@ -0,0 +1,206 @@
+import functools
+import os
+import time
+from typing import Any, Awaitable, Callable
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+    start_http_server,
+)
+
+# Prefix of the messages MCP tools return instead of raising.
+TOOL_ERROR_PREFIX = "Error "
+
+LLM_LATENCY_BUCKETS = (0.5, 1, 2, 5, 10, 20, 30, 45, 60, 90, 120, 180)
+TOOL_LATENCY_BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1, 2, 5, 10, 30)
+
+WORKFLOWS_STARTED = Counter(
+    "workflows_started_total",
+    "Workflows started through the API.",
+    ["workflow"],
+)
+WORKFLOWS_COMPLETED = Counter(
+    "workflows_completed_total",
+    "Workflow executions finished on this worker, by final status.",
+    ["workflow", "status"],
+)
+LLM_REQUEST_DURATION = Histogram(
+    "llm_request_duration_seconds",
+    "Latency of Mistral agent conversations.",
+    ["agent", "model", "operation"],
+    buckets=LLM_LATENCY_BUCKETS,
+)
+LLM_TOKENS = Counter(
+    "llm_tokens_total",
+    "Tokens consumed by Mistral agent conversations.",
+    ["agent", "model", "direction"],
+)
+LLM_COST = Counter(
+    "llm_cost_usd_total",
+    "Estimated cost of Mistral agent conversations, from per-model token prices.",
+    ["agent", "model"],
+)
+LLM_REROUTES = Counter(
+    "llm_reroutes_total",
+    "Calls re-run on another model, by target model and reason (rate_limited/invalid_output).",
+    ["agent", "model", "reason"],
+)
+ACTIVITY_RETRIES = Counter(
+    "activity_retries_total",
+    "Retryable activity failures, by ApplicationError type.",
+    ["activity", "reason"],
+)
+ACTIVITY_FAILURES = Counter(
+    "activity_non_retryable_failures_total",
+    "Non-retryable activity failures, by ApplicationError type.",
+    ["activity", "reason"],
+)
+CONVERSATION_RESUMES = Counter(
+    "conversation_resumes_total",
+    "Retried agent calls that picked up the conversation of the previous attempt, by operation and "
+    "outcome (completed: its output was reused, continued: its pending tool calls were run, restarted: nothing reusable).",
+    ["operation", "outcome"],
+)
+ACTIVITY_CANCELLATIONS = Counter(
+    "activity_cancellations_total",
+    "Activities cancelled while waiting on Mistral or MCP.",
+    ["activity"],
+)
+TENANT_QUOTA_REJECTIONS = Counter(
+    "tenant_quota_rejections_total",
+    "Batch workflows and LLM calls turned away by a tenant quota, by tenant and stage (workflow/llm_call).",
+    ["tenant", "stage"],
+)
+ADMISSION_DECISIONS = Counter(
+    "admission_decisions_total",
+    "Workflow start requests by admission decision (admitted/queued/degraded/rejected) and lane.",
+    ["decision", "lane"],
+)
+ADMISSION_PENDING = Gauge(
+    "admission_pending_requests",
+    "Start requests waiting in the admission queue.",
+    multiprocess_mode="livesum",
+)
+MCP_TOOL_DURATION = Histogram(
+    "mcp_tool_duration_seconds",
+    "Latency of MCP tool calls.",
+    ["server", "tool", "status"],
+    buckets=TOOL_LATENCY_BUCKETS,
+)
+MCP_TOOL_RESPONSE_BYTES = Histogram(
+    "mcp_tool_response_bytes",
+    "Size of MCP tool responses.",
+    ["server", "tool"],
+    buckets=(256, 1024, 4096, 16384, 65536, 262144, 1048576),
+)
+CACHE_REQUESTS = Counter(
+    "cache_requests_total",
+    "Cache lookups, by cache and result (hit/miss).",
+    ["cache", "result"],
+)
+CACHE_TOKENS_SAVED = Counter(
+    "cache_tokens_saved_total",
+    "Tokens not spent thanks to cached agent conversations.",
+    ["agent", "model", "direction"],
+)
+TELEMETRY_SPANS_DROPPED = Counter(
+    "telemetry_spans_dropped_total",
+    "Spans and log events (gen_ai events included) dropped because the telemetry export queue was full.",
+)
+
+CIRCUIT_BREAKER_STATE = Gauge(
+    "circuit_breaker_state",
+    "Circuit breaker state per dependency (0=closed, 1=half-open, 2=open).",
+    ["dependency"],
+    multiprocess_mode="livemax",
+)
+CIRCUIT_BREAKER_TRANSITIONS = Counter(
+    "circuit_breaker_transitions_total",
+    "Circuit breaker state transitions, by dependency and new state.",
+    ["dependency", "state"],
+)
+
+
+def record_llm_call(agent: str, model: str, operation: str, seconds: float,
+                    input_tokens: int | None = None, output_tokens: int | None = None,
+                    cost: float | None = None):
+    LLM_REQUEST_DURATION.labels(agent=agent, model=model, operation=operation).observe(seconds)
+    if input_tokens is not None:
+        LLM_TOKENS.labels(agent=agent, model=model, direction="input").inc(input_tokens)
+    if output_tokens is not None:
+        LLM_TOKENS.labels(agent=agent, model=model, direction="output").inc(output_tokens)
+    if cost is not None:
+        LLM_COST.labels(agent=agent, model=model).inc(cost)
+
+
+def record_cache_lookup(cache: str, hit: bool):
+    CACHE_REQUESTS.labels(cache=cache, result="hit" if hit else "miss").inc()
+
+
+def instrument_tool(server: str):
+    """
+    Decorator recording the latency and response size of an async MCP tool, to be placed under @mcp.tool().
+
+    Tools report failures to the model as a message starting with "Error " rather than raising,
+    so such results are recorded with status="error", like exceptions.
+    """
+    def decorator(fn: Callable[..., Awaitable[Any]]):
+        @functools.wraps(fn)
+        async def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            status = "ok"
+            try:
+                result = await fn(*args, **kwargs)
+                if isinstance(result, str):
+                    MCP_TOOL_RESPONSE_BYTES.labels(server=server, tool=fn.__name__).observe(len(result.encode()))
+                    if result.startswith(TOOL_ERROR_PREFIX):
+                        status = "error"
+                return result
+            except Exception:
+                status = "error"
+                raise
+            finally:
+                MCP_TOOL_DURATION.labels(server=server, tool=fn.__name__, status=status).observe(
+                    time.perf_counter() - started
+                )
+        return wrapper
+    return decorator
+
+
+def multiprocess_enabled() -> bool:
+    """Whether metrics are shared by the processes of a multi-worker server, through PROMETHEUS_MULTIPROC_DIR."""
+    return bool(os.environ.get("PROMETHEUS_MULTIPROC_DIR"))
+
+
+def metrics_registry() -> CollectorRegistry:
+    """Registry to expose: this process's metrics, or those of every worker in multiprocess mode."""
+    if not multiprocess_enabled():
+        return REGISTRY
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry)
+    return registry
+
+
+def mark_process_dead():
+    """Drop the live gauges of this process from the multiprocess metrics, when a server worker exits."""
+    if multiprocess_enabled():
+        multiprocess.mark_process_dead(os.getpid())
+
+
+async def metrics_endpoint(_request):
+    """Starlette/FastAPI route serving the Prometheus exposition format, aggregated over workers in multiprocess mode."""
+    from starlette.responses import Response
+
+    return Response(generate_latest(metrics_registry()), media_type=CONTENT_TYPE_LATEST)
+
+
+def start_metrics_server(port: int):
+    """Serve /metrics from a background thread, for processes without a web app (the worker)."""
+    start_http_server(port)
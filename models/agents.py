@@ -1,6 +1,7 @@
 from typing import Dict, Literal, List
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
+from .ledger import WorkflowBudget
 from .structured_output import ResponseFormatName
 
 MistralTools = Literal[
@@ -8,6 +9,20 @@ MistralTools = Literal[
     "image_generation", "web_search", "web_search_premium"
 ]
 
+ModelTier = Literal["small", "medium", "large"]
+
+Lane = Literal["interactive", "batch"]
+
+class ActivityProfile(BaseModel):
+    """Timeouts and retry policy of the activities running an agent."""
+    start_to_close_seconds:     float = 60.
+    schedule_to_close_seconds:  float = 300.
+    initial_interval_seconds:   float = 2.
+    backoff_coefficient:        float = 2.
+    maximum_interval_seconds:   float = 30.
+    maximum_attempts:           int = 10
+    heartbeat_seconds:          float = 20.
+
 class AgentCreationModel(BaseModel):
     id: str
 
@@ -16,6 +31,12 @@ class AgentRunInputModel(BaseModel):
     inputs:             str
     response_format:    ResponseFormatName | None = None
     mcp_server_url:     str | None = None
+    agent:              str | None = None
+    """Key of the agent in AGENTS_PARAMS, used to attribute latency."""
+    cache_ttl_seconds:  float | None = None
+    """How long the output may be reused for identical inputs, None disables caching."""
+    tenant:             str | None = None
+    """Tenant of the workflow, for per-tenant quotas."""
 
 class MistralAgentStaticParams(BaseModel):
     model:              str
@@ -27,6 +48,8 @@ class MistralAgentStaticParams(BaseModel):
     max_tokens:         int = 2048
     tools:              List[Dict[str, MistralTools]] | None = None
     response_format:    ResponseFormatName | None = None
+    activity_profile:   ActivityProfile = ActivityProfile()
+    cache_ttl_seconds:  float | None = None
 
 class MistralAgentDynamicParams(BaseModel):
     handoffs:           List[str] | None = None
@@ -36,6 +59,16 @@ class MistralAgentParams(MistralAgentDynamicParams, MistralAgentStaticParams):
 
 class QueryModel(BaseModel):
     query: str
+    tenant:     str | None = Field(None, pattern=r"^[A-Za-z0-9_.]{1,64}$")
+    """Who submitted the query; quotas are per tenant, queries without one share the default tenant."""
+    priority:   Lane = "interactive"
+    """Lane the workflow runs in: "interactive" has reserved worker capacity, "batch" is subject to tenant quotas."""
+    max_searches: int | None = Field(None, ge=1)
+    """Upper bound on the searches of the plan, set by admission control when it degrades a request."""
+    budget:     WorkflowBudget | None = None
+    """Tokens and time the workflow may spend before skipping optional stages; WORKFLOW_MAX_* when unset."""
+    search_local_corpus: bool | None = None
+    """Run the search agents with the MCP server's tools, local corpus first; SEARCH_LOCAL_CORPUS when unset."""
 
 class WorkflowIDModel(BaseModel):
     workflow_id: str
@@ -0,0 +1,90 @@
+from typing import Generic, List, TypeVar
+from pydantic import BaseModel, Field, computed_field, model_validator
+
+class AgentUsage(BaseModel):
+    model: str | None = None
+    """Model that produced the output (after any reroute)."""
+
+    input_tokens: int = 0
+    """Prompt tokens paid for by this activity; 0 when the output came from the cache or a previous attempt."""
+
+    output_tokens: int = 0
+    """Completion tokens paid for by this activity."""
+
+    cost_usd: float | None = None
+    """Estimated from per-model token prices, None for models without a price."""
+
+    seconds: float = 0.
+    """Wall-clock time of the activity attempt that returned the output."""
+
+    cached: bool = False
+    """The output came from the conversation cache."""
+
+OutputT = TypeVar("OutputT")
+
+class AgentRunResult(BaseModel, Generic[OutputT]):
+    output: OutputT
+    """The agent's output, validated against its response format."""
+
+    usage: AgentUsage | None = None
+    """None for results recorded before activities reported their usage."""
+
+    @model_validator(mode="before")
+    @classmethod
+    def _bare_output(cls, data):
+        # Histories recorded before activities reported their usage hold the bare output.
+        if isinstance(data, dict) and "output" not in data:
+            return {"output": data}
+        return data
+
+class LedgerEntry(AgentUsage):
+    stage: str
+    """Agent the activity ran (ANALYST, PLANNER, SEARCH, ...)."""
+
+class WorkflowBudget(BaseModel):
+    max_tokens: int | None = Field(None, ge=1)
+    """Input plus output tokens; past it, optional stages are skipped."""
+
+    max_seconds: float | None = Field(None, gt=0)
+    """Time since the workflow started; past it, optional stages are skipped."""
+
+class UsageLedger(BaseModel):
+    entries: List[LedgerEntry] = []
+    budget: WorkflowBudget | None = None
+    skipped: List[str] = []
+    """Optional stages skipped or shortened because the budget was exceeded."""
+
+    @computed_field
+    @property
+    def input_tokens(self) -> int:
+        return sum(entry.input_tokens for entry in self.entries)
+
+    @computed_field
+    @property
+    def output_tokens(self) -> int:
+        return sum(entry.output_tokens for entry in self.entries)
+
+    @computed_field
+    @property
+    def cost_usd(self) -> float:
+        return sum(entry.cost_usd or 0. for entry in self.entries)
+
+    @computed_field
+    @property
+    def activity_seconds(self) -> float:
+        """Time spent in activities, summed: more than the wall-clock time when they run in parallel."""
+        return sum(entry.seconds for entry in self.entries)
+
+    def record(self, stage: str, usage: AgentUsage):
+        self.entries.append(LedgerEntry(stage=stage, **usage.model_dump()))
+
+    def over_budget(self, elapsed_seconds: float) -> str | None:
+        """Why the budget is exceeded, None when it is not (or there is no budget)."""
+        if self.budget is None:
+            return None
+        tokens = self.input_tokens + self.output_tokens
+        if self.budget.max_tokens is not None and tokens >= self.budget.max_tokens:
+            return f"{tokens} tokens used of {self.budget.max_tokens}"
+        if self.budget.max_seconds is not None and elapsed_seconds >= self.budget.max_seconds:
+            return f"{elapsed_seconds:.0f}s elapsed of {self.budget.max_seconds:.0f}s"
+        return None
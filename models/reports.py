@@ -0,0 +1,35 @@
+from datetime import datetime
+from typing import List
+
+from pydantic import BaseModel
+
+from .structured_output import FinancialReportWorkflowOutput
+
+class StoredReport(BaseModel):
+    workflow_id: str
+    query: str
+    tenant: str | None = None
+    tickers: List[str]
+    """Tickers mentioned by the query and the report, upper case."""
+
+    created_at: datetime
+    output: FinancialReportWorkflowOutput
+
+class ReportSearchHit(BaseModel):
+    workflow_id: str
+    query: str
+    tickers: List[str]
+    created_at: datetime
+    short_summary: str
+    score: float
+    """BM25 rank of the report for the search text (lower is better), 0 without search text."""
+
+    snippet: str
+    """Passage of the report around the matching terms."""
+
+class SaveReportInput(BaseModel):
+    workflow_id: str
+    query: str
+    tenant: str | None = None
+    created_at: datetime
+    output: FinancialReportWorkflowOutput
@@ -0,0 +1,20 @@
+from pydantic import BaseModel
+
+class CorpusDocument(BaseModel):
+    id: str
+    """Stable identifier; ingesting a document with an existing id replaces it."""
+
+    title: str
+    text: str
+    source: str | None = None
+    """Where the document comes from (filing, transcript, prior research, ...)."""
+
+class CorpusSearchHit(BaseModel):
+    id: str
+    title: str
+    source: str | None = None
+    score: float
+    """BM25 score of the document for the query."""
+
+    snippet: str
+    """Passage around the first matching term."""
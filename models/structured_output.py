@@ -1,6 +1,8 @@
 from typing import Any, Dict, Literal, List
 from pydantic import BaseModel
 
+from .ledger import UsageLedger
+
 class AnalysisSummary(BaseModel):
     summary: str
     """Short text summary for this aspect of the analysis."""
@@ -88,11 +90,15 @@ def get_mistral_response_format(format_name: ResponseFormatName) -> Dict[str, An
 class FinancialReportWorkflowOutput(BaseModel):
     search_plan: FinancialSearchPlan
     report: FinancialReportData
-    verification: VerificationResult
+    verification: VerificationResult | None = None
+    """None when the verifier was skipped to stay within the workflow budget."""
+
     risk_analysis: AnalysisSummary
     fundamentals_analysis: AnalysisSummary
     price_analysis: AnalysisSummary
     search_results: List[AnalysisSummary]
+    ledger: UsageLedger | None = None
+    """Tokens, cost and time of each agent call; None for workflows that predate the ledger."""
 
 def format_search_results(results: List[AnalysisSummary]) -> str:
     """Format search results as clean, readable text for the agent."""
@@ -100,3 +106,29 @@ def format_search_results(results: List[AnalysisSummary]) -> str:
     for i, result in enumerate(results, 1):
         formatted += f"## Finding {i}\n{result.summary}\n\n"
     return formatted.strip()
+
+
+def _normalize(text: str) -> str:
+    return " ".join(text.split()).casefold()
+
+def dedupe_searches(plan: FinancialSearchPlan) -> FinancialSearchPlan:
+    """The plan without repeated queries (compared ignoring case and whitespace), in order."""
+    seen = set()
+    searches = []
+    for item in plan.searches:
+        key = _normalize(item.query)
+        if key and key not in seen:
+            seen.add(key)
+            searches.append(item)
+    return FinancialSearchPlan(searches=searches)
+
+def compact_search_results(results: List[AnalysisSummary]) -> List[AnalysisSummary]:
+    """Search results without empty or repeated summaries, in order."""
+    seen = set()
+    compacted = []
+    for result in results:
+        key = _normalize(result.summary)
+        if key and key not in seen:
+            seen.add(key)
+            compacted.append(result)
+    return compacted
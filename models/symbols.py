@@ -0,0 +1,26 @@
+from typing import Literal
+
+from pydantic import BaseModel
+
+class SymbolMatch(BaseModel):
+    ticker: str
+    name: str
+    exchange: str | None = None
+    score: float
+    """1 for an exact ticker or name, lower for prefixes and misspellings."""
+
+    match: Literal["ticker", "name", "prefix", "fuzzy"]
+
+class PriceSummary(BaseModel):
+    symbol: str
+    last_close: float | None = None
+    change_pct: float | None = None
+    """Change of the close over the period, in percent."""
+
+    high: float | None = None
+    low: float | None = None
+    start: str | None = None
+    end: str | None = None
+    """First and last trading days of the period (YYYY-MM-DD)."""
+
+    error: str | None = None
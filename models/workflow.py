@@ -0,0 +1,91 @@
+from datetime import datetime
+from typing import List, Literal
+from pydantic import BaseModel
+
+from .structured_output import FinancialReportWorkflowOutput
+
+class StageTiming(BaseModel):
+    stage: str
+    """Activities scheduled by the same workflow task, named after their summaries."""
+
+    activities: int
+    """Number of activities in the stage."""
+
+    critical_activity_id: str
+    """The activity that closed last and therefore gated the next stage."""
+
+    queue_wait_seconds: float
+    """Schedule-to-start time of the critical activity (includes earlier attempts and backoff when attempts > 1)."""
+
+    execution_seconds: float
+    """Start-to-close time of the critical activity's last attempt."""
+
+    attempts: int
+    """Attempts made by the critical activity."""
+
+    max_queue_wait_seconds: float
+    """Worst schedule-to-start time across the stage's activities."""
+
+class HistoryCost(BaseModel):
+    events: int
+    """Events in the workflow history."""
+
+    remote_activities: int
+    """Activities dispatched through the task queue."""
+
+    local_activities: int
+    """Local activities run in the workflow's worker, each recorded as a single marker event."""
+
+    events_saved: int
+    """Events avoided by the local activities (scheduled, started and closed events, minus the marker)."""
+
+    queue_wait_saved_seconds: float
+    """Local activities times the median schedule-to-start time of the workflow's remote activities."""
+
+class CriticalPathSummary(BaseModel):
+    workflow_id: str
+    status: str
+    total_seconds: float
+    """Wall-clock time from workflow start to close (or to now while running)."""
+
+    queue_wait_seconds: float
+    """Time the critical path spent waiting for a worker to pick activities up."""
+
+    execution_seconds: float
+    """Time the critical path spent executing activities (LLM and tool calls)."""
+
+    orchestration_seconds: float
+    """Remaining time: workflow tasks, replays and gaps between stages."""
+
+    stages: List[StageTiming]
+    history: HistoryCost | None = None
+
+WorkflowStatusName = Literal["running", "completed", "failed", "cancelled", "terminated", "continued_as_new", "timed_out"]
+
+class WorkflowStatus(BaseModel):
+    workflow_id: str
+    run_id: str
+    status: WorkflowStatusName
+    stage: str | None = None
+    """Last stage the workflow reported in its memo (create_agents, planner, search, ...)."""
+
+    query: str | None = None
+    tenant: str | None = None
+    priority: str | None = None
+    """Lane the workflow was started in (interactive/batch)."""
+
+    start_time: datetime
+    close_time: datetime | None = None
+    duration_seconds: float
+    """Start to close, or to now while running."""
+
+    result: FinancialReportWorkflowOutput | None = None
+    """Only set for completed workflows whose result was requested."""
+
+    result_error: str | None = None
+    """Why the requested result could not be fetched; the rest of the page is unaffected."""
+
+class WorkflowStatusPage(BaseModel):
+    workflows: List[WorkflowStatus]
+    next_page_token: str | None = None
+    """Opaque token of the next page, None on the last page."""
@@ -0,0 +1,119 @@
+import os
+from functools import cache
+from typing import Any, Iterator
+
+from config import settings
+from logger import get_logger
+
+logger = get_logger(__name__)
+
+SERVICE_NAME = "mistral-mcp-temporal"
+
+_logfire = None
+
+
+def configure_logfire(service_name: str = SERVICE_NAME):
+    """
+    Configure logfire once per process and return the module.
+
+    logfire is imported here rather than at module level so that processes only pay for it
+    (and for the exporter setup) when telemetry is actually used. Its export queue holds
+    TELEMETRY_EXPORT_QUEUE_SIZE spans, overflows are counted in telemetry_spans_dropped_total.
+
+    Args:
+        service_name: Service name reported to logfire, ignored once logfire is configured
+
+    Returns:
+        The logfire module
+    """
+    global _logfire
+    if _logfire is not None:
+        return _logfire
+
+    import logfire
+    from opentelemetry import trace
+    from opentelemetry.sdk.environment_variables import OTEL_BSP_MAX_EXPORT_BATCH_SIZE, OTEL_BSP_MAX_QUEUE_SIZE
+
+    # logfire creates its batch span processor itself, which reads its bounds from the standard OTel variables.
+    queue_size = settings.telemetry_export_queue_size
+    os.environ[OTEL_BSP_MAX_QUEUE_SIZE] = str(queue_size)
+    os.environ[OTEL_BSP_MAX_EXPORT_BATCH_SIZE] = str(min(512, queue_size))
+    try:
+        logfire.configure(
+            token=settings.logfire_token,
+            service_name=service_name,
+            send_to_logfire="if-token-present",
+        )
+        count_dropped_spans(trace.get_tracer_provider())
+    except Exception as e:
+        logger.warning(e)
+    _logfire = logfire
+    return logfire
+
+
+def _batch_processors(node: Any) -> Iterator[Any]:
+    """BatchSpanProcessors reachable from a tracer provider, through logfire's processor wrappers."""
+    from opentelemetry.sdk.trace.export import BatchSpanProcessor
+
+    if isinstance(node, BatchSpanProcessor):
+        yield node
+        return
+    children = (getattr(node, "provider", None), getattr(node, "_active_span_processor", None),
+                getattr(node, "processor", None), *getattr(node, "_span_processors", ()))
+    for child in children:
+        if child is not None:
+            yield from _batch_processors(child)
+
+
+def count_dropped_spans(tracer_provider: Any) -> int:
+    """
+    Count the spans that batch span processors drop when their export queue is full.
+
+    The OTel SDK silently evicts the oldest queued span once the queue holds `max_queue_size`
+    spans (e.g. while the exporter is slow or unreachable); each overflow now increments
+    telemetry_spans_dropped_total.
+
+    Args:
+        tracer_provider: Tracer provider whose batch span processors are counted
+
+    Returns:
+        Number of batch span processors newly counted
+    """
+    from metrics import TELEMETRY_SPANS_DROPPED
+
+    counted = 0
+    for processor in _batch_processors(tracer_provider):
+        batch = getattr(processor, "_batch_processor", None)
+        if batch is None or getattr(batch, "counts_dropped_spans", False):
+            continue
+
+        def emit(span, batch=batch, emit=batch.emit):
+            if not batch._shutdown and len(batch._queue) >= batch._max_queue_size:
+                TELEMETRY_SPANS_DROPPED.inc()
+            emit(span)
+
+        batch.emit = emit
+        batch.counts_dropped_spans = True
+        counted += 1
+    return counted
+
+
+@cache
+def get_logfire(scope_suffix: str):
+    """Lazily configured logfire instance with a custom scope suffix."""
+    return configure_logfire().with_settings(custom_scope_suffix=scope_suffix)
+
+
+def instrument_worker():
+    """Trace outgoing HTTP (Mistral) and MCP client calls, propagating the trace context to the MCP server."""
+    logfire = configure_logfire()
+    instrumentations = {
+        "httpx": logfire.instrument_httpx,
+        "mcp": lambda: logfire.instrument_mcp(propagate_otel_context=True),
+    }
+    # Separately, so that one missing integration does not disable the others.
+    for name, instrument in instrumentations.items():
+        try:
+            instrument()
+        except Exception as e:
+            logger.warning(f"Failed to instrument {name}: {e}")
@@ -1,32 +1,155 @@
-from typing import Dict
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Sequence
 
-from mistralai import SDKError
 from temporalio import activity
+from temporalio.exceptions import ApplicationError
 
 from models.agents import MistralAgentParams, AgentCreationModel, AgentRunInputModel
+from models.ledger import AgentRunResult
 from agents.base import create_agent_async, start_conversation_async, run_async
+from agents.activity_profiles import record_latency
+from agents.cache import cache_key, get_agent_cache
+from tasks.utils.circuit_breaker import get_circuit_breaker
+from tasks.utils.heartbeat import heartbeating, previous_progress
+from tasks.utils.tenancy import get_tenant_limiter
 from tasks.utils.retry_llm_call import http_response_to_application_error
+from metrics import ACTIVITY_CANCELLATIONS, ACTIVITY_FAILURES, ACTIVITY_RETRIES, record_cache_lookup
+from config import settings
 
-@activity.defn
-async def create_agent_activity(params: MistralAgentParams) -> AgentCreationModel:
+MISTRAL = "mistral"
+MCP = "mcp"
+
+
+def _failed_dependency(error: BaseException) -> str | None:
+    """The dependency a timeout or connection error came from, found by the request's host."""
+    import httpx
+
+    if isinstance(error, BaseExceptionGroup):
+        # MCP clients run in anyio task groups, which wrap transport errors in groups.
+        for inner in error.exceptions:
+            dependency = _failed_dependency(inner)
+            if dependency is not None:
+                return dependency
+        return None
+    if not isinstance(error, httpx.TransportError):
+        return None
     try:
-        agent = await create_agent_async(params)
-        return agent
-    except SDKError as e:
-        raise http_response_to_application_error(e.raw_response)
+        host = error.request.url.host
+    except RuntimeError:
+        return MISTRAL
+    return MCP if host == httpx.URL(settings.mcp_server_url).host else MISTRAL
 
-@activity.defn
-async def start_conversation_activity(params: AgentRunInputModel) -> Dict:
+
+def _record_failure(error: ApplicationError):
+    counter = ACTIVITY_FAILURES if error.non_retryable else ACTIVITY_RETRIES
+    counter.labels(activity=activity.info().activity_type, reason=error.type or "Unknown").inc()
+
+
+async def _call_agent(
+        fn: Callable[[Any], Awaitable[Any]],
+        params: Any,
+        dependencies: Sequence[str],
+        resumable: bool = False,
+) -> Any:
+    """
+    Run an agent call behind the dependencies' circuit breakers, heartbeating while it waits.
+
+    Resumable calls are also given the conversation of the previous attempt (`resume_from`) and
+    a callback recording their own progress (`on_progress`) in the heartbeat details.
+    """
+    # Imported lazily, the Mistral SDK is only needed once an activity actually runs.
+    from mistralai import SDKError
+
+    breakers = {name: get_circuit_breaker(name) for name in dependencies}
+    admitted = []
+    try:
+        for breaker in breakers.values():
+            breaker.before_call()
+            admitted.append(breaker)
+    except ApplicationError as e:
+        for breaker in admitted:
+            breaker.release()
+        _record_failure(e)
+        raise
+
+    started = time.perf_counter()
     try:
-        response = await start_conversation_async(params)
-        return response
+        async with heartbeating(fn.__name__) as progress:
+            if resumable:
+                resume_from = previous_progress(fn.__name__).get("conversation_id")
+                result = await fn(params, resume_from=resume_from, on_progress=progress.update)
+            else:
+                result = await fn(params)
     except SDKError as e:
-        raise http_response_to_application_error(e.raw_response)
+        error = http_response_to_application_error(e.raw_response, circuit_breaker=breakers.get(MISTRAL))
+        for name, breaker in breakers.items():
+            if name != MISTRAL:
+                breaker.release()
+        _record_failure(error)
+        raise error
+    except BaseException as e:
+        if isinstance(e, asyncio.CancelledError):
+            ACTIVITY_CANCELLATIONS.labels(activity=activity.info().activity_type).inc()
+        failed = _failed_dependency(e)
+        for name, breaker in breakers.items():
+            if name == failed:
+                breaker.record_failure()
+            else:
+                breaker.release()
+        raise
+
+    for breaker in breakers.values():
+        breaker.record_success()
+
+    agent = getattr(params, "agent", None)
+    if agent and settings.agent_latency_log:
+        await record_latency(settings.agent_latency_log, agent, time.perf_counter() - started)
+    return result
+
+def _agent_cache_key(params: MistralAgentParams) -> str:
+    return cache_key(params.model_dump(mode="json"))
 
 @activity.defn
-async def run_activity(params: AgentRunInputModel) -> Dict:
+async def resolve_cached_agent_activity(params: MistralAgentParams) -> AgentCreationModel | None:
+    """Agent recently created by this worker with the same parameters; meant to run as a local activity."""
+    found, agent_id = get_agent_cache().get(_agent_cache_key(params))
+    record_cache_lookup("agent", found)
+    return AgentCreationModel(id=agent_id) if found else None
+
+@activity.defn
+async def create_agent_activity(params: MistralAgentParams) -> AgentCreationModel:
+    key = _agent_cache_key(params)
+    found, agent_id = get_agent_cache().get(key)
+    if found:
+        return AgentCreationModel(id=agent_id)
+    agent = await _call_agent(create_agent_async, params, dependencies=(MCP, MISTRAL))
+    get_agent_cache().set(key, agent.id, settings.agent_cache_ttl_seconds)
+    return agent
+
+async def _call_llm(
+        fn: Callable[..., Awaitable[AgentRunResult]],
+        params: AgentRunInputModel,
+        dependencies: Sequence[str],
+) -> AgentRunResult:
+    # The interactive lane has its own worker slots; tenant quotas only share out the batch lane.
+    if activity.info().task_queue != settings.batch_task_queue:
+        return await _call_agent(fn, params, dependencies, resumable=True)
+    limiter = get_tenant_limiter()
     try:
-        response = await run_async(params)
-        return response
-    except SDKError as e:
-        raise http_response_to_application_error(e.raw_response)
+        limiter.acquire(params.tenant)
+    except ApplicationError as e:
+        _record_failure(e)
+        raise
+    try:
+        return await _call_agent(fn, params, dependencies, resumable=True)
+    finally:
+        limiter.release(params.tenant)
+
+@activity.defn
+async def start_conversation_activity(params: AgentRunInputModel) -> AgentRunResult:
+    return await _call_llm(start_conversation_async, params, dependencies=(MISTRAL,))
+
+@activity.defn
+async def run_activity(params: AgentRunInputModel) -> AgentRunResult:
+    return await _call_llm(run_async, params, dependencies=(MISTRAL, MCP))
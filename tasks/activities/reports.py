@@ -0,0 +1,21 @@
+import asyncio
+
+from temporalio import activity
+
+from models.reports import SaveReportInput
+from tasks.utils.report_store import get_report_store
+from logger import get_logger
+
+logger = get_logger(__name__)
+
+@activity.defn
+async def save_report_activity(params: SaveReportInput) -> None:
+    """Write a completed report to the report store; idempotent, a retry replaces the same row."""
+    store = get_report_store()
+    if store is None:
+        logger.info("REPORT_STORE_PATH is not set, report not stored")
+        return
+    # SQLite blocks: writing from a thread keeps the worker's event loop free for other activities.
+    await asyncio.to_thread(
+        store.save, params.workflow_id, params.query, params.output, params.created_at, tenant=params.tenant
+    )
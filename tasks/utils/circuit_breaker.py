@@ -0,0 +1,135 @@
+import time
+from collections import deque
+from datetime import timedelta
+from enum import Enum
+from typing import Callable, Dict
+
+from temporalio.exceptions import ApplicationError
+
+from config import settings
+from logger import get_logger
+from metrics import CIRCUIT_BREAKER_STATE, CIRCUIT_BREAKER_TRANSITIONS
+
+logger = get_logger(__name__)
+
+
+class CircuitState(str, Enum):
+    CLOSED = "closed"
+    HALF_OPEN = "half_open"
+    OPEN = "open"
+
+
+_STATE_GAUGE_VALUES = {CircuitState.CLOSED: 0, CircuitState.HALF_OPEN: 1, CircuitState.OPEN: 2}
+
+
+class CircuitBreaker:
+    """
+    Process-wide circuit breaker for an external dependency (Mistral, MCP server).
+
+    Closed: calls go through; failures (5xx, timeouts, connection errors) are counted over a
+    sliding window and the breaker opens once `failure_threshold` is reached within it.
+    Open: calls fail fast with a retryable ApplicationError whose next_retry_delay is the
+    remaining cool-down, so Temporal backs off instead of hammering the dependency.
+    Half-open: after the cool-down, up to `half_open_max_calls` probe calls are let through;
+    a successful probe closes the breaker, a failed one re-opens it.
+
+    Activities run on the worker's event loop, so no locking is needed.
+    """
+
+    def __init__(
+            self,
+            name: str,
+            failure_threshold: int = 5,
+            window_seconds: float = 30.,
+            cooldown_seconds: float = 30.,
+            half_open_max_calls: int = 1,
+            clock: Callable[[], float] = time.monotonic,
+    ):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.window_seconds = window_seconds
+        self.cooldown_seconds = cooldown_seconds
+        self.half_open_max_calls = half_open_max_calls
+        self._clock = clock
+        self._state = CircuitState.CLOSED
+        self._failures: deque[float] = deque()
+        self._opened_at = 0.
+        self._probes_in_flight = 0
+        CIRCUIT_BREAKER_STATE.labels(dependency=name).set(_STATE_GAUGE_VALUES[self._state])
+
+    @property
+    def state(self) -> CircuitState:
+        if self._state == CircuitState.OPEN and self._remaining_cooldown() <= 0:
+            self._transition(CircuitState.HALF_OPEN)
+        return self._state
+
+    def _remaining_cooldown(self) -> float:
+        return self._opened_at + self.cooldown_seconds - self._clock()
+
+    def _transition(self, state: CircuitState):
+        if state == self._state:
+            return
+        logger.warning(f"Circuit breaker '{self.name}' {self._state.value} -> {state.value}")
+        self._state = state
+        if state == CircuitState.OPEN:
+            self._opened_at = self._clock()
+        if state != CircuitState.HALF_OPEN:
+            self._probes_in_flight = 0
+        if state == CircuitState.CLOSED:
+            self._failures.clear()
+        CIRCUIT_BREAKER_STATE.labels(dependency=self.name).set(_STATE_GAUGE_VALUES[state])
+        CIRCUIT_BREAKER_TRANSITIONS.labels(dependency=self.name, state=state.value).inc()
+
+    def _open_error(self, retry_after: float) -> ApplicationError:
+        return ApplicationError(
+            f"Circuit breaker '{self.name}' is {self._state.value}, failing fast (retry in {retry_after:.1f}s)",
+            type="CircuitOpen",
+            non_retryable=False,
+            next_retry_delay=timedelta(seconds=max(retry_after, 1.)),
+        )
+
+    def before_call(self):
+        """Raise a retryable ApplicationError instead of calling the dependency when it is unavailable."""
+        state = self.state
+        if state == CircuitState.OPEN:
+            raise self._open_error(self._remaining_cooldown())
+        if state == CircuitState.HALF_OPEN:
+            if self._probes_in_flight >= self.half_open_max_calls:
+                raise self._open_error(self.cooldown_seconds)
+            self._probes_in_flight += 1
+
+    def record_success(self):
+        if self._state == CircuitState.HALF_OPEN:
+            self._transition(CircuitState.CLOSED)
+
+    def record_failure(self):
+        now = self._clock()
+        if self._state == CircuitState.HALF_OPEN:
+            self._transition(CircuitState.OPEN)
+            return
+        self._failures.append(now)
+        while self._failures and self._failures[0] < now - self.window_seconds:
+            self._failures.popleft()
+        if self._state == CircuitState.CLOSED and len(self._failures) >= self.failure_threshold:
+            self._transition(CircuitState.OPEN)
+
+    def release(self):
+        """End a call whose outcome says nothing about the dependency's health."""
+        if self._state == CircuitState.HALF_OPEN and self._probes_in_flight > 0:
+            self._probes_in_flight -= 1
+
+
+_breakers: Dict[str, CircuitBreaker] = {}
+
+
+def get_circuit_breaker(name: str) -> CircuitBreaker:
+    """Circuit breaker shared by every activity of this worker process for the given dependency."""
+    if name not in _breakers:
+        _breakers[name] = CircuitBreaker(
+            name,
+            failure_threshold=settings.circuit_breaker_failure_threshold,
+            window_seconds=settings.circuit_breaker_window_seconds,
+            cooldown_seconds=settings.circuit_breaker_cooldown_seconds,
+            half_open_max_calls=settings.circuit_breaker_half_open_max_calls,
+        )
+    return _breakers[name]
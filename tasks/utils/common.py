@@ -2,8 +2,12 @@ from datetime import timedelta
 
 from temporalio.common import RetryPolicy
 from temporalio.client import Client
+from temporalio.contrib.opentelemetry import TracingInterceptor
+from temporalio.contrib.pydantic import pydantic_data_converter
+from temporalio.worker.workflow_sandbox import SandboxedWorkflowRunner, SandboxRestrictions
 
 from config import settings
+from models.agents import ActivityProfile, Lane
 
 RETRY_POLICY = RetryPolicy(
     initial_interval=timedelta(seconds=2),
@@ -14,11 +18,69 @@ RETRY_POLICY = RetryPolicy(
 ACTIVITY_OPTS = dict(
     start_to_close_timeout=timedelta(seconds=60),
     schedule_to_close_timeout=timedelta(seconds=60),
+    heartbeat_timeout=timedelta(seconds=20),
     retry_policy=RETRY_POLICY,
 )
 
+# Local activities run in the workflow's worker: short timeouts, and a few quick retries at most.
+LOCAL_ACTIVITY_OPTS = dict(
+    start_to_close_timeout=timedelta(seconds=5),
+    retry_policy=RetryPolicy(maximum_attempts=3, initial_interval=timedelta(milliseconds=100)),
+)
+
+def activity_opts(profile: ActivityProfile, lane: Lane = "interactive") -> dict:
+    """
+    Activity options (timeouts and retry policy) from an agent's activity profile.
+
+    In the batch lane, every tenant quota rejection (TenantQuotaExceeded) uses up an attempt and
+    TENANT_QUOTA_RETRY_SECONDS of schedule_to_close, so the profile gets
+    TENANT_QUOTA_MAX_REJECTIONS more of both on top of what it allows for real failures.
+    """
+    maximum_attempts = profile.maximum_attempts
+    schedule_to_close_seconds = profile.schedule_to_close_seconds
+    if lane == "batch":
+        rejections = settings.tenant_quota_max_rejections
+        if maximum_attempts:  # 0 is unlimited
+            maximum_attempts += rejections
+        schedule_to_close_seconds += rejections * settings.tenant_quota_retry_seconds
+    return dict(
+        start_to_close_timeout=timedelta(seconds=profile.start_to_close_seconds),
+        schedule_to_close_timeout=timedelta(seconds=schedule_to_close_seconds),
+        heartbeat_timeout=timedelta(seconds=profile.heartbeat_seconds),
+        retry_policy=RetryPolicy(
+            initial_interval=timedelta(seconds=profile.initial_interval_seconds),
+            backoff_coefficient=profile.backoff_coefficient,
+            maximum_interval=timedelta(seconds=profile.maximum_interval_seconds),
+            maximum_attempts=maximum_attempts,
+        ),
+    )
+
+# Modules the workflow sandbox shares with the host instead of re-importing them for every
+# workflow run. pydantic imports some of its submodules, annotated_types and typing_extensions
+# lazily, the first time a model is built inside the sandbox, outside `imports_passed_through`.
+SANDBOX_PASSTHROUGH_MODULES = (
+    "pydantic",
+    "pydantic_core",
+    "annotated_types",
+    "typing_extensions",
+    "models",
+    "logger",
+    "config",
+)
+
+def workflow_runner() -> SandboxedWorkflowRunner:
+    """The sandbox of workers and replayers, see `benchmarks/sandbox.py` for its cost per workflow run."""
+    return SandboxedWorkflowRunner(
+        restrictions=SandboxRestrictions.default.with_passthrough_modules(*SANDBOX_PASSTHROUGH_MODULES)
+    )
+
 async def get_temporal_client():
+    # The tracing interceptor propagates the trace context from the client into workflows
+    # and activities, and the pydantic converter (de)serializes payloads straight from and
+    # into the models of their type hints; workers created from this client pick both up.
     client = await Client.connect(
         settings.temporal_server_url,
+        interceptors=[TracingInterceptor()],
+        data_converter=pydantic_data_converter,
     )
     return client
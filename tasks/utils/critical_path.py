@@ -0,0 +1,171 @@
+import statistics
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from itertools import groupby
+from typing import Iterable, List
+
+from temporalio.api.enums.v1 import EventType
+from temporalio.api.history.v1 import HistoryEvent
+from temporalio.client import Client
+from temporalio.converter import DataConverter
+
+from models.workflow import CriticalPathSummary, HistoryCost, StageTiming
+
+_ACTIVITY_CLOSE_EVENTS = {
+    EventType.EVENT_TYPE_ACTIVITY_TASK_COMPLETED: "activity_task_completed_event_attributes",
+    EventType.EVENT_TYPE_ACTIVITY_TASK_FAILED: "activity_task_failed_event_attributes",
+    EventType.EVENT_TYPE_ACTIVITY_TASK_TIMED_OUT: "activity_task_timed_out_event_attributes",
+    EventType.EVENT_TYPE_ACTIVITY_TASK_CANCELED: "activity_task_canceled_event_attributes",
+}
+_WORKFLOW_CLOSE_EVENTS = {
+    EventType.EVENT_TYPE_WORKFLOW_EXECUTION_COMPLETED: "completed",
+    EventType.EVENT_TYPE_WORKFLOW_EXECUTION_FAILED: "failed",
+    EventType.EVENT_TYPE_WORKFLOW_EXECUTION_TIMED_OUT: "timed_out",
+    EventType.EVENT_TYPE_WORKFLOW_EXECUTION_CANCELED: "cancelled",
+    EventType.EVENT_TYPE_WORKFLOW_EXECUTION_TERMINATED: "terminated",
+    EventType.EVENT_TYPE_WORKFLOW_EXECUTION_CONTINUED_AS_NEW: "continued_as_new",
+}
+
+
+@dataclass
+class ActivityTiming:
+    activity_id: str
+    name: str
+    stage_id: int
+    scheduled: datetime
+    started: datetime | None = None
+    closed: datetime | None = None
+    attempts: int = 1
+
+
+def _summary(event: HistoryEvent, default: str) -> str:
+    if not event.HasField("user_metadata") or not event.user_metadata.HasField("summary"):
+        return default
+    return DataConverter.default.payload_converter.from_payload(event.user_metadata.summary, str)
+
+
+def activity_timings(events: Iterable[HistoryEvent]) -> List[ActivityTiming]:
+    """Extract per-activity schedule/start/close times from a workflow history."""
+    timings = {}
+    for event in events:
+        if event.event_type == EventType.EVENT_TYPE_ACTIVITY_TASK_SCHEDULED:
+            attributes = event.activity_task_scheduled_event_attributes
+            timings[event.event_id] = ActivityTiming(
+                activity_id=attributes.activity_id,
+                name=_summary(event, attributes.activity_type.name),
+                stage_id=attributes.workflow_task_completed_event_id,
+                scheduled=event.event_time.ToDatetime(timezone.utc),
+            )
+        elif event.event_type == EventType.EVENT_TYPE_ACTIVITY_TASK_STARTED:
+            attributes = event.activity_task_started_event_attributes
+            timing = timings[attributes.scheduled_event_id]
+            timing.started = event.event_time.ToDatetime(timezone.utc)
+            timing.attempts = attributes.attempt
+        elif event.event_type in _ACTIVITY_CLOSE_EVENTS:
+            attributes = getattr(event, _ACTIVITY_CLOSE_EVENTS[event.event_type])
+            timings[attributes.scheduled_event_id].closed = event.event_time.ToDatetime(timezone.utc)
+    return list(timings.values())
+
+
+def _stage_name(timings: List[ActivityTiming]) -> str:
+    names = [timing.name for timing in timings]
+    parts = []
+    for name in dict.fromkeys(names):
+        count = names.count(name)
+        parts.append(name if count == 1 else f"{name} x{count}")
+    return " + ".join(parts)
+
+
+def summarize_critical_path(
+        workflow_id: str,
+        status: str,
+        started: datetime,
+        closed: datetime,
+        timings: List[ActivityTiming],
+) -> CriticalPathSummary:
+    """
+    Compute the critical path of a workflow from its activity timings.
+
+    Activities scheduled by the same workflow task form a stage. Each stage of
+    FinancialResearchWorkflow waits for all of its activities before the next one is
+    scheduled, so the activity that closes last in a stage is on the critical path.
+
+    Args:
+        workflow_id: Workflow id
+        status: Workflow status reported in the summary
+        started: Workflow start time
+        closed: Workflow close time, or the current time for a running workflow
+        timings: Output of activity_timings
+
+    Returns:
+        Queue wait, execution and orchestration time along the critical path, per stage
+    """
+    stages = []
+    queue_wait = execution = 0.
+    ordered = sorted(timings, key=lambda timing: (timing.stage_id, timing.scheduled))
+    for _, group in groupby(ordered, key=lambda timing: timing.stage_id):
+        group = list(group)
+        critical = max(group, key=lambda timing: timing.closed or closed)
+        critical_started = critical.started or critical.closed or closed
+        stage_queue_wait = (critical_started - critical.scheduled).total_seconds()
+        stage_execution = ((critical.closed or closed) - critical_started).total_seconds()
+        queue_wait += stage_queue_wait
+        execution += stage_execution
+        stages.append(StageTiming(
+            stage=_stage_name(group),
+            activities=len(group),
+            critical_activity_id=critical.activity_id,
+            queue_wait_seconds=stage_queue_wait,
+            execution_seconds=stage_execution,
+            attempts=critical.attempts,
+            max_queue_wait_seconds=max(
+                ((timing.started or closed) - timing.scheduled).total_seconds() for timing in group
+            ),
+        ))
+
+    total = (closed - started).total_seconds()
+    return CriticalPathSummary(
+        workflow_id=workflow_id,
+        status=status,
+        total_seconds=total,
+        queue_wait_seconds=queue_wait,
+        execution_seconds=execution,
+        orchestration_seconds=max(total - queue_wait - execution, 0.),
+        stages=stages,
+    )
+
+
+LOCAL_ACTIVITY_MARKER = "core_local_activity"
+# A remote activity adds scheduled, started and closed events; a local activity adds one marker.
+_EVENTS_SAVED_PER_LOCAL_ACTIVITY = 2
+
+
+def history_cost(events: List[HistoryEvent], timings: List[ActivityTiming]) -> HistoryCost:
+    """History events of a workflow and what its local activities saved compared to remote ones."""
+    local_activities = sum(
+        event.event_type == EventType.EVENT_TYPE_MARKER_RECORDED
+        and event.marker_recorded_event_attributes.marker_name == LOCAL_ACTIVITY_MARKER
+        for event in events
+    )
+    queue_waits = [(timing.started - timing.scheduled).total_seconds() for timing in timings if timing.started]
+    return HistoryCost(
+        events=len(events),
+        remote_activities=len(timings),
+        local_activities=local_activities,
+        events_saved=local_activities * _EVENTS_SAVED_PER_LOCAL_ACTIVITY,
+        queue_wait_saved_seconds=local_activities * statistics.median(queue_waits) if queue_waits else 0.,
+    )
+
+
+async def get_critical_path(client: Client, workflow_id: str) -> CriticalPathSummary:
+    history = await client.get_workflow_handle(workflow_id).fetch_history()
+    events = list(history.events)
+    started = events[0].event_time.ToDatetime(timezone.utc)
+    status, closed = "running", datetime.now(timezone.utc)
+    if events[-1].event_type in _WORKFLOW_CLOSE_EVENTS:
+        status = _WORKFLOW_CLOSE_EVENTS[events[-1].event_type]
+        closed = events[-1].event_time.ToDatetime(timezone.utc)
+    timings = activity_timings(events)
+    summary = summarize_critical_path(workflow_id, status, started, closed, timings)
+    summary.history = history_cost(events, timings)
+    return summary
@@ -0,0 +1,121 @@
+import asyncio
+import time
+from contextlib import asynccontextmanager, suppress
+from typing import Any, AsyncIterator, Dict
+
+from temporalio import activity
+from temporalio.exceptions import ApplicationError
+
+from config import settings
+
+# Heartbeat a few times per heartbeat timeout so a single delayed beat does not time the activity out.
+BEATS_PER_TIMEOUT = 3
+
+
+class Progress:
+    """What the activity has done so far, sent with every heartbeat so that a retry can pick it up."""
+
+    def __init__(self, stage: str):
+        self.stage = stage
+        self.details: Dict[str, Any] = {}
+        self._started = self._updated = time.monotonic()
+
+    def idle_seconds(self) -> float:
+        """Time since the body last reported progress, or since it started."""
+        return time.monotonic() - self._updated
+
+    def beat(self):
+        activity.heartbeat({
+            "stage": self.stage,
+            "elapsed_seconds": round(time.monotonic() - self._started, 1),
+            **self.details,
+        })
+
+    def update(self, **details: Any):
+        """Record progress (e.g. `conversation_id`) and heartbeat it right away; the SDK throttles the beats it sends."""
+        self.details.update(details)
+        self._updated = time.monotonic()
+        self.beat()
+
+
+def previous_progress(stage: str) -> Dict[str, Any]:
+    """
+    Progress recorded by the previous attempt of the current activity at `stage`.
+
+    Temporal keeps the details of the last heartbeat of a failed or timed out attempt and
+    hands them to the next attempt. Empty on the first attempt.
+    """
+    info = activity.info()
+    if info.attempt <= 1 or not info.heartbeat_details:
+        return {}
+    details = info.heartbeat_details[-1]
+    if not isinstance(details, dict) or details.get("stage") != stage:
+        return {}
+    return {key: value for key, value in details.items() if key not in ("stage", "elapsed_seconds")}
+
+
+def stalled(stage: str, seconds: float) -> ApplicationError:
+    return ApplicationError(
+        f"No progress from {stage} for {seconds:.0f}s",
+        type="ActivityStalled",
+        non_retryable=False,
+    )
+
+
+@asynccontextmanager
+async def heartbeating(stage: str, stall_seconds: float | None = None) -> AsyncIterator[Progress]:
+    """
+    Heartbeat the current activity while the body is awaiting Mistral or MCP, as long as it progresses.
+
+    Heartbeats are how the worker learns that the activity was cancelled: Temporal then
+    raises CancelledError into the activity, which aborts the in-flight HTTP request and
+    closes the MCP sessions opened with `async with`. Periodic beats are skipped when the
+    activity has no heartbeat timeout, progress updates are always recorded.
+
+    Periodic beats only vouch for a body that reports progress: once it has not called
+    `Progress.update` for `stall_seconds`, beats stop, the body is cancelled and a retryable
+    ActivityStalled error is raised, instead of a hung call waiting for start_to_close.
+
+    Args:
+        stage: Short description of what the activity is waiting on, sent as heartbeat details
+        stall_seconds: Time without progress after which the body is abandoned; defaults to
+            ACTIVITY_STALL_SECONDS, 0 disables it
+
+    Returns:
+        The progress of the activity, to be updated by the body.
+    """
+    progress = Progress(stage)
+    timeout = activity.info().heartbeat_timeout
+    if not timeout:
+        yield progress
+        return
+
+    stall_seconds = settings.activity_stall_seconds if stall_seconds is None else stall_seconds
+    interval = timeout.total_seconds() / BEATS_PER_TIMEOUT
+    if stall_seconds:
+        interval = min(interval, stall_seconds / BEATS_PER_TIMEOUT)
+    body = asyncio.current_task()
+    abandoned = False
+
+    async def beat():
+        nonlocal abandoned
+        while True:
+            if stall_seconds and progress.idle_seconds() >= stall_seconds:
+                abandoned = True
+                body.cancel()
+                return
+            progress.beat()
+            await asyncio.sleep(interval)
+
+    task = asyncio.create_task(beat())
+    try:
+        yield progress
+    except asyncio.CancelledError:
+        if not abandoned:
+            raise
+        body.uncancel()
+        raise stalled(stage, progress.idle_seconds()) from None
+    finally:
+        task.cancel()
+        with suppress(asyncio.CancelledError):
+            await task
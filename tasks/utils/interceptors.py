@@ -0,0 +1,45 @@
+import asyncio
+from typing import Any, Optional, Type
+
+from temporalio import workflow
+from temporalio.exceptions import FailureError
+from temporalio.worker import (
+    ExecuteWorkflowInput,
+    Interceptor,
+    WorkflowInboundInterceptor,
+    WorkflowInterceptorClassInput,
+)
+
+from metrics import WORKFLOWS_COMPLETED
+
+
+class _WorkflowMetricsInboundInterceptor(WorkflowInboundInterceptor):
+    async def execute_workflow(self, input: ExecuteWorkflowInput) -> Any:
+        status = "failed"
+        try:
+            result = await self.next.execute_workflow(input)
+            status = "completed"
+            return result
+        except asyncio.CancelledError:
+            status = "cancelled"
+            raise
+        except FailureError:
+            status = "failed"
+            raise
+        except BaseException:
+            # Other exceptions fail the workflow task (retried by Temporal), not the workflow.
+            status = None
+            raise
+        finally:
+            # Only count live completions, never the ones re-executed while replaying history.
+            if status is not None and not workflow.unsafe.is_replaying():
+                WORKFLOWS_COMPLETED.labels(workflow=workflow.info().workflow_type, status=status).inc()
+
+
+class MetricsInterceptor(Interceptor):
+    """Worker interceptor counting workflow completions by status for Prometheus."""
+
+    def workflow_interceptor_class(
+        self, input: WorkflowInterceptorClassInput
+    ) -> Optional[Type[WorkflowInboundInterceptor]]:
+        return _WorkflowMetricsInboundInterceptor
@@ -0,0 +1,222 @@
+import re
+import sqlite3
+import threading
+from datetime import datetime, timezone
+from typing import Iterable, List
+
+from config import settings
+from models.reports import ReportSearchHit, StoredReport
+from models.structured_output import FinancialReportWorkflowOutput
+
+# "Apple Inc. (AAPL)", "$AAPL", "NASDAQ: AAPL", and bare tickers in short queries ("Analyze AAPL").
+_QUALIFIED_TICKER = re.compile(r"\(([A-Z]{1,5}(?:\.[A-Z])?)\)|\$([A-Z]{1,5})\b|\b(?:NASDAQ|NYSE|AMEX):\s?([A-Z]{1,5})\b")
+_BARE_TICKER = re.compile(r"\b[A-Z]{2,5}\b")
+_NOT_TICKERS = {
+    "AI", "CEO", "CFO", "EPS", "ETF", "GAAP", "GDP", "IPO", "PE", "ROE", "ROI", "SEC", "USA", "USD", "YOY",
+    "Q1", "Q2", "Q3", "Q4", "FY", "NYSE", "NASDAQ", "AMEX", "AND", "OR", "THE",
+}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS reports (
+    workflow_id TEXT PRIMARY KEY,
+    query TEXT NOT NULL,
+    tenant TEXT,
+    created_at REAL NOT NULL,
+    short_summary TEXT NOT NULL,
+    output TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS reports_created_at ON reports (created_at);
+CREATE TABLE IF NOT EXISTS report_tickers (
+    ticker TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    workflow_id TEXT NOT NULL REFERENCES reports (workflow_id) ON DELETE CASCADE,
+    PRIMARY KEY (ticker, created_at, workflow_id)
+) WITHOUT ROWID;
+-- Rows share the rowid of their report.
+CREATE VIRTUAL TABLE IF NOT EXISTS reports_fts USING fts5(
+    query, summaries, markdown_report, tokenize='porter unicode61'
+);
+"""
+
+
+def extract_tickers(*texts: str) -> List[str]:
+    """Tickers written in qualified forms anywhere, and bare upper-case tickers in the first text (the query)."""
+    tickers = []
+    for i, text in enumerate(texts):
+        for match in _QUALIFIED_TICKER.finditer(text):
+            tickers.append(next(group for group in match.groups() if group))
+        if i == 0:
+            tickers.extend(_BARE_TICKER.findall(text))
+    return sorted({ticker for ticker in tickers if ticker not in _NOT_TICKERS})
+
+
+def _timestamp(value: datetime) -> float:
+    return (value if value.tzinfo else value.replace(tzinfo=timezone.utc)).timestamp()
+
+
+def _fts_query(text: str) -> str:
+    # Every word must match; quoting keeps FTS5 operators and punctuation in user input literal.
+    return " ".join('"' + word.replace('"', '""') + '"' for word in text.split())
+
+
+class ReportStore:
+    """
+    Completed research reports in a SQLite file, with a full-text index and a ticker index.
+
+    Written by the workers once a workflow completes, read by the API without going through
+    Temporal. WAL mode lets the API read while a worker writes. Methods block on SQLite: async
+    callers run them with `asyncio.to_thread`, and a lock serializes them on the connection.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._db = sqlite3.connect(path, isolation_level=None, check_same_thread=False)
+        self._lock = threading.Lock()
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA foreign_keys=ON")
+        self._db.executescript(_SCHEMA)
+
+    def close(self):
+        self._db.close()
+
+    def save(
+            self,
+            workflow_id: str,
+            query: str,
+            output: FinancialReportWorkflowOutput,
+            created_at: datetime,
+            tenant: str | None = None,
+    ) -> StoredReport:
+        """Store a report; saving the same workflow again replaces it."""
+        report = output.report
+        summaries = [output.price_analysis, output.fundamentals_analysis, output.risk_analysis, *output.search_results]
+        tickers = extract_tickers(query, report.short_summary, report.markdown_report)
+        timestamp = _timestamp(created_at)
+        with self._lock, self._db:
+            self._db.execute("BEGIN")
+            self._db.execute(
+                "DELETE FROM reports_fts WHERE rowid = (SELECT rowid FROM reports WHERE workflow_id = ?)", (workflow_id,)
+            )
+            self._db.execute("DELETE FROM reports WHERE workflow_id = ?", (workflow_id,))
+            rowid = self._db.execute(
+                "INSERT INTO reports (workflow_id, query, tenant, created_at, short_summary, output) VALUES (?, ?, ?, ?, ?, ?)",
+                (workflow_id, query, tenant, timestamp, report.short_summary, output.model_dump_json()),
+            ).lastrowid
+            self._db.executemany(
+                "INSERT INTO report_tickers (ticker, created_at, workflow_id) VALUES (?, ?, ?)",
+                [(ticker, timestamp, workflow_id) for ticker in tickers],
+            )
+            self._db.execute(
+                "INSERT INTO reports_fts (rowid, query, summaries, markdown_report) VALUES (?, ?, ?, ?)",
+                (rowid, query, "\n".join([report.short_summary, *(s.summary for s in summaries)]), report.markdown_report),
+            )
+        return StoredReport(
+            workflow_id=workflow_id,
+            query=query,
+            tenant=tenant,
+            tickers=tickers,
+            created_at=datetime.fromtimestamp(timestamp, timezone.utc),
+            output=output,
+        )
+
+    def get(self, workflow_id: str) -> StoredReport | None:
+        with self._lock:
+            row = self._db.execute(
+                "SELECT query, tenant, created_at, output FROM reports WHERE workflow_id = ?", (workflow_id,)
+            ).fetchone()
+            if row is None:
+                return None
+            tickers = self._tickers([workflow_id])[workflow_id]
+        query, tenant, created_at, output = row
+        return StoredReport(
+            workflow_id=workflow_id,
+            query=query,
+            tenant=tenant,
+            tickers=tickers,
+            created_at=datetime.fromtimestamp(created_at, timezone.utc),
+            output=FinancialReportWorkflowOutput.model_validate_json(output),
+        )
+
+    def _tickers(self, workflow_ids: Iterable[str]) -> dict:
+        workflow_ids = list(workflow_ids)
+        tickers = {workflow_id: [] for workflow_id in workflow_ids}
+        rows = self._db.execute(
+            f"SELECT workflow_id, ticker FROM report_tickers WHERE workflow_id IN ({','.join('?' * len(workflow_ids))}) ORDER BY ticker",
+            workflow_ids,
+        )
+        for workflow_id, ticker in rows:
+            tickers[workflow_id].append(ticker)
+        return tickers
+
+    def search(
+            self,
+            text: str | None = None,
+            ticker: str | None = None,
+            since: datetime | None = None,
+            until: datetime | None = None,
+            limit: int = 20,
+    ) -> List[ReportSearchHit]:
+        """
+        Reports matching all the given filters.
+
+        Args:
+            text: Words that must all appear in the query, the summaries or the report; results are ranked by BM25
+            ticker: Only reports about this ticker
+            since: Only reports created at or after this time
+            until: Only reports created before this time
+            limit: Maximum number of results
+
+        Returns:
+            Best matches first with search text, newest first otherwise.
+        """
+        tables, where, params = ["reports r"], [], []
+        if text and text.split():
+            # The full-text index drives the query and ranks with its `rank` column (BM25).
+            tables = ["reports_fts f", "JOIN reports r ON r.rowid = f.rowid"]
+            where.append("reports_fts MATCH ?")
+            params.append(_fts_query(text))
+            columns = "f.rank, snippet(reports_fts, 2, '**', '**', '…', 24)"
+            order = "f.rank"
+        else:
+            columns = "0, substr(r.short_summary, 1, 200)"
+            order = "r.created_at DESC"
+        if ticker:
+            tables.append("JOIN report_tickers t ON t.workflow_id = r.workflow_id AND t.ticker = ?")
+            params.insert(0, ticker.upper())
+        if since:
+            where.append("r.created_at >= ?")
+            params.append(_timestamp(since))
+        if until:
+            where.append("r.created_at < ?")
+            params.append(_timestamp(until))
+
+        with self._lock:
+            rows = self._db.execute(
+                f"SELECT r.workflow_id, r.query, r.created_at, r.short_summary, {columns} FROM {' '.join(tables)}"
+                f" {'WHERE ' + ' AND '.join(where) if where else ''} ORDER BY {order} LIMIT ?",
+                [*params, limit],
+            ).fetchall()
+            tickers = self._tickers(row[0] for row in rows) if rows else {}
+        return [
+            ReportSearchHit(
+                workflow_id=workflow_id,
+                query=query,
+                tickers=tickers[workflow_id],
+                created_at=datetime.fromtimestamp(created_at, timezone.utc),
+                short_summary=short_summary,
+                score=score,
+                snippet=snippet,
+            )
+            for workflow_id, query, created_at, short_summary, score, snippet in rows
+        ]
+
+
+_store: ReportStore | None = None
+
+
+def get_report_store() -> ReportStore | None:
+    """The store at REPORT_STORE_PATH, None when it is not configured."""
+    global _store
+    if _store is None and settings.report_store_path:
+        _store = ReportStore(settings.report_store_path)
+    return _store
@@ -4,11 +4,14 @@ import time
 from datetime import timedelta
 from temporalio.exceptions import ApplicationError
 from temporalio import workflow
-from typing import Optional, Tuple
+from typing import Optional, Tuple, TYPE_CHECKING
 
 with workflow.unsafe.imports_passed_through():
     from httpx import Response, Headers
 
+if TYPE_CHECKING:
+    from tasks.utils.circuit_breaker import CircuitBreaker
+
 
 # Adapted from the Temporal AI Retry Enhancement (https://docs.temporal.io/ai-cookbook/http-retry-enhancement-python)
 # which is generated by the Stainless SDK Generator.
@@ -75,23 +78,55 @@ def _should_retry(response: Response) -> Tuple[bool, str]:
     return False, f"HTTP client error ({response.status_code}), not retrying - check your request"
 
 
-def http_response_to_application_error(response: Response) -> ApplicationError:
+def _error_type(response: Response) -> str:
+    """Stable ApplicationError type for a failed response, used as the retry reason in metrics."""
+    if response.headers.get("x-should-retry") in ("true", "false"):
+        return "ServerDirected"
+    if response.status_code == 408:
+        return "RequestTimeout"
+    if response.status_code == 409:
+        return "Conflict"
+    if response.status_code == 429:
+        return "RateLimited"
+    if response.status_code >= 500:
+        return "ServerError"
+    return "ClientError"
+
+
+def _is_outage(response: Response) -> bool:
+    """Server errors and request timeouts count against the dependency's circuit breaker."""
+    return response.status_code == 408 or response.status_code >= 500
+
+
+def http_response_to_application_error(
+        response: Response,
+        circuit_breaker: Optional["CircuitBreaker"] = None,
+) -> ApplicationError:
     """Transform HTTP response into Temporal ApplicationError for retry handling.
 
     This function implements generic HTTP retry logic based on status codes and headers.
 
     Args:
         response: The httpx.Response from a failed HTTP request
+        circuit_breaker: Breaker of the dependency that produced the response. Server errors and
+            timeouts are recorded as failures; other responses show the dependency is up.
 
     Returns:
         ApplicationError: Always returns an ApplicationError configured for Temporal's retry system:
             - non_retryable: False for retryable errors, True for non-retryable
             - next_retry_delay: Server-provided delay hint (if valid)
+            - type: Failure reason (e.g. RateLimited, ServerError), see _error_type
 
     Note:
         Even when x-should-retry=true, this function returns an ApplicationError with
         non_retryable=False rather than raising an exception, for cleaner functional style.
     """
+    if circuit_breaker is not None:
+        if _is_outage(response):
+            circuit_breaker.record_failure()
+        else:
+            circuit_breaker.record_success()
+
     should_retry, retry_message = _should_retry(response)
     if should_retry:
         # Calculate the retry delay only when retrying
@@ -108,12 +143,14 @@ def http_response_to_application_error(response: Response) -> ApplicationError:
 
         return ApplicationError(
             retry_message,
+            type=_error_type(response),
             non_retryable=False,
             next_retry_delay=retry_after,
         )
     else:
         return ApplicationError(
             retry_message,
+            type=_error_type(response),
             non_retryable=True,
             next_retry_delay=None,
         )
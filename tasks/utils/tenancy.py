@@ -0,0 +1,92 @@
+from datetime import timedelta
+from typing import Dict
+from uuid import uuid4
+
+from temporalio.common import Priority
+from temporalio.exceptions import ApplicationError
+
+from config import settings
+from metrics import TENANT_QUOTA_REJECTIONS
+from models.agents import Lane
+
+DEFAULT_TENANT = "default"
+WORKFLOW_ID_PREFIX = "financial-research-workflow"
+# Temporal priority keys go from 1 (first) to 5, 3 being the default.
+_PRIORITY_KEYS: Dict[Lane, int] = {"interactive": 1, "batch": 4}
+
+
+def task_queue_for(lane: Lane) -> str:
+    return settings.batch_task_queue if lane == "batch" else settings.task_queue_url
+
+
+def workflow_priority(tenant: str | None, lane: Lane) -> Priority:
+    """Priority of the workflow and, by inheritance, of its activities; servers with fairness enabled balance tenants within a queue."""
+    return Priority(priority_key=_PRIORITY_KEYS[lane], fairness_key=tenant or DEFAULT_TENANT)
+
+
+def new_workflow_id(tenant: str | None) -> str:
+    # Tenants cannot contain "-" (see QueryModel), so the prefix of a tenant never matches another one.
+    return f"{WORKFLOW_ID_PREFIX}-{tenant or DEFAULT_TENANT}-{uuid4()}"
+
+
+def running_batch_workflows_query(tenant: str | None) -> str:
+    """Visibility query of the tenant's running batch workflows, matched on the workflow id prefix."""
+    return (
+        f"ExecutionStatus = 'Running' AND TaskQueue = '{settings.batch_task_queue}'"
+        f" AND WorkflowId STARTS_WITH '{WORKFLOW_ID_PREFIX}-{tenant or DEFAULT_TENANT}-'"
+    )
+
+
+def quota_exceeded(tenant: str | None) -> ApplicationError:
+    return ApplicationError(
+        f"Tenant '{tenant or DEFAULT_TENANT}' is at its quota of concurrent LLM calls",
+        type="TenantQuotaExceeded",
+        non_retryable=False,
+        next_retry_delay=timedelta(seconds=settings.tenant_quota_retry_seconds),
+    )
+
+
+class TenantLimiter:
+    """
+    Per-tenant cap on concurrent calls within a worker process.
+
+    Calls over the cap fail fast with a retryable ApplicationError instead of waiting for a
+    slot: a waiting activity would hold a worker slot that other tenants could use, while
+    Temporal retries it after `next_retry_delay` without holding one. Each rejection still
+    counts as an attempt and spends `next_retry_delay` of schedule_to_close, which
+    `activity_opts` adds on top of the profile for the batch lane.
+
+    Activities run on the worker's event loop, so no locking is needed.
+    """
+
+    def __init__(self, max_concurrent: int):
+        self.max_concurrent = max_concurrent
+        self._in_flight: Dict[str, int] = {}
+
+    def in_flight(self, tenant: str | None) -> int:
+        return self._in_flight.get(tenant or DEFAULT_TENANT, 0)
+
+    def acquire(self, tenant: str | None):
+        """Take a slot for the tenant, or raise a retryable ApplicationError when it has none left."""
+        tenant = tenant or DEFAULT_TENANT
+        if self.in_flight(tenant) >= self.max_concurrent:
+            TENANT_QUOTA_REJECTIONS.labels(tenant=tenant, stage="llm_call").inc()
+            raise quota_exceeded(tenant)
+        self._in_flight[tenant] = self.in_flight(tenant) + 1
+
+    def release(self, tenant: str | None):
+        tenant = tenant or DEFAULT_TENANT
+        self._in_flight[tenant] -= 1
+        if not self._in_flight[tenant]:
+            del self._in_flight[tenant]
+
+
+_limiter: TenantLimiter | None = None
+
+
+def get_tenant_limiter() -> TenantLimiter:
+    """Limiter shared by every batch activity of this worker process."""
+    global _limiter
+    if _limiter is None:
+        _limiter = TenantLimiter(settings.tenant_max_concurrent_llm_calls)
+    return _limiter
@@ -0,0 +1,137 @@
+import asyncio
+import base64
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List
+
+from pydantic import ValidationError
+from temporalio.client import Client, WorkflowExecution, WorkflowExecutionStatus
+
+from logger import get_logger
+from models.structured_output import FinancialReportWorkflowOutput
+from models.workflow import WorkflowStatus, WorkflowStatusName, WorkflowStatusPage
+
+logger = get_logger(__name__)
+
+_STATUS_NAMES: Dict[WorkflowExecutionStatus, WorkflowStatusName] = {
+    WorkflowExecutionStatus.RUNNING: "running",
+    WorkflowExecutionStatus.COMPLETED: "completed",
+    WorkflowExecutionStatus.FAILED: "failed",
+    WorkflowExecutionStatus.CANCELED: "cancelled",
+    WorkflowExecutionStatus.TERMINATED: "terminated",
+    WorkflowExecutionStatus.CONTINUED_AS_NEW: "continued_as_new",
+    WorkflowExecutionStatus.TIMED_OUT: "timed_out",
+}
+# Values of the ExecutionStatus search attribute in visibility queries.
+_VISIBILITY_STATUS: Dict[WorkflowStatusName, str] = {
+    "running": "Running",
+    "completed": "Completed",
+    "failed": "Failed",
+    "cancelled": "Canceled",
+    "terminated": "Terminated",
+    "continued_as_new": "ContinuedAsNew",
+    "timed_out": "TimedOut",
+}
+
+
+def visibility_query(workflow_type: str, status: WorkflowStatusName | None = None) -> str:
+    query = f"WorkflowType = '{workflow_type}'"
+    if status is not None:
+        query += f" AND ExecutionStatus = '{_VISIBILITY_STATUS[status]}'"
+    return query
+
+
+def encode_page_token(token: bytes | None) -> str | None:
+    return base64.urlsafe_b64encode(token).decode() if token else None
+
+
+def decode_page_token(token: str | None) -> bytes | None:
+    return base64.urlsafe_b64decode(token.encode()) if token else None
+
+
+async def workflow_status(execution: WorkflowExecution) -> WorkflowStatus:
+    """Status of a workflow from its visibility record; reads the memo, never the workflow itself."""
+    memo = await execution.memo()
+    closed = execution.close_time or datetime.now(timezone.utc)
+    return WorkflowStatus(
+        workflow_id=execution.id,
+        run_id=execution.run_id,
+        status=_STATUS_NAMES.get(execution.status, "running"),
+        stage=memo.get("stage"),
+        query=memo.get("query"),
+        tenant=memo.get("tenant"),
+        priority=memo.get("priority"),
+        start_time=execution.start_time,
+        close_time=execution.close_time,
+        duration_seconds=(closed - execution.start_time).total_seconds(),
+    )
+
+
+async def fetch_results(client: Client, workflow_ids: Iterable[str], concurrency: int) -> Dict[str, Any]:
+    """
+    Results of completed workflows, at most `concurrency` requests at a time.
+
+    `handle.result()` reads the completion event from the history, unlike a query it does
+    not make a worker replay the workflow. A workflow whose result cannot be read maps to
+    the exception instead, so one failure does not fail the others.
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def fetch(workflow_id: str):
+        async with semaphore:
+            try:
+                return workflow_id, await client.get_workflow_handle(workflow_id).result()
+            except Exception as e:
+                logger.warning(f"Cannot fetch the result of workflow {workflow_id}: {e}")
+                return workflow_id, e
+
+    return dict(await asyncio.gather(*[fetch(workflow_id) for workflow_id in workflow_ids]))
+
+
+async def list_workflow_statuses(
+        client: Client,
+        workflow_type: str,
+        page_size: int = 50,
+        next_page_token: str | None = None,
+        status: WorkflowStatusName | None = None,
+        include_results: Iterable[str] = (),
+        results_concurrency: int = 10,
+) -> WorkflowStatusPage:
+    """
+    One page of workflows from the visibility store, newest first.
+
+    Args:
+        client: Temporal client
+        workflow_type: Workflow type to list
+        page_size: Number of workflows per page
+        next_page_token: Token returned with the previous page
+        status: Only list workflows in this status
+        include_results: Workflow ids whose result should be fetched, when they are completed;
+            a result that cannot be fetched sets `result_error` on its entry instead
+        results_concurrency: Maximum number of results fetched concurrently
+
+    Returns:
+        The page and the token of the next one.
+    """
+    iterator = client.list_workflows(
+        visibility_query(workflow_type, status),
+        page_size=page_size,
+        next_page_token=decode_page_token(next_page_token),
+    )
+    await iterator.fetch_next_page()
+    workflows: List[WorkflowStatus] = [await workflow_status(execution) for execution in iterator.current_page]
+
+    requested = set(include_results)
+    completed = [w.workflow_id for w in workflows if w.workflow_id in requested and w.status == "completed"]
+    if completed:
+        results = await fetch_results(client, completed, results_concurrency)
+        for workflow in workflows:
+            result = results.get(workflow.workflow_id)
+            if isinstance(result, Exception):
+                workflow.result_error = f"{type(result).__name__}: {result}"
+            elif result is not None:
+                try:
+                    workflow.result = FinancialReportWorkflowOutput.model_validate(result)
+                except ValidationError as e:
+                    workflow.result_error = f"Invalid result: {e.error_count()} validation errors"
+
+    return WorkflowStatusPage(workflows=workflows, next_page_token=encode_page_token(iterator.next_page_token))
@@ -1,36 +1,66 @@
-import asyncio
+import os
 
-from temporalio.client import Client
-from temporalio.worker import Worker
+# pydantic scans every installed distribution for plugins when the first model is defined,
+# and logfire's plugin imports the whole SDK. We do not use pydantic instrumentation, so the
+# entrypoints skip the scan to keep process start-up fast. Set PYDANTIC_DISABLE_PLUGINS to override.
+os.environ.setdefault("PYDANTIC_DISABLE_PLUGINS", "__all__")
 
-from config import settings
+import asyncio  # noqa: E402
+
+from temporalio.worker import Worker  # noqa: E402
+
+from config import settings  # noqa: E402
 from tasks.activities.financial_agents import (
     create_agent_activity,
+    resolve_cached_agent_activity,
     start_conversation_activity,
     run_activity,
 )
-from tasks.workflows.financial_agents import FinancialResearchWorkflow
-from logger import get_logger
+from tasks.activities.reports import save_report_activity  # noqa: E402
+from agents.activity_profiles import flush_latencies  # noqa: E402
+from tasks.workflows.financial_agents import FinancialResearchWorkflow  # noqa: E402
+from tasks.utils.common import get_temporal_client, workflow_runner  # noqa: E402
+from tasks.utils.interceptors import MetricsInterceptor  # noqa: E402
+from metrics import start_metrics_server  # noqa: E402
+from observability import instrument_worker  # noqa: E402
+from logger import get_logger  # noqa: E402
 logger = get_logger(__name__)
 
 async def main():
-    client = await Client.connect(
-        settings.temporal_server_url,
-    )
-
-    worker = Worker(
-        client,
-        task_queue="financial-research-task-queue",
-        workflows=[FinancialResearchWorkflow],
-        activities=[
-            create_agent_activity,
-            start_conversation_activity,
-            run_activity,
-        ],
-    )
-
-    logger.info("Starting financial research worker...")
-    await worker.run()
+    instrument_worker()
+    client = await get_temporal_client()
+
+    # One worker per lane, so batch workflows never take the interactive lane's activity slots.
+    workers = [
+        Worker(
+            client,
+            task_queue=task_queue,
+            workflows=[FinancialResearchWorkflow],
+            activities=[
+                create_agent_activity,
+                resolve_cached_agent_activity,
+                start_conversation_activity,
+                run_activity,
+                save_report_activity,
+            ],
+            interceptors=[MetricsInterceptor()],
+            workflow_runner=workflow_runner(),
+            max_concurrent_activities=max_concurrent_activities,
+        )
+        for task_queue, max_concurrent_activities in (
+            (settings.task_queue_url, settings.interactive_max_concurrent_activities),
+            (settings.batch_task_queue, settings.batch_max_concurrent_activities),
+        )
+    ]
+
+    start_metrics_server(settings.worker_metrics_port)
+    logger.info(f"Serving Prometheus metrics on port {settings.worker_metrics_port}")
+
+    logger.info("Starting financial research worker (interactive and batch lanes)...")
+    try:
+        await asyncio.gather(*[worker.run() for worker in workers])
+    finally:
+        flush_latencies()
 
 if __name__ == "__main__":
     asyncio.run(main())
@@ -1,16 +1,22 @@
 import asyncio
+from typing import TypeVar
 
 from temporalio import workflow
+from temporalio.exceptions import ActivityError
 
 with workflow.unsafe.imports_passed_through():
-    from tasks.utils.common import ACTIVITY_OPTS
+    from tasks.utils.common import ACTIVITY_OPTS, LOCAL_ACTIVITY_OPTS, activity_opts
+    from tasks.activities.reports import save_report_activity
     from tasks.activities.financial_agents import (
         create_agent_activity,
+        resolve_cached_agent_activity,
         start_conversation_activity,
         run_activity,
     )
     from agents.agents_params import AGENTS_PARAMS
-    from models.agents import AgentRunInputModel, QueryModel
+    from models.agents import AgentCreationModel, AgentRunInputModel, QueryModel
+    from models.ledger import AgentRunResult, UsageLedger
+    from models.reports import SaveReportInput
     from models.structured_output import (
         AnalysisSummary,
         FinancialSearchPlan,
@@ -18,62 +24,134 @@ with workflow.unsafe.imports_passed_through():
         VerificationResult,
         FinancialReportWorkflowOutput,
         WriterAgentInputModel,
+        compact_search_results,
+        dedupe_searches,
         format_search_results,
     )
-    from logger import get_logger
-    logger = get_logger(__name__)
+
+# Workflows started before agents were resolved locally replay the original commands.
+LOCAL_STEPS_PATCH = "local-agent-cache"
+REPORT_STORE_PATCH = "report-store"
+STAGE_MEMO_PATCH = "stage-memo"
+
+# Agent activities are started by name: given the function, the SDK decodes the result into its
+# return hint, the unparameterized AgentRunResult, and ignores result_type.
+RUN_ACTIVITY = run_activity.__name__
+START_CONVERSATION_ACTIVITY = start_conversation_activity.__name__
+
+# Searches kept from the plan when the budget is already exceeded before they start.
+MIN_SEARCHES_OVER_BUDGET = 1
+
+OutputT = TypeVar("OutputT")
+
+# The workflow logger adds the workflow's ids to each record and stays silent while replaying.
+logger = workflow.logger
 
 @workflow.defn
 class FinancialResearchWorkflow:
     def __init__(self):
         self.final_report = None
+        self.ledger = UsageLedger()
+
+    def _set_stage(self, stage: str):
+        # Reported through the memo so the list endpoint reads it from visibility, without querying the workflow.
+        if workflow.patched(STAGE_MEMO_PATCH):
+            workflow.upsert_memo({"stage": stage})
+
+    def _output(self, stage: str, result: AgentRunResult[OutputT]) -> OutputT:
+        """The output of an agent activity, its usage recorded in the ledger."""
+        if result.usage is not None:
+            self.ledger.record(stage, result.usage)
+        return result.output
+
+    def _over_budget(self, stage: str) -> bool:
+        """Whether the optional `stage` must be skipped or shortened to stay within the budget."""
+        reason = self.ledger.over_budget((workflow.now() - workflow.info().start_time).total_seconds())
+        if reason is None:
+            return False
+        self.ledger.skipped.append(f"{stage}: {reason}")
+        logger.warning(f"Over budget, reducing {stage}: {reason}")
+        return True
+
+    async def _agent(self, name: str) -> AgentCreationModel:
+        """
+        Agent for `name`: one reused from the worker's agent cache through a local activity (a
+        marker in the history instead of three activity events and a task queue round trip),
+        created by a regular activity otherwise.
+        """
+        params = AGENTS_PARAMS[name]
+        if workflow.patched(LOCAL_STEPS_PATCH):
+            cached = await workflow.execute_local_activity(resolve_cached_agent_activity, params, **LOCAL_ACTIVITY_OPTS)
+            if cached is not None:
+                return cached
+        return await workflow.execute_activity(create_agent_activity, params, summary=f"create {name}", **ACTIVITY_OPTS)
 
     @workflow.run
     async def run(self, query: QueryModel) -> FinancialReportWorkflowOutput:
+        tenant = query.tenant
+        max_searches = query.max_searches
+        lane = query.priority
+        # Chosen by the client that started the workflow: reading the config here would change on replay.
+        search_local_corpus = query.search_local_corpus
+        self.ledger.budget = query.budget
         query = query.query
+        self._set_stage("create_agents")
         logger.info("Create agents started")
         agents = await asyncio.gather(
-            workflow.execute_activity(create_agent_activity, AGENTS_PARAMS["ANALYST"], **ACTIVITY_OPTS),
-            workflow.execute_activity(create_agent_activity, AGENTS_PARAMS["FUNDAMENTALS"], **ACTIVITY_OPTS),
-            workflow.execute_activity(create_agent_activity, AGENTS_PARAMS["PLANNER"], **ACTIVITY_OPTS),
-            workflow.execute_activity(create_agent_activity, AGENTS_PARAMS["RISK"], **ACTIVITY_OPTS),
-            workflow.execute_activity(create_agent_activity, AGENTS_PARAMS["SEARCH"], **ACTIVITY_OPTS),
-            workflow.execute_activity(create_agent_activity, AGENTS_PARAMS["VERIFIER"], **ACTIVITY_OPTS),
-            workflow.execute_activity(create_agent_activity, AGENTS_PARAMS["WRITER"], **ACTIVITY_OPTS),
+            *[self._agent(name) for name in ("ANALYST", "FUNDAMENTALS", "PLANNER", "RISK", "SEARCH", "VERIFIER", "WRITER")]
         )
 
         analyst_agent, fundamental_agent, planner_agent, risk_agent, search_agent, verifier_agent, writer_agent = agents
         logger.info("Create agents completed")
 
+        self._set_stage("analyst")
         logger.info("Analyst agent started")
         price_result = await workflow.execute_activity(
-            run_activity,
+            RUN_ACTIVITY,
             AgentRunInputModel(
                 id=analyst_agent.id,
                 inputs=query,
                 response_format=AGENTS_PARAMS["ANALYST"].response_format,
                 mcp_server_url=AGENTS_PARAMS["ANALYST"].mcp_server_url,
+                agent="ANALYST",
+                tenant=tenant,
             ),
-            **ACTIVITY_OPTS,
+            summary="ANALYST",
+            result_type=AgentRunResult[AnalysisSummary],
+            **activity_opts(AGENTS_PARAMS["ANALYST"].activity_profile, lane),
         )
-        price_result = AnalysisSummary(**price_result)
+        price_result = self._output("ANALYST", price_result)
 
+        self._set_stage("planner")
         logger.info("Planner agent started")
         search_plan = await workflow.execute_activity(
-            start_conversation_activity,
+            START_CONVERSATION_ACTIVITY,
             AgentRunInputModel(
                 id=planner_agent.id,
                 inputs=query,
                 response_format=AGENTS_PARAMS["PLANNER"].response_format,
                 mcp_server_url=AGENTS_PARAMS["PLANNER"].mcp_server_url,
+                agent="PLANNER",
+                tenant=tenant,
+                cache_ttl_seconds=AGENTS_PARAMS["PLANNER"].cache_ttl_seconds,
             ),
-            **ACTIVITY_OPTS,
+            summary="PLANNER",
+            result_type=AgentRunResult[FinancialSearchPlan],
+            **activity_opts(AGENTS_PARAMS["PLANNER"].activity_profile, lane),
         )
 
-        search_plan = FinancialSearchPlan(**search_plan)
+        search_plan = self._output("PLANNER", search_plan)
+        if workflow.patched(LOCAL_STEPS_PATCH):
+            search_plan = dedupe_searches(search_plan)
+        if max_searches is not None:
+            search_plan = FinancialSearchPlan(searches=search_plan.searches[:max_searches])
+        if len(search_plan.searches) > MIN_SEARCHES_OVER_BUDGET and self._over_budget("searches"):
+            search_plan = FinancialSearchPlan(searches=search_plan.searches[:MIN_SEARCHES_OVER_BUDGET])
         logger.info("Planner agent completed")
 
+        self._set_stage("search")
         logger.info("Search agents started")
+        search_activity = RUN_ACTIVITY if search_local_corpus else START_CONVERSATION_ACTIVITY
         search_activities = []
         for search_item in search_plan.searches:
             payload = AgentRunInputModel(
@@ -81,49 +159,68 @@ class FinancialResearchWorkflow:
                 inputs=search_item.query,
                 response_format=AGENTS_PARAMS["SEARCH"].response_format,
                 mcp_server_url=AGENTS_PARAMS["SEARCH"].mcp_server_url,
+                agent="SEARCH",
+                tenant=tenant,
+                cache_ttl_seconds=AGENTS_PARAMS["SEARCH"].cache_ttl_seconds,
             )
             search_activities.append(
                 workflow.execute_activity(
-                    start_conversation_activity,
+                    search_activity,
                     payload,
-                    **ACTIVITY_OPTS,
+                    summary="SEARCH",
+                    result_type=AgentRunResult[AnalysisSummary],
+                    **activity_opts(AGENTS_PARAMS["SEARCH"].activity_profile, lane),
                 )
             )
 
         search_results = await asyncio.gather(*search_activities)
-        search_results = [AnalysisSummary(**result) for result in search_results]
+        search_results = [self._output("SEARCH", result) for result in search_results]
+        if workflow.patched(LOCAL_STEPS_PATCH):
+            search_results = compact_search_results(search_results)
         search_results_formatted = format_search_results(search_results)
         logger.info("Search agents completed")
 
+        self._set_stage("risk_and_fundamentals")
         logger.info("Risk and fundamental agents started")
         risk_handle = workflow.start_activity(
-            start_conversation_activity,
+            START_CONVERSATION_ACTIVITY,
             AgentRunInputModel(
                 id=risk_agent.id,
                 inputs=search_results_formatted,
                 response_format=AGENTS_PARAMS["RISK"].response_format,
                 mcp_server_url=AGENTS_PARAMS["RISK"].mcp_server_url,
+                agent="RISK",
+                tenant=tenant,
+                cache_ttl_seconds=AGENTS_PARAMS["RISK"].cache_ttl_seconds,
             ),
-            **ACTIVITY_OPTS,
+            summary="RISK",
+            result_type=AgentRunResult[AnalysisSummary],
+            **activity_opts(AGENTS_PARAMS["RISK"].activity_profile, lane),
         )
         fundamentals_handle = workflow.start_activity(
-            start_conversation_activity,
+            START_CONVERSATION_ACTIVITY,
             AgentRunInputModel(
                 id=fundamental_agent.id,
                 inputs=search_results_formatted,
                 response_format=AGENTS_PARAMS["FUNDAMENTALS"].response_format,
                 mcp_server_url=AGENTS_PARAMS["FUNDAMENTALS"].mcp_server_url,
+                agent="FUNDAMENTALS",
+                tenant=tenant,
+                cache_ttl_seconds=AGENTS_PARAMS["FUNDAMENTALS"].cache_ttl_seconds,
             ),
-            **ACTIVITY_OPTS,
+            summary="FUNDAMENTALS",
+            result_type=AgentRunResult[AnalysisSummary],
+            **activity_opts(AGENTS_PARAMS["FUNDAMENTALS"].activity_profile, lane),
         )
         risk_result, fundamentals_result = await asyncio.gather(
             *[risk_handle,
             fundamentals_handle]
         )
-        risk_result = AnalysisSummary(**risk_result)
-        fundamentals_result = AnalysisSummary(**fundamentals_result)
+        risk_result = self._output("RISK", risk_result)
+        fundamentals_result = self._output("FUNDAMENTALS", fundamentals_result)
         logger.info("Risk and fundamental agents completed")
 
+        self._set_stage("writer")
         logger.info("Writer agents started")
         writer_input = WriterAgentInputModel(
             fundamentals_analysis=fundamentals_result,
@@ -131,40 +228,51 @@ class FinancialResearchWorkflow:
             risk_analysis=risk_result,
         )
         report = await workflow.execute_activity(
-            start_conversation_activity,
+            START_CONVERSATION_ACTIVITY,
             AgentRunInputModel(
                 id=writer_agent.id,
                 inputs=writer_input.model_dump_json(),
                 response_format=AGENTS_PARAMS["WRITER"].response_format,
                 mcp_server_url=AGENTS_PARAMS["WRITER"].mcp_server_url,
+                agent="WRITER",
+                tenant=tenant,
+                cache_ttl_seconds=AGENTS_PARAMS["WRITER"].cache_ttl_seconds,
             ),
-            **ACTIVITY_OPTS,
+            summary="WRITER",
+            result_type=AgentRunResult[FinancialReportData],
+            **activity_opts(AGENTS_PARAMS["WRITER"].activity_profile, lane),
         )
-        report = FinancialReportData(**report)
+        report = self._output("WRITER", report)
         logger.info("Writer agent completed")
 
-        logger.info("Verifier agents started")
-        verification = await workflow.execute_activity(
-            start_conversation_activity,
-            AgentRunInputModel(
-                id=verifier_agent.id,
-                inputs=str(report),
-                response_format=AGENTS_PARAMS["VERIFIER"].response_format,
-                mcp_server_url=AGENTS_PARAMS["VERIFIER"].mcp_server_url,
-            ),
-            **ACTIVITY_OPTS,
+        verification = None
+        if not self._over_budget("verifier"):
+            self._set_stage("verifier")
+            logger.info("Verifier agents started")
+            verification = await workflow.execute_activity(
+                START_CONVERSATION_ACTIVITY,
+                AgentRunInputModel(
+                    id=verifier_agent.id,
+                    inputs=str(report),
+                    response_format=AGENTS_PARAMS["VERIFIER"].response_format,
+                    mcp_server_url=AGENTS_PARAMS["VERIFIER"].mcp_server_url,
+                    agent="VERIFIER",
+                    tenant=tenant,
+                    cache_ttl_seconds=AGENTS_PARAMS["VERIFIER"].cache_ttl_seconds,
+                ),
+                summary="VERIFIER",
+                result_type=AgentRunResult[VerificationResult],
+                **activity_opts(AGENTS_PARAMS["VERIFIER"].activity_profile, lane),
+            )
+            verification = self._output("VERIFIER", verification)
+            logger.info("Verifier agent completed")
+
+        # The report is returned, stored and queryable: only its size is logged.
+        logger.info(
+            f"Report completed: {len(report.markdown_report)} characters, "
+            f"{len(report.follow_up_questions)} follow-up questions, "
+            f"verified: {verification.verified if verification else 'skipped'}"
         )
-        verification = VerificationResult(**verification)
-        logger.info("Verifier agent completed")
-
-        print("\n\n=====REPORT=====\n\n")
-        print(f"Report:\n{report.markdown_report}")
-        print("\n\n=====FOLLOW UP QUESTIONS=====\n\n")
-        print("\n".join(report.follow_up_questions))
-        print("\n\n=====PRICES ANALYSIS=====\n\n")
-        print(price_result.model_dump_json())
-        print("\n\n=====VERIFICATION=====\n\n")
-        print(verification.issues)
 
         self.final_report = FinancialReportWorkflowOutput(
             search_plan=search_plan,
@@ -173,11 +281,38 @@ class FinancialResearchWorkflow:
             risk_analysis=risk_result,
             fundamentals_analysis=fundamentals_result,
             price_analysis=price_result,
-            search_results=search_results
+            search_results=search_results,
+            ledger=self.ledger,
         )
 
+        if workflow.patched(REPORT_STORE_PATCH):
+            self._set_stage("save_report")
+            try:
+                await workflow.execute_activity(
+                    save_report_activity,
+                    SaveReportInput(
+                        workflow_id=workflow.info().workflow_id,
+                        query=query,
+                        tenant=tenant,
+                        created_at=workflow.now(),
+                        output=self.final_report,
+                    ),
+                    summary="save report",
+                    **ACTIVITY_OPTS,
+                )
+            except ActivityError as e:
+                # The report is still returned and queryable, only the store misses it.
+                logger.warning(f"Report not stored: {e}")
+
+        self._set_stage("completed")
+
         return self.final_report
 
     @workflow.query
-    def get_final_report(self):
+    def get_final_report(self) -> FinancialReportWorkflowOutput | None:
         return self.final_report
+
+    @workflow.query
+    def get_ledger(self) -> UsageLedger:
+        """Tokens, cost and time of the agent calls completed so far."""
+        return self.ledger
@@ -0,0 +1,88 @@
+import asyncio
+
+from agents import activity_profiles
+from agents.activity_profiles import (
+    FLUSH_EVERY,
+    MIN_SAMPLES,
+    WINDOW,
+    apply_latency_profiles,
+    derive_profile,
+    flush_latencies,
+    load_latencies,
+    record_latency,
+)
+from agents.agents_params import AGENTS_PARAMS
+from config import settings
+from models.agents import ActivityProfile
+from tasks.utils.common import activity_opts
+
+# Test derive_profile
+def test_derive_profile_keeps_base_without_enough_samples():
+    base = ActivityProfile(start_to_close_seconds=30)
+    assert derive_profile([1.] * (MIN_SAMPLES - 1), base) == base
+
+def test_derive_profile_follows_p99():
+    base = ActivityProfile(start_to_close_seconds=60, schedule_to_close_seconds=300)
+    profile = derive_profile([2.] * 99 + [10.], base)
+    assert 5 <= profile.start_to_close_seconds < 60
+    assert profile.schedule_to_close_seconds > profile.start_to_close_seconds * 3
+
+def test_derive_profile_has_floor():
+    profile = derive_profile([0.1] * 50, ActivityProfile())
+    assert profile.start_to_close_seconds == 5
+
+# Test latency log
+def _record(path, agent, latencies):
+    async def run():
+        for seconds in latencies:
+            await record_latency(path, agent, seconds)
+
+    asyncio.run(run())
+
+def test_latency_log_round_trip(tmp_path):
+    path = str(tmp_path / "latency.jsonl")
+    _record(path, "PLANNER", (1., 2., 3.))
+    assert load_latencies(path) == {}
+    flush_latencies()
+    assert load_latencies(path) == {"PLANNER": [1., 2., 3.]}
+
+def test_latency_log_written_in_batches(tmp_path):
+    path = str(tmp_path / "latency.jsonl")
+    _record(path, "PLANNER", [1.] * (FLUSH_EVERY + 1))
+    assert load_latencies(path) == {"PLANNER": [1.] * FLUSH_EVERY}
+
+def test_latency_log_is_compacted(tmp_path, monkeypatch):
+    monkeypatch.setattr(activity_profiles, "MAX_LOG_BYTES", 1000)
+    path = str(tmp_path / "latency.jsonl")
+    _record(path, "PLANNER", [float(i) for i in range(WINDOW + FLUSH_EVERY)])
+    _record(path, "WRITER", [1.] * FLUSH_EVERY)
+    latencies = load_latencies(path)
+    assert latencies["PLANNER"] == [float(i) for i in range(FLUSH_EVERY, WINDOW + FLUSH_EVERY)]
+    assert latencies["WRITER"] == [1.] * FLUSH_EVERY
+
+def test_apply_latency_profiles_only_updates_recorded_agents(tmp_path):
+    path = str(tmp_path / "latency.jsonl")
+    _record(path, "PLANNER", [1.] * MIN_SAMPLES)
+    flush_latencies()
+    updated = apply_latency_profiles(AGENTS_PARAMS, path)
+    assert updated["PLANNER"].activity_profile.start_to_close_seconds == 5
+    assert updated["WRITER"].activity_profile == AGENTS_PARAMS["WRITER"].activity_profile
+
+# Test activity_opts
+def test_activity_opts_from_profile():
+    opts = activity_opts(AGENTS_PARAMS["WRITER"].activity_profile)
+    assert opts["start_to_close_timeout"].total_seconds() == 120
+    assert opts["schedule_to_close_timeout"] > opts["start_to_close_timeout"]
+    assert opts["retry_policy"].maximum_attempts == 10
+
+def test_batch_activity_opts_budget_quota_rejections():
+    profile = AGENTS_PARAMS["WRITER"].activity_profile
+    interactive, batch = activity_opts(profile), activity_opts(profile, "batch")
+    rejections = settings.tenant_quota_max_rejections
+    assert batch["retry_policy"].maximum_attempts == interactive["retry_policy"].maximum_attempts + rejections
+    assert (batch["schedule_to_close_timeout"] - interactive["schedule_to_close_timeout"]).total_seconds() == (
+        rejections * settings.tenant_quota_retry_seconds
+    )
+    assert batch["start_to_close_timeout"] == interactive["start_to_close_timeout"]
+    unlimited = activity_opts(profile.model_copy(update={"maximum_attempts": 0}), "batch")
+    assert unlimited["retry_policy"].maximum_attempts == 0
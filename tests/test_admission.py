@@ -0,0 +1,90 @@
+import asyncio
+
+import pytest
+
+from api.admission import AdmissionController, AdmissionRejected, LoadSignals
+from models.agents import QueryModel
+
+QUERY = QueryModel(query="Analyze AAPL")
+
+
+class FakeSignals:
+    def __init__(self, running_workflows: int = 0, backlog_age_seconds: float = 0.):
+        self.running_workflows = running_workflows
+        self.backlog_age_seconds = backlog_age_seconds
+        self.reads = 0
+
+    async def __call__(self, task_queue: str) -> LoadSignals:
+        self.reads += 1
+        return LoadSignals(self.running_workflows, 0, self.backlog_age_seconds)
+
+
+def _controller(signals, **kwargs) -> AdmissionController:
+    kwargs.setdefault("max_running_workflows", 2)
+    kwargs.setdefault("refresh_seconds", 0.01)
+    return AdmissionController(signals, **kwargs)
+
+# Test admission under normal load
+def test_admits_until_running_limit_within_refresh_window():
+    signals = FakeSignals(running_workflows=0)
+    controller = _controller(signals, policy="reject", refresh_seconds=60)
+
+    async def scenario():
+        await controller.admit(QUERY)
+        await controller.admit(QUERY)
+        with pytest.raises(AdmissionRejected) as error:
+            await controller.admit(QUERY)
+        return error.value
+
+    error = asyncio.run(scenario())
+    assert error.retry_after_seconds == 10
+    assert signals.reads == 1
+
+def test_admits_when_signals_cannot_be_read():
+    async def failing(task_queue):
+        raise RuntimeError("visibility unavailable")
+
+    controller = _controller(failing, policy="reject")
+    assert asyncio.run(controller.admit(QUERY)) == QUERY
+
+# Test reject policy
+def test_reject_policy_on_backlog_age():
+    controller = _controller(FakeSignals(backlog_age_seconds=30), policy="reject", max_backlog_age_seconds=10)
+    with pytest.raises(AdmissionRejected):
+        asyncio.run(controller.admit(QUERY))
+
+# Test degrade policy
+def test_degrade_policy_limits_searches_then_rejects():
+    controller = _controller(FakeSignals(running_workflows=2), policy="degrade", degraded_max_searches=3)
+
+    degraded = asyncio.run(controller.admit(QUERY))
+    assert degraded.max_searches == 3
+    assert degraded.query == QUERY.query
+
+    controller = _controller(FakeSignals(running_workflows=4), policy="degrade")
+    with pytest.raises(AdmissionRejected):
+        asyncio.run(controller.admit(QUERY))
+
+# Test queue policy
+def test_queue_policy_waits_for_room():
+    signals = FakeSignals(running_workflows=2)
+    controller = _controller(signals, policy="queue", queue_timeout_seconds=5)
+
+    async def scenario():
+        waiting = asyncio.create_task(controller.admit(QUERY))
+        await asyncio.sleep(0.05)
+        assert not waiting.done()
+        signals.running_workflows = 1
+        return await waiting
+
+    assert asyncio.run(scenario()) == QUERY
+
+def test_queue_policy_is_bounded():
+    controller = _controller(FakeSignals(running_workflows=2), policy="queue", max_pending=1, queue_timeout_seconds=0.05)
+
+    async def scenario():
+        return await asyncio.gather(controller.admit(QUERY), controller.admit(QUERY), return_exceptions=True)
+
+    first, second = asyncio.run(scenario())
+    assert isinstance(first, AdmissionRejected) and "overloaded" in str(first)
+    assert isinstance(second, AdmissionRejected) and "full" in str(second)
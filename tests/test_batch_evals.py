@@ -0,0 +1,79 @@
+import asyncio
+import json
+
+from agents.cache import TTLCache
+from examples.batch_evals import load_cases, run_batch, summary_table
+
+
+class FakeMetric:
+    """Stands in for a DeepEval metric: records concurrency and scores by output length."""
+    running = 0
+    max_running = 0
+    calls = 0
+
+    async def a_measure(self, test_case):
+        cls = FakeMetric
+        cls.calls += 1
+        cls.running += 1
+        cls.max_running = max(cls.max_running, cls.running)
+        await asyncio.sleep(0.01)
+        cls.running -= 1
+        self.score = 1. if test_case.actual_output else 0.
+        self.success = self.score >= 0.5
+        self.reason = "fake"
+
+
+def _report(markdown: str) -> dict:
+    summary = {"summary": "Revenue grew 12%"}
+    return {
+        "query": "Analyze NVDA",
+        "search_plan": {"searches": []},
+        "report": {"short_summary": "s", "markdown_report": markdown, "follow_up_questions": []},
+        "verification": {"verified": True, "issues": ""},
+        "risk_analysis": summary,
+        "fundamentals_analysis": summary,
+        "price_analysis": summary,
+        "search_results": [summary],
+    }
+
+
+def _cases(tmp_path, n):
+    paths = []
+    for i in range(n):
+        path = tmp_path / f"report-{i}.json"
+        path.write_text(json.dumps(_report(f"# Report {i}")))
+        paths.append(str(path))
+    return load_cases(paths)
+
+# Test load_cases
+def test_load_cases(tmp_path):
+    case = _cases(tmp_path, 1)[0]
+    assert case.name == "report-0"
+    assert case.input == "Analyze NVDA"
+    assert case.retrieval_context == ["Revenue grew 12%"]
+
+# Test run_batch
+def test_run_batch_caps_concurrency_and_caches(tmp_path):
+    FakeMetric.calls = FakeMetric.max_running = 0
+    cases = _cases(tmp_path, 6)
+    metrics = {"faithfulness": FakeMetric, "bias": FakeMetric}
+    cache = TTLCache(path=str(tmp_path / "cache.sqlite"))
+
+    results = asyncio.run(run_batch(cases, metrics, cache, concurrency=3, make_test_case=lambda case: case))
+    assert len(results) == 12
+    assert FakeMetric.calls == 12
+    assert FakeMetric.max_running == 3
+    assert all(result.success and not result.cached for result in results)
+
+    again = asyncio.run(run_batch(cases, metrics, TTLCache(path=str(tmp_path / "cache.sqlite")), make_test_case=lambda case: case))
+    assert FakeMetric.calls == 12
+    assert all(result.cached for result in again)
+
+def test_failed_measurements_are_reported(tmp_path):
+    class Failing:
+        async def a_measure(self, test_case):
+            raise RuntimeError("judge unavailable")
+
+    results = asyncio.run(run_batch(_cases(tmp_path, 1), {"bias": Failing}, TTLCache(), make_test_case=lambda case: case))
+    assert results[0].error == "judge unavailable"
+    assert "| bias | 1 | 0 | 0.00 | 1 |" in summary_table(results)
@@ -0,0 +1,133 @@
+import asyncio
+
+import pytest
+
+from agents.cache import PURGE_INTERVAL_SECONDS, TTLCache, cache_key
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.
+
+    def __call__(self) -> float:
+        return self.now
+
+# Test cache_key
+def test_cache_key_is_stable():
+    assert cache_key({"b": 1, "a": 2}, "inputs") == cache_key({"a": 2, "b": 1}, "inputs")
+    assert cache_key({"a": 1}, "inputs") != cache_key({"a": 1}, "other inputs")
+
+# Test memory tier
+def test_entries_expire():
+    clock = FakeClock()
+    cache = TTLCache(clock=clock)
+    cache.set("key", {"summary": "x"}, ttl_seconds=10)
+    assert cache.get("key") == (True, {"summary": "x"})
+    clock.now += 11
+    assert cache.get("key") == (False, None)
+
+def test_lru_eviction():
+    cache = TTLCache(max_entries=2)
+    cache.set("a", 1, ttl_seconds=60)
+    cache.set("b", 2, ttl_seconds=60)
+    cache.get("a")
+    cache.set("c", 3, ttl_seconds=60)
+    assert cache.get("a") == (True, 1)
+    assert cache.get("b") == (False, None)
+
+# Test disk tier
+def test_disk_tier_shared_between_instances(tmp_path):
+    path = str(tmp_path / "cache.sqlite")
+    TTLCache(path=path).set("key", {"summary": "x"}, ttl_seconds=60)
+    assert TTLCache(path=path).get("key") == (True, {"summary": "x"})
+
+def test_get_or_compute_reads_disk_tier(tmp_path):
+    path = str(tmp_path / "cache.sqlite")
+
+    async def compute():
+        return {"summary": "x"}
+
+    async def not_called():
+        raise AssertionError("computed again")
+
+    assert asyncio.run(TTLCache(path=path).get_or_compute("key", 60, compute)) == ({"summary": "x"}, False)
+    assert asyncio.run(TTLCache(path=path).get_or_compute("key", 60, not_called)) == ({"summary": "x"}, True)
+
+def test_expired_entries_purged_periodically(tmp_path):
+    clock = FakeClock()
+    cache = TTLCache(path=str(tmp_path / "cache.sqlite"), clock=clock)
+    cache.set("old", 1, ttl_seconds=10)
+    clock.now += 20
+    cache.set("new", 2, ttl_seconds=10)
+
+    def count():
+        return cache._connect().execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+
+    assert count() == 2
+    clock.now += PURGE_INTERVAL_SECONDS
+    cache.set("newer", 3, ttl_seconds=10)
+    assert count() == 1
+    plan = cache._connect().execute("EXPLAIN QUERY PLAN DELETE FROM entries WHERE expires_at <= 0").fetchall()
+    assert "entries_expires_at" in str(plan)
+
+# Test single-flight
+def test_concurrent_identical_calls_are_coalesced():
+    cache = TTLCache()
+    calls = []
+
+    async def compute():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return "value"
+
+    async def run():
+        return await asyncio.gather(*[cache.get_or_compute("key", 60, compute) for _ in range(5)])
+
+    results = asyncio.run(run())
+    assert len(calls) == 1
+    assert [value for value, _ in results] == ["value"] * 5
+    assert sum(hit for _, hit in results) == 4
+
+def test_failures_are_not_cached():
+    cache = TTLCache()
+
+    async def fail():
+        raise ValueError("invalid output")
+
+    async def succeed():
+        return "value"
+
+    with pytest.raises(ValueError):
+        asyncio.run(cache.get_or_compute("key", 60, fail))
+    assert asyncio.run(cache.get_or_compute("key", 60, succeed)) == ("value", False)
+
+# Test agent cache activities
+def test_create_agent_activity_reuses_cached_agent(monkeypatch):
+    from temporalio.testing import ActivityEnvironment
+
+    from agents.agents_params import AGENTS_PARAMS
+    from agents.cache import get_agent_cache
+    from models.agents import AgentCreationModel
+    from tasks.activities import financial_agents
+
+    created = []
+
+    async def create_agent_async(params):
+        created.append(params.name)
+        return AgentCreationModel(id=f"agent-{len(created)}")
+
+    monkeypatch.setattr(financial_agents, "create_agent_async", create_agent_async)
+
+    async def record_latency(*args, **kwargs):
+        pass
+
+    monkeypatch.setattr(financial_agents, "record_latency", record_latency)
+    get_agent_cache()._memory.clear()
+    env = ActivityEnvironment()
+    params = AGENTS_PARAMS["WRITER"]
+
+    assert asyncio.run(env.run(financial_agents.resolve_cached_agent_activity, params)) is None
+    assert asyncio.run(env.run(financial_agents.create_agent_activity, params)).id == "agent-1"
+    assert asyncio.run(env.run(financial_agents.resolve_cached_agent_activity, params)).id == "agent-1"
+    assert asyncio.run(env.run(financial_agents.create_agent_activity, params)).id == "agent-1"
+    assert created == [params.name]
@@ -0,0 +1,91 @@
+import pytest
+from httpx import Response
+from temporalio.exceptions import ApplicationError
+
+from tasks.utils.circuit_breaker import CircuitBreaker, CircuitState
+from tasks.utils.retry_llm_call import http_response_to_application_error
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def breaker(clock):
+    return CircuitBreaker("test", failure_threshold=3, window_seconds=10, cooldown_seconds=30, clock=clock)
+
+# Test closed state
+def test_breaker_opens_after_sustained_failures(breaker):
+    for _ in range(3):
+        breaker.before_call()
+        breaker.record_failure()
+    assert breaker.state == CircuitState.OPEN
+
+def test_breaker_ignores_failures_outside_window(breaker, clock):
+    breaker.record_failure()
+    breaker.record_failure()
+    clock.now = 20
+    breaker.record_failure()
+    assert breaker.state == CircuitState.CLOSED
+
+# Test open state
+def test_open_breaker_fails_fast_with_cooldown_delay(breaker, clock):
+    for _ in range(3):
+        breaker.record_failure()
+    clock.now = 10
+    with pytest.raises(ApplicationError) as exc_info:
+        breaker.before_call()
+    assert exc_info.value.type == "CircuitOpen"
+    assert exc_info.value.non_retryable is False
+    assert exc_info.value.next_retry_delay.total_seconds() == 20
+
+# Test half-open state
+def test_half_open_probe_success_closes(breaker, clock):
+    for _ in range(3):
+        breaker.record_failure()
+    clock.now = 30
+    assert breaker.state == CircuitState.HALF_OPEN
+    breaker.before_call()
+    with pytest.raises(ApplicationError):
+        breaker.before_call()
+    breaker.record_success()
+    assert breaker.state == CircuitState.CLOSED
+    breaker.before_call()
+
+def test_half_open_probe_failure_reopens(breaker, clock):
+    for _ in range(3):
+        breaker.record_failure()
+    clock.now = 30
+    breaker.before_call()
+    breaker.record_failure()
+    assert breaker.state == CircuitState.OPEN
+
+def test_release_frees_probe_slot(breaker, clock):
+    for _ in range(3):
+        breaker.record_failure()
+    clock.now = 30
+    breaker.before_call()
+    breaker.release()
+    breaker.before_call()
+    assert breaker.state == CircuitState.HALF_OPEN
+
+# Test http_response_to_application_error integration
+def test_http_errors_feed_breaker(breaker):
+    for _ in range(3):
+        http_response_to_application_error(Response(503), circuit_breaker=breaker)
+    assert breaker.state == CircuitState.OPEN
+
+def test_rate_limits_do_not_open_breaker(breaker):
+    for _ in range(5):
+        error = http_response_to_application_error(Response(429), circuit_breaker=breaker)
+    assert error.type == "RateLimited"
+    assert breaker.state == CircuitState.CLOSED
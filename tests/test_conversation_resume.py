@@ -0,0 +1,224 @@
+import asyncio
+import dataclasses
+from types import SimpleNamespace
+
+from mistralai import (
+    ConversationHistory,
+    ConversationUsageInfo,
+    FunctionCallEntry,
+    FunctionResultEntry,
+    MessageInputEntry,
+    MessageOutputEntry,
+    MessageOutputEvent,
+    ResponseDoneEvent,
+    ResponseStartedEvent,
+)
+from temporalio.testing import ActivityEnvironment
+
+import agents.base as base
+from agents.base import _pending_function_calls, run_async, start_conversation_async
+from models.agents import AgentRunInputModel
+from models.structured_output import AnalysisSummary
+from tasks.utils.heartbeat import heartbeating, previous_progress
+
+MODEL = "mistral-small-latest"
+PARAMS = AgentRunInputModel(id="agent-1", inputs="Summarize NVDA prices", response_format="AnalysisSummary")
+OUTPUT = AnalysisSummary(summary="NVDA rose 4% this week").model_dump_json()
+
+
+class FakeConversations:
+    def __init__(self, history=()):
+        self.history = list(history)
+        self.started = 0
+
+    async def start_stream_async(self, inputs, **target):
+        self.started += 1
+
+        async def events():
+            yield SimpleNamespace(data=ResponseStartedEvent(conversation_id="conv-new"))
+            for i in range(0, len(OUTPUT), 10):
+                yield SimpleNamespace(data=MessageOutputEvent(id="msg-1", content=OUTPUT[i:i + 10], model=MODEL))
+            yield SimpleNamespace(data=ResponseDoneEvent(usage=ConversationUsageInfo(prompt_tokens=120, completion_tokens=30)))
+
+        return events()
+
+    async def get_history_async(self, conversation_id):
+        return ConversationHistory(conversation_id=conversation_id, entries=self.history)
+
+
+def _run(conversations: FakeConversations, monkeypatch, params: AgentRunInputModel = PARAMS, fn=start_conversation_async, **kwargs):
+    agent = SimpleNamespace(
+        id="agent-1", name="FinancialSearchAgent", model=MODEL, description=None, instructions="",
+        tools=None, completion_args=None,
+    )
+
+    async def get_agent(params):
+        return agent
+
+    monkeypatch.setattr(base, "get_client", lambda: SimpleNamespace(beta=SimpleNamespace(conversations=conversations)))
+    monkeypatch.setattr(base, "get_agent_async", get_agent)
+    return asyncio.run(fn(params, **kwargs))
+
+# Test a first attempt reports its conversation as soon as it starts
+def test_start_reports_conversation_id(monkeypatch):
+    conversations = FakeConversations()
+    progress = {}
+
+    result = _run(conversations, monkeypatch, on_progress=lambda **details: progress.update(details))
+
+    assert result.output == AnalysisSummary.model_validate_json(OUTPUT)
+    assert (result.usage.model, result.usage.input_tokens, result.usage.output_tokens) == (MODEL, 120, 30)
+    assert progress == {"conversation_id": "conv-new", "output_chars": len(OUTPUT)}
+    assert conversations.started == 1
+
+# Test a retry reuses the output the server finished generating
+def test_resume_reuses_finished_output(monkeypatch):
+    conversations = FakeConversations([
+        MessageInputEntry(role="user", content=PARAMS.inputs),
+        MessageOutputEntry(content=OUTPUT, model=MODEL),
+    ])
+
+    result = _run(conversations, monkeypatch, resume_from="conv-old")
+
+    assert result.output == AnalysisSummary.model_validate_json(OUTPUT)
+    assert (result.usage.input_tokens, result.usage.output_tokens) == (0, 0)
+    assert conversations.started == 0
+
+# Test a reused output is cached with its (zero) token counts
+def test_resumed_output_is_cached(monkeypatch):
+    from agents.cache import TTLCache
+    from config import settings
+
+    monkeypatch.setattr(settings, "conversation_cache_enabled", True)
+    monkeypatch.setattr(base, "get_conversation_cache", lambda cache=TTLCache(): cache)
+    params = PARAMS.model_copy(update={"cache_ttl_seconds": 60})
+    conversations = FakeConversations([MessageOutputEntry(content=OUTPUT, model=MODEL)])
+
+    resumed = _run(conversations, monkeypatch, params, resume_from="conv-old")
+    hit = _run(conversations, monkeypatch, params)
+
+    assert resumed.output == hit.output == AnalysisSummary.model_validate_json(OUTPUT)
+    assert hit.usage.cached and (hit.usage.model, hit.usage.input_tokens) == (MODEL, 0)
+    assert conversations.started == 0
+
+# Test a retry starts over when the previous conversation has no usable output
+def test_resume_restarts_without_output(monkeypatch):
+    for history in ([MessageInputEntry(role="user", content=PARAMS.inputs)],
+                    [MessageOutputEntry(content='{"summ', model=MODEL)]):
+        conversations = FakeConversations(history)
+
+        result = _run(conversations, monkeypatch, resume_from="conv-old")
+
+        assert result.output == AnalysisSummary.model_validate_json(OUTPUT)
+        assert conversations.started == 1
+
+class FakeRunContext:
+    instances = []
+
+    def __init__(self, results=(), **kwargs):
+        self.kwargs, self.results, self.registered = kwargs, list(results), 0
+        FakeRunContext.instances.append(self)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        pass
+
+    async def register_mcp_clients(self, mcp_clients):
+        self.registered += 1
+
+    async def execute_function_calls(self, function_calls):
+        return self.results
+
+
+class FakeRunConversations(FakeConversations):
+    def __init__(self, history=()):
+        super().__init__(history)
+        self.runs = []
+
+    async def run_stream_async(self, inputs, run_ctx, **target):
+        from mistralai.extra.run.result import RunResult
+
+        self.runs.append(inputs)
+
+        async def events():
+            yield SimpleNamespace(data=ResponseStartedEvent(conversation_id="conv-new"))
+            yield SimpleNamespace(data=ResponseDoneEvent(usage=ConversationUsageInfo(prompt_tokens=200, completion_tokens=30)))
+            yield RunResult(input_entries=[], conversation_id="conv-new", output_entries=[MessageOutputEntry(content=OUTPUT, model=MODEL)])
+
+        return events()
+
+
+def _run_tools(conversations, monkeypatch, results):
+    import agents.mcp_transport
+    import mistralai.extra.run.context
+
+    FakeRunContext.instances = []
+    monkeypatch.setattr(mistralai.extra.run.context, "RunContext", lambda **kwargs: FakeRunContext(results, **kwargs))
+    monkeypatch.setattr(agents.mcp_transport, "mcp_client", lambda url: url)
+    params = PARAMS.model_copy(update={"mcp_server_url": "http://mcp"})
+    return _run(conversations, monkeypatch, params, run_async, resume_from="conv-old")
+
+# Test a retry answers the tool calls the previous attempt left pending, registering MCP once
+def test_resume_continues_pending_tool_calls(monkeypatch):
+    call = FunctionCallEntry(tool_call_id="call-1", name="get_stock_price", arguments="{}")
+    result = FunctionResultEntry(tool_call_id="call-1", result="1.0")
+    conversations = FakeRunConversations([MessageInputEntry(role="user", content=PARAMS.inputs), call])
+
+    _run_tools(conversations, monkeypatch, [result])
+
+    [run_ctx] = FakeRunContext.instances
+    assert run_ctx.kwargs["conversation_id"] == "conv-old"
+    assert "agent_id" not in run_ctx.kwargs
+    assert run_ctx.registered == 1
+    assert conversations.runs == [[result.model_dump(mode="json")]]
+
+# Test a retry starts over when the pending tool calls produce no results
+def test_resume_without_tool_results_starts_over(monkeypatch):
+    call = FunctionCallEntry(tool_call_id="call-1", name="get_stock_price", arguments="{}")
+    conversations = FakeRunConversations([MessageInputEntry(role="user", content=PARAMS.inputs), call])
+
+    _run_tools(conversations, monkeypatch, [])
+
+    assert conversations.runs == [PARAMS.inputs]
+    assert [run_ctx.registered for run_ctx in FakeRunContext.instances] == [1, 1]
+    # Runs never go through the shared agent, which would get the MCP tools added to it.
+    assert [run_ctx.kwargs.get("agent_id") for run_ctx in FakeRunContext.instances] == [None, None]
+    assert FakeRunContext.instances[1].kwargs["model"] == MODEL
+
+# Test pending tool calls
+def test_pending_function_calls():
+    call = FunctionCallEntry(tool_call_id="call-1", name="get_stock_price", arguments="{}")
+    answered = [call, FunctionResultEntry(tool_call_id="call-1", result="1.0")]
+
+    assert _pending_function_calls([MessageInputEntry(role="user", content="hi"), call]) == [call]
+    assert _pending_function_calls(answered) == []
+    assert _pending_function_calls([]) == []
+
+# Test progress is handed to the next attempt
+def test_previous_progress():
+    def env(attempt, details):
+        environment = ActivityEnvironment()
+        environment.info = dataclasses.replace(environment.info, attempt=attempt, heartbeat_details=details)
+        return environment
+
+    details = [{"stage": "run_async", "elapsed_seconds": 12.5, "conversation_id": "conv-1", "tool_results": 2}]
+    assert env(2, details).run(previous_progress, "run_async") == {"conversation_id": "conv-1", "tool_results": 2}
+    assert env(2, details).run(previous_progress, "start_conversation_async") == {}
+    assert env(1, []).run(previous_progress, "run_async") == {}
+
+# Test progress updates are heartbeated
+def test_progress_update_heartbeats():
+    environment = ActivityEnvironment()
+    environment.info = dataclasses.replace(environment.info, heartbeat_timeout=None)
+    beats = []
+    environment.on_heartbeat = lambda *details: beats.append(details[0])
+
+    async def call():
+        async with heartbeating("run_async") as progress:
+            progress.update(conversation_id="conv-1")
+
+    asyncio.run(environment.run(call))
+    assert beats[-1]["conversation_id"] == "conv-1"
+    assert beats[-1]["stage"] == "run_async"
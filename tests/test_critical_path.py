@@ -0,0 +1,94 @@
+from datetime import datetime, timedelta, timezone
+
+from temporalio.api.enums.v1 import EventType
+from temporalio.api.history.v1 import HistoryEvent
+from temporalio.converter import DataConverter
+
+from tasks.utils.critical_path import (
+    LOCAL_ACTIVITY_MARKER,
+    ActivityTiming,
+    activity_timings,
+    history_cost,
+    summarize_critical_path,
+)
+
+T0 = datetime(2025, 1, 1, tzinfo=timezone.utc)
+
+
+def at(seconds: float) -> datetime:
+    return T0 + timedelta(seconds=seconds)
+
+# Test summarize_critical_path
+def test_summarize_critical_path_picks_last_closing_activity_per_stage():
+    timings = [
+        ActivityTiming("1", "PLANNER", stage_id=4, scheduled=at(0), started=at(1), closed=at(11)),
+        ActivityTiming("2", "SEARCH", stage_id=10, scheduled=at(12), started=at(13), closed=at(20)),
+        ActivityTiming("3", "SEARCH", stage_id=10, scheduled=at(12), started=at(17), closed=at(30), attempts=2),
+    ]
+    summary = summarize_critical_path("wf", "completed", at(0), at(32), timings)
+
+    assert [stage.stage for stage in summary.stages] == ["PLANNER", "SEARCH x2"]
+    search = summary.stages[1]
+    assert search.critical_activity_id == "3"
+    assert search.queue_wait_seconds == 5
+    assert search.execution_seconds == 13
+    assert search.attempts == 2
+    assert search.max_queue_wait_seconds == 5
+    assert summary.queue_wait_seconds == 6
+    assert summary.execution_seconds == 23
+    assert summary.orchestration_seconds == 3
+    assert summary.total_seconds == 32
+
+def test_summarize_critical_path_running_activity_uses_close_time():
+    timings = [ActivityTiming("1", "WRITER", stage_id=4, scheduled=at(0))]
+    summary = summarize_critical_path("wf", "running", at(0), at(10), timings)
+    assert summary.stages[0].queue_wait_seconds == 10
+    assert summary.stages[0].execution_seconds == 0
+
+# Test activity_timings
+def _event(event_id, event_type, seconds, **attributes):
+    event = HistoryEvent(event_id=event_id, event_type=event_type, **attributes)
+    event.event_time.FromDatetime(at(seconds))
+    return event
+
+def test_activity_timings_from_history():
+    scheduled = _event(5, EventType.EVENT_TYPE_ACTIVITY_TASK_SCHEDULED, 1)
+    scheduled.activity_task_scheduled_event_attributes.activity_id = "1"
+    scheduled.activity_task_scheduled_event_attributes.activity_type.name = "start_conversation_activity"
+    scheduled.activity_task_scheduled_event_attributes.workflow_task_completed_event_id = 4
+    scheduled.user_metadata.summary.CopyFrom(DataConverter.default.payload_converter.to_payload("PLANNER"))
+    started = _event(6, EventType.EVENT_TYPE_ACTIVITY_TASK_STARTED, 3)
+    started.activity_task_started_event_attributes.scheduled_event_id = 5
+    started.activity_task_started_event_attributes.attempt = 1
+    completed = _event(7, EventType.EVENT_TYPE_ACTIVITY_TASK_COMPLETED, 9)
+    completed.activity_task_completed_event_attributes.scheduled_event_id = 5
+
+    [timing] = activity_timings([scheduled, started, completed])
+    assert timing.name == "PLANNER"
+    assert timing.stage_id == 4
+    assert (timing.started - timing.scheduled).total_seconds() == 2
+    assert (timing.closed - timing.started).total_seconds() == 6
+
+# Test history_cost
+def test_history_cost_counts_local_activity_markers():
+    marker = _event(5, EventType.EVENT_TYPE_MARKER_RECORDED, 1)
+    marker.marker_recorded_event_attributes.marker_name = LOCAL_ACTIVITY_MARKER
+    other_marker = _event(6, EventType.EVENT_TYPE_MARKER_RECORDED, 1)
+    other_marker.marker_recorded_event_attributes.marker_name = "core_patch"
+    timings = [
+        ActivityTiming("1", "SEARCH", 4, at(0), at(1), at(5)),
+        ActivityTiming("2", "SEARCH", 4, at(0), at(3), at(5)),
+        ActivityTiming("3", "SEARCH", 4, at(0)),
+    ]
+
+    cost = history_cost([marker, other_marker, marker], timings)
+    assert cost.events == 3
+    assert cost.local_activities == 2
+    assert cost.remote_activities == 3
+    assert cost.events_saved == 4
+    assert cost.queue_wait_saved_seconds == 4
+
+def test_history_cost_without_remote_activities():
+    cost = history_cost([], [])
+    assert cost.local_activities == 0
+    assert cost.queue_wait_saved_seconds == 0
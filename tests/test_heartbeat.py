@@ -0,0 +1,84 @@
+import asyncio
+import dataclasses
+from datetime import timedelta
+
+import pytest
+from temporalio.exceptions import ApplicationError
+from temporalio.testing import ActivityEnvironment
+
+from tasks.utils.heartbeat import heartbeating
+
+
+def _env(heartbeat_timeout: timedelta | None) -> ActivityEnvironment:
+    env = ActivityEnvironment()
+    env.info = dataclasses.replace(env.info, heartbeat_timeout=heartbeat_timeout)
+    return env
+
+
+async def _slow_call(seconds: float) -> str:
+    async with heartbeating("run_async"):
+        await asyncio.sleep(seconds)
+    return "done"
+
+# Test heartbeats while waiting
+def test_heartbeats_while_waiting():
+    env = _env(timedelta(seconds=0.15))
+    beats = []
+    env.on_heartbeat = lambda *details: beats.append(details[0])
+
+    assert asyncio.run(env.run(_slow_call, 0.3)) == "done"
+    assert len(beats) >= 3
+    assert beats[0]["stage"] == "run_async"
+
+# Test no heartbeat without a heartbeat timeout
+def test_no_heartbeat_without_timeout():
+    env = _env(None)
+    beats = []
+    env.on_heartbeat = lambda *details: beats.append(details)
+
+    assert asyncio.run(env.run(_slow_call, 0.05)) == "done"
+    assert beats == []
+
+# Test cancellation aborts the call
+def test_cancellation_aborts_call():
+    env = _env(timedelta(seconds=0.15))
+
+    async def run():
+        task = asyncio.create_task(env.run(_slow_call, 10))
+        await asyncio.sleep(0.1)
+        env.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await asyncio.wait_for(task, timeout=1)
+
+    asyncio.run(run())
+
+# Test a body without progress is abandoned
+def test_stalled_body_fails_early():
+    env = _env(timedelta(seconds=0.15))
+    beats = []
+    env.on_heartbeat = lambda *details: beats.append(details[0])
+
+    async def hung_call():
+        async with heartbeating("run_async", stall_seconds=0.2):
+            await asyncio.sleep(10)
+
+    async def run():
+        return await asyncio.wait_for(env.run(hung_call), timeout=2)
+
+    with pytest.raises(ApplicationError) as error:
+        asyncio.run(run())
+    assert error.value.type == "ActivityStalled"
+    assert not error.value.non_retryable
+    assert beats and all(beat["elapsed_seconds"] <= 0.2 for beat in beats)
+
+def test_progressing_body_outlives_stall_window():
+    env = _env(timedelta(seconds=0.15))
+
+    async def streaming_call():
+        async with heartbeating("run_async", stall_seconds=0.2) as progress:
+            for chars in range(8):
+                await asyncio.sleep(0.05)
+                progress.update(output_chars=chars)
+        return "done"
+
+    assert asyncio.run(env.run(streaming_call)) == "done"
@@ -0,0 +1,7 @@
+from benchmarks.import_time import WORKER_LAZY_MODULES, profile_import
+
+# Test worker imports
+def test_worker_imports_sdks_lazily():
+    profile = profile_import("tasks.worker")
+    eager = [name for name in WORKER_LAZY_MODULES if name in profile.loaded_modules]
+    assert eager == []
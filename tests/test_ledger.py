@@ -0,0 +1,66 @@
+import logging
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+import pytest
+
+from models.ledger import AgentRunResult, AgentUsage, UsageLedger, WorkflowBudget
+from models.structured_output import AnalysisSummary
+from tasks.workflows import financial_agents
+from tasks.workflows.financial_agents import FinancialResearchWorkflow
+
+
+def _ledger(budget: WorkflowBudget | None = None) -> UsageLedger:
+    ledger = UsageLedger(budget=budget)
+    ledger.record("PLANNER", AgentUsage(model="mistral-small-latest", input_tokens=1000, output_tokens=200, cost_usd=0.00016, seconds=2.))
+    ledger.record("SEARCH", AgentUsage(model="mistral-small-latest", seconds=0.01, cached=True))
+    ledger.record("SEARCH", AgentUsage(model="mistral-small-latest", input_tokens=500, output_tokens=100, cost_usd=0.00008, seconds=3.))
+    return ledger
+
+# Test ledger totals
+def test_ledger_totals():
+    ledger = _ledger()
+
+    assert (ledger.input_tokens, ledger.output_tokens) == (1500, 300)
+    assert ledger.cost_usd == pytest.approx(0.00024)
+    assert ledger.activity_seconds == pytest.approx(5.01)
+    assert ledger.entries[1].stage == "SEARCH" and ledger.entries[1].cached
+
+def test_ledger_totals_are_serialized():
+    dumped = _ledger().model_dump(mode="json")
+
+    assert dumped["input_tokens"] == 1500
+    assert UsageLedger.model_validate(dumped).output_tokens == 300
+
+# Test budgets
+def test_over_budget():
+    assert _ledger().over_budget(10_000.) is None
+    assert _ledger(WorkflowBudget(max_tokens=5000, max_seconds=60.)).over_budget(30.) is None
+    assert _ledger(WorkflowBudget(max_tokens=1800)).over_budget(30.) == "1800 tokens used of 1800"
+    assert _ledger(WorkflowBudget(max_seconds=60.)).over_budget(75.) == "75s elapsed of 60s"
+
+# Test the workflow records usage
+def test_workflow_output_records_usage():
+    workflow = FinancialResearchWorkflow()
+    usage = AgentUsage(model="mistral-small-latest", input_tokens=10, output_tokens=5)
+
+    up, down = AnalysisSummary(summary="up"), AnalysisSummary(summary="down")
+
+    assert workflow._output("ANALYST", AgentRunResult(output=up, usage=usage)) == up
+    # Results recorded in histories from before the ledger are the bare output.
+    assert workflow._output("ANALYST", AgentRunResult[AnalysisSummary].model_validate({"summary": "down"})) == down
+    assert [entry.stage for entry in workflow.ledger.entries] == ["ANALYST"]
+
+def test_workflow_skips_optional_stage_over_budget(monkeypatch):
+    started = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    fake = SimpleNamespace(now=lambda: started + timedelta(seconds=90), info=lambda: SimpleNamespace(start_time=started))
+    monkeypatch.setattr(financial_agents, "workflow", fake)
+    # workflow.logger only works inside a workflow.
+    monkeypatch.setattr(financial_agents, "logger", logging.getLogger(__name__))
+    workflow = FinancialResearchWorkflow()
+
+    workflow.ledger.budget = WorkflowBudget(max_seconds=120.)
+    assert not workflow._over_budget("verifier")
+    workflow.ledger.budget = WorkflowBudget(max_seconds=60.)
+    assert workflow._over_budget("verifier")
+    assert workflow.ledger.skipped == ["verifier: 90s elapsed of 60s"]
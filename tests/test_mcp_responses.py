@@ -0,0 +1,85 @@
+import asyncio
+import json
+
+import pandas as pd
+import pytest
+
+from mcp_server.responses import call_key, decode_cursor, encode_cursor, frame_records, paginate
+
+RECORDS = [{"Date": f"2025-01-{i % 28 + 1:02d}", "Close": 100. + i, "Volume": 1_000_000 + i} for i in range(500)]
+
+
+def _pages(records, key, max_bytes, summary=None):
+    pages, cursor = [], None
+    while True:
+        response = paginate(records, key, cursor, summary=summary, max_bytes=max_bytes)
+        pages.append((len(response.encode()), json.loads(response)))
+        cursor = pages[-1][1]["next_cursor"]
+        if cursor is None:
+            return pages
+
+# Test paginate
+def test_paginate_pages_through_all_records_within_budget():
+    key = call_key("tool", "NVDA")
+    pages = _pages(RECORDS, key, max_bytes=2000, summary={"rows": len(RECORDS)})
+
+    assert len(pages) > 1
+    assert all(size <= 2000 for size, _ in pages)
+    assert [item for _, page in pages for item in page["items"]] == RECORDS
+    assert pages[0][1]["summary"] == {"rows": 500}
+    assert all(page["summary"] is None for _, page in pages[1:])
+    assert all(page["total"] == 500 for _, page in pages)
+
+def test_paginate_small_result_in_one_page():
+    page = json.loads(paginate(RECORDS[:3], call_key("tool"), max_bytes=10_000))
+    assert page["items"] == RECORDS[:3]
+    assert page["next_cursor"] is None
+
+def test_paginate_returns_oversized_record_alone():
+    records = [{"text": "x" * 500}, {"text": "y"}]
+    pages = _pages(records, call_key("tool"), max_bytes=100)
+    assert [page["items"] for _, page in pages] == [[records[0]], [records[1]]]
+
+def test_cursor_is_bound_to_the_call():
+    cursor = encode_cursor(40, call_key("tool", "NVDA"))
+    assert decode_cursor(cursor, call_key("tool", "NVDA")) == 40
+    with pytest.raises(ValueError):
+        decode_cursor(cursor, call_key("tool", "AMD"))
+    with pytest.raises(ValueError):
+        paginate(RECORDS, call_key("tool"), cursor="not-a-cursor")
+
+# Test frame_records
+def test_frame_records_with_dates_and_missing_values():
+    frame = pd.DataFrame({"Close": [1.5, None]}, index=pd.DatetimeIndex(["2025-01-01", "2025-01-02"], name="Date"))
+    records = frame_records(frame)
+    assert records[0]["Date"].startswith("2025-01-01")
+    assert records[1]["Close"] is None
+
+# Test paginated tool
+def test_historical_prices_tool_is_paginated(monkeypatch):
+    import yfinance
+
+    from config import settings
+    from mcp_server.prices_analysis_server import get_historical_stock_prices
+
+    dates = pd.date_range("2000-01-01", periods=5000, freq="D", name="Date")
+    history = pd.DataFrame({"Open": 1.123456, "Close": [float(i + 1) for i in range(5000)], "Volume": 10}, index=dates)
+
+    class Ticker:
+        def __init__(self, symbol):
+            self.symbol = symbol
+
+        def history(self, period, interval):
+            return history
+
+    monkeypatch.setattr(yfinance, "Ticker", Ticker)
+    first = asyncio.run(get_historical_stock_prices("NVDA", period="max"))
+    page = json.loads(first)
+
+    assert len(first.encode()) <= settings.mcp_response_max_bytes
+    assert page["total"] == 5000
+    assert page["summary"]["last_close"] == 5000
+    assert page["items"][0]["Open"] == 1.1235
+    second = json.loads(asyncio.run(get_historical_stock_prices("NVDA", period="max", cursor=page["next_cursor"])))
+    assert second["offset"] == len(page["items"])
+    assert "Error" in asyncio.run(get_historical_stock_prices("AMD", period="max", cursor=page["next_cursor"]))
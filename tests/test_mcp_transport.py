@@ -0,0 +1,24 @@
+from fastapi.testclient import TestClient
+from mistralai.extra.mcp.sse import MCPClientSSE
+
+from agents.mcp_transport import MCPClientStreamableHTTP, is_streamable_http, mcp_client
+from mcp_server.financial_research_server import mcp
+
+# Test transport selection
+def test_transport_from_url():
+    assert is_streamable_http("http://localhost:9000/financials/mcp")
+    assert not is_streamable_http("http://localhost:9000/financials/sse")
+    assert isinstance(mcp_client("http://localhost:9000/prices/mcp"), MCPClientStreamableHTTP)
+    assert isinstance(mcp_client("http://localhost:9000/prices/sse"), MCPClientSSE)
+
+# Test stateless streamable HTTP endpoint
+def test_streamable_http_request_without_session():
+    # The server's own app runs its session manager in its lifespan; mcp_server.main does it for both servers.
+    with TestClient(mcp.streamable_http_app()) as client:
+        response = client.post(
+            "/mcp",
+            json={"jsonrpc": "2.0", "id": 1, "method": "prompts/get", "params": {"name": "planner_prompt"}},
+            headers={"Accept": "application/json, text/event-stream"},
+        )
+    assert response.status_code == 200
+    assert "financial research planner" in response.json()["result"]["messages"][0]["content"]["text"]
@@ -0,0 +1,79 @@
+import asyncio
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+from prometheus_client import REGISTRY
+
+from metrics import instrument_tool, metrics_registry, record_cache_lookup, record_llm_call
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def _sample(name, labels):
+    return REGISTRY.get_sample_value(name, labels) or 0.
+
+# Test record_llm_call
+def test_record_llm_call_tokens_and_latency():
+    labels = {"agent": "TestAgent", "model": "test-model"}
+    before_input = _sample("llm_tokens_total", {**labels, "direction": "input"})
+    before_count = _sample("llm_request_duration_seconds_count", {**labels, "operation": "start_conversation"})
+
+    record_llm_call("TestAgent", "test-model", "start_conversation", 1.2, input_tokens=100, output_tokens=20)
+
+    assert _sample("llm_tokens_total", {**labels, "direction": "input"}) == before_input + 100
+    assert _sample("llm_request_duration_seconds_count", {**labels, "operation": "start_conversation"}) == before_count + 1
+
+# Test record_cache_lookup
+def test_record_cache_lookup():
+    before = _sample("cache_requests_total", {"cache": "test", "result": "hit"})
+    record_cache_lookup("test", hit=True)
+    assert _sample("cache_requests_total", {"cache": "test", "result": "hit"}) == before + 1
+
+# Test instrument_tool
+def test_instrument_tool_records_latency_and_keeps_signature():
+    @instrument_tool("test-server")
+    async def lookup(symbol: str, period: str = "1mo") -> str:
+        return f"{symbol}:{period}"
+
+    labels = {"server": "test-server", "tool": "lookup", "status": "ok"}
+    before = _sample("mcp_tool_duration_seconds_count", labels)
+
+    assert asyncio.run(lookup("NVDA")) == "NVDA:1mo"
+    assert lookup.__name__ == "lookup"
+    assert _sample("mcp_tool_duration_seconds_count", labels) == before + 1
+
+def test_instrument_tool_counts_error_messages_as_errors():
+    @instrument_tool("test-server")
+    async def fetch(symbol: str) -> str:
+        return f"Error fetching current price for {symbol}: timeout"
+
+    errors = {"server": "test-server", "tool": "fetch", "status": "error"}
+    ok = {**errors, "status": "ok"}
+    before = _sample("mcp_tool_duration_seconds_count", errors)
+
+    assert asyncio.run(fetch("NVDA")).startswith("Error ")
+    assert _sample("mcp_tool_duration_seconds_count", errors) == before + 1
+    assert _sample("mcp_tool_duration_seconds_count", ok) == 0
+
+# Test metrics_registry
+def test_metrics_registry_aggregates_worker_processes(tmp_path, monkeypatch):
+    # Multiprocess mode is picked when prometheus_client is imported: record from separate processes.
+    env = {**os.environ, "PROMETHEUS_MULTIPROC_DIR": str(tmp_path), "PYTHONPATH": str(ROOT)}
+    worker = (
+        "from metrics import ADMISSION_PENDING, WORKFLOWS_STARTED, mark_process_dead\n"
+        "WORKFLOWS_STARTED.labels(workflow='multiprocess').inc()\n"
+        "ADMISSION_PENDING.set({pending})\n"
+    )
+    subprocess.run([sys.executable, "-c", worker.format(pending=3)], env=env, cwd=ROOT, check=True)
+    subprocess.run([sys.executable, "-c", worker.format(pending=4) + "mark_process_dead()"], env=env, cwd=ROOT, check=True)
+
+    monkeypatch.setenv("PROMETHEUS_MULTIPROC_DIR", str(tmp_path))
+    registry = metrics_registry()
+    assert registry.get_sample_value("workflows_started_total", {"workflow": "multiprocess"}) == 2
+    assert registry.get_sample_value("admission_pending_requests") == 3
+
+def test_metrics_registry_single_process(monkeypatch):
+    monkeypatch.delenv("PROMETHEUS_MULTIPROC_DIR", raising=False)
+    assert metrics_registry() is REGISTRY
@@ -0,0 +1,83 @@
+import asyncio
+from types import SimpleNamespace
+
+import httpx
+import pytest
+from mistralai import SDKError
+from pydantic import ValidationError
+
+from agents.model_router import escalation_model, estimate_cost, fallback_model, model_for, route
+from models.structured_output import AnalysisSummary
+
+AGENT = SimpleNamespace(name="FinancialSearchAgent", model=model_for("small"))
+
+
+def _sdk_error(status_code: int) -> SDKError:
+    request = httpx.Request("POST", "https://api.mistral.ai/v1/conversations")
+    return SDKError("API error occurred", httpx.Response(status_code, request=request))
+
+
+def _invalid_output() -> ValidationError:
+    try:
+        AnalysisSummary.model_validate_json("{}")
+    except ValidationError as e:
+        return e
+
+
+def _call(*outcomes):
+    """A fake conversation call returning (or raising) the given outcomes in turn, recording the models used."""
+    models = []
+    outcomes = list(outcomes)
+
+    async def call(model):
+        models.append(model)
+        outcome = outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+    return call, models
+
+# Test tiers
+def test_escalation_model():
+    assert escalation_model(model_for("small")) == model_for("medium")
+    assert escalation_model(model_for("medium")) == model_for("large")
+    assert escalation_model(model_for("large")) is None
+    assert escalation_model("unknown-model") is None
+
+def test_fallback_model():
+    assert fallback_model(model_for("medium")) == model_for("small")
+    assert fallback_model("unknown-model") is None
+
+def test_estimate_cost():
+    assert estimate_cost("mistral-small-latest", 1_000_000, 1_000_000) == pytest.approx(0.4)
+    assert estimate_cost("unknown-model", 10, 10) is None
+    assert estimate_cost("mistral-small-latest", None, 10) is None
+
+# Test route
+def test_route_uses_agent_model():
+    call, models = _call("ok")
+    assert asyncio.run(route(AGENT, call)) == "ok"
+    assert models == [None]
+
+def test_route_falls_back_on_rate_limit():
+    call, models = _call(_sdk_error(429), "ok")
+    assert asyncio.run(route(AGENT, call)) == "ok"
+    assert models == [None, fallback_model(AGENT.model)]
+
+def test_route_escalates_on_invalid_output():
+    call, models = _call(_invalid_output(), "ok")
+    assert asyncio.run(route(AGENT, call)) == "ok"
+    assert models == [None, model_for("medium")]
+
+def test_route_raises_other_errors():
+    call, models = _call(_sdk_error(500))
+    with pytest.raises(SDKError):
+        asyncio.run(route(AGENT, call))
+    assert models == [None]
+
+def test_route_reroutes_once():
+    call, models = _call(_sdk_error(429), _sdk_error(429))
+    with pytest.raises(SDKError):
+        asyncio.run(route(AGENT, call))
+    assert len(models) == 2
@@ -0,0 +1,76 @@
+import threading
+
+import logfire
+from mcp.client.session import ClientSession
+from mcp.server import Server
+from mcp.shared.session import BaseSession
+from opentelemetry.instrumentation.httpx import HTTPXClientInstrumentor
+from opentelemetry.sdk.trace import TracerProvider
+from opentelemetry.sdk.trace.export import BatchSpanProcessor, SpanExporter, SpanExportResult
+
+import observability
+from metrics import TELEMETRY_SPANS_DROPPED
+from observability import configure_logfire, count_dropped_spans, instrument_worker
+
+# Test configure_logfire
+def test_configure_logfire_ignores_later_service_names(monkeypatch):
+    calls = []
+    monkeypatch.setattr(observability, "_logfire", None)
+    monkeypatch.setattr(logfire, "configure", lambda **kwargs: calls.append(kwargs["service_name"]))
+    # configure_logfire passes the export queue size through the environment.
+    monkeypatch.setenv("OTEL_BSP_MAX_QUEUE_SIZE", "")
+    monkeypatch.setenv("OTEL_BSP_MAX_EXPORT_BATCH_SIZE", "")
+
+    assert configure_logfire("server") is logfire
+    assert configure_logfire("worker") is logfire
+    assert calls == ["server"]
+
+# Test instrument_worker
+def test_instrument_worker_traces_httpx_and_mcp(monkeypatch):
+    # Restore the MCP session methods that instrument_mcp patches.
+    for cls, name in ((BaseSession, "send_request"), (BaseSession, "send_notification"),
+                      (ClientSession, "_received_notification"), (ClientSession, "_received_request"),
+                      (Server, "_handle_request")):
+        monkeypatch.setattr(cls, name, getattr(cls, name))
+    send_request = BaseSession.send_request
+    local = logfire.configure(local=True, send_to_logfire=False, console=False)
+    monkeypatch.setattr(observability, "configure_logfire", lambda: local)
+
+    instrument_worker()
+    try:
+        assert HTTPXClientInstrumentor().is_instrumented_by_opentelemetry
+        assert BaseSession.send_request.__wrapped__ is send_request
+    finally:
+        HTTPXClientInstrumentor().uninstrument()
+
+
+class BlockingExporter(SpanExporter):
+    def __init__(self):
+        self.exporting = threading.Event()
+        self.release = threading.Event()
+
+    def export(self, spans):
+        self.exporting.set()
+        self.release.wait(5)
+        return SpanExportResult.SUCCESS
+
+# Test count_dropped_spans
+def test_full_export_queue_drops_are_counted():
+    exporter = BlockingExporter()
+    provider = TracerProvider()
+    provider.add_span_processor(BatchSpanProcessor(exporter, max_queue_size=2, max_export_batch_size=2))
+    assert count_dropped_spans(provider) == 1
+    assert count_dropped_spans(provider) == 0
+    tracer = provider.get_tracer(__name__)
+    dropped = TELEMETRY_SPANS_DROPPED._value.get()
+    try:
+        for name in ("a", "b"):
+            tracer.start_span(name).end()
+        # The exporter holds the first batch, the queue fills up with the next two spans.
+        assert exporter.exporting.wait(5)
+        for name in ("c", "d", "e", "f", "g"):
+            tracer.start_span(name).end()
+        assert TELEMETRY_SPANS_DROPPED._value.get() - dropped == 3
+    finally:
+        exporter.release.set()
+        provider.shutdown()
@@ -0,0 +1,32 @@
+import asyncio
+from pathlib import Path
+
+import pytest
+
+from benchmarks.replay import ReplayTiming, load_histories, new_replayer, regressions
+
+# Histories of completed runs, from before the patched workflow changes (baseline) and after
+# them (patched). Replaying them against the current workflow code fails on any
+# non-deterministic change, and on activity results the workflow can no longer decode.
+HISTORIES_DIR = Path(__file__).parent / "histories"
+HISTORIES = sorted(HISTORIES_DIR.glob("*.json"))
+
+
+@pytest.mark.parametrize(
+    "path",
+    HISTORIES or [pytest.param(None, marks=pytest.mark.skip(reason="no recorded histories in tests/histories"))],
+    ids=lambda path: path.stem if path else "none",
+)
+def test_replay_recorded_history(path):
+    history, = load_histories([str(path)])
+    asyncio.run(new_replayer().replay_workflow(history))
+
+# Test regressions
+def test_regressions():
+    timings = [
+        ReplayTiming("wf-1", events=120, search_items=5, history_bytes=1, mean_ms=130., min_ms=1.),
+        ReplayTiming("wf-2", events=120, search_items=5, history_bytes=1, mean_ms=90., min_ms=1.),
+        ReplayTiming("wf-new", events=120, search_items=5, history_bytes=1, mean_ms=500., min_ms=1.),
+    ]
+    baseline = [{"workflow_id": "wf-1", "mean_ms": 100.}, {"workflow_id": "wf-2", "mean_ms": 100.}]
+    assert regressions(timings, baseline, max_regression=0.25) == ["wf-1: 100.0 ms -> 130.0 ms"]
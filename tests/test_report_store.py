@@ -0,0 +1,112 @@
+import asyncio
+from datetime import datetime, timezone
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from api.reports import router
+from models.structured_output import (
+    AnalysisSummary,
+    FinancialReportData,
+    FinancialReportWorkflowOutput,
+    FinancialSearchPlan,
+    VerificationResult,
+)
+from tasks.utils.report_store import ReportStore, extract_tickers
+
+
+def _output(summary: str, markdown: str) -> FinancialReportWorkflowOutput:
+    return FinancialReportWorkflowOutput(
+        search_plan=FinancialSearchPlan(searches=[]),
+        report=FinancialReportData(short_summary=summary, markdown_report=markdown, follow_up_questions=[]),
+        verification=VerificationResult(verified=True, issues=""),
+        risk_analysis=AnalysisSummary(summary="Supply chain concentration in Taiwan."),
+        fundamentals_analysis=AnalysisSummary(summary="Services margin expansion."),
+        price_analysis=AnalysisSummary(summary="Shares up 12% over the quarter."),
+        search_results=[AnalysisSummary(summary="iPhone unit sales declined.")],
+    )
+
+
+def _store(tmp_path) -> ReportStore:
+    store = ReportStore(str(tmp_path / "reports.sqlite"))
+    store.save(
+        "wf-apple", "Analyze AAPL last quarter",
+        _output("Apple Inc. (AAPL) beat estimates.", "# Apple\nRevenue grew on services."),
+        datetime(2025, 1, 10, tzinfo=timezone.utc), tenant="acme",
+    )
+    store.save(
+        "wf-nvidia", "Write up NVIDIA's datacenter growth",
+        _output("NVIDIA (NVDA) datacenter revenue doubled.", "# NVIDIA\nDatacenter revenue doubled; $AMD lags."),
+        datetime(2025, 2, 10, tzinfo=timezone.utc),
+    )
+    return store
+
+# Test extract_tickers
+def test_extract_tickers():
+    assert extract_tickers("Analyze AAPL vs MSFT EPS", "Alphabet (GOOGL) and $META", "NYSE: IBM") == [
+        "AAPL", "GOOGL", "IBM", "META", "MSFT",
+    ]
+    assert extract_tickers("Write up Apple's quarter", "SEC filing by the CEO") == []
+
+# Test ReportStore
+def test_get_round_trips_the_report(tmp_path):
+    store = _store(tmp_path)
+    report = store.get("wf-apple")
+
+    assert report.query == "Analyze AAPL last quarter"
+    assert report.tenant == "acme"
+    assert report.tickers == ["AAPL"]
+    assert report.created_at == datetime(2025, 1, 10, tzinfo=timezone.utc)
+    assert report.output.report.markdown_report == "# Apple\nRevenue grew on services."
+    assert store.get("missing") is None
+
+def test_save_replaces_existing_report(tmp_path):
+    store = _store(tmp_path)
+    store.save("wf-apple", "Analyze MSFT", _output("Microsoft.", "Azure grew."), datetime(2025, 3, 1, tzinfo=timezone.utc))
+
+    assert store.get("wf-apple").tickers == ["MSFT"]
+    assert store.search(ticker="AAPL") == []
+    assert [hit.workflow_id for hit in store.search("azure")] == ["wf-apple"]
+    assert store.search("apple") == []
+
+def test_search_by_text_ticker_and_date(tmp_path):
+    store = _store(tmp_path)
+
+    assert [hit.workflow_id for hit in store.search()] == ["wf-nvidia", "wf-apple"]
+    [hit] = store.search("datacenter revenue")
+    assert hit.workflow_id == "wf-nvidia"
+    assert "**" in hit.snippet
+    assert [hit.workflow_id for hit in store.search("estimates")] == ["wf-apple"]
+    assert [hit.workflow_id for hit in store.search(ticker="amd")] == ["wf-nvidia"]
+    assert store.search("revenue", ticker="AAPL")[0].tickers == ["AAPL"]
+    assert [hit.workflow_id for hit in store.search(since=datetime(2025, 2, 1, tzinfo=timezone.utc))] == ["wf-nvidia"]
+    assert [hit.workflow_id for hit in store.search(until=datetime(2025, 2, 1))] == ["wf-apple"]
+    assert store.search('revenue" OR "x') == []
+
+def test_concurrent_saves_from_threads(tmp_path):
+    store = ReportStore(str(tmp_path / "reports.sqlite"))
+    created_at = datetime(2025, 1, 10, tzinfo=timezone.utc)
+
+    async def save_all():
+        await asyncio.gather(*[
+            asyncio.to_thread(store.save, f"wf-{i}", f"Analyze AAPL #{i}", _output("Apple.", "Services."), created_at)
+            for i in range(20)
+        ])
+
+    asyncio.run(save_all())
+    assert len(store.search(ticker="AAPL", limit=50)) == 20
+
+# Test reports API
+def test_reports_api(tmp_path):
+    app = FastAPI()
+    app.include_router(router, prefix="/reports")
+    app.state.report_store = _store(tmp_path)
+    client = TestClient(app)
+
+    assert client.get("/reports/wf-apple").json()["tickers"] == ["AAPL"]
+    assert client.get("/reports/missing").status_code == 404
+    hits = client.get("/reports/search", params={"q": "revenue", "ticker": "NVDA"}).json()
+    assert [hit["workflow_id"] for hit in hits] == ["wf-nvidia"]
+
+    app.state.report_store = None
+    assert client.get("/reports/wf-apple").status_code == 503
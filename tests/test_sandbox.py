@@ -0,0 +1,15 @@
+import asyncio
+
+from temporalio.workflow import _Definition
+
+from tasks.utils.common import workflow_runner
+from tasks.workflows.financial_agents import FinancialResearchWorkflow
+
+
+# Test the workflow passes the worker's sandbox validation
+def test_workflow_runs_in_tuned_sandbox():
+    async def prepare():
+        # Creates a sandboxed instance, as the worker does on start, and fails on restricted imports.
+        workflow_runner().prepare_workflow(_Definition.must_from_class(FinancialResearchWorkflow))
+
+    asyncio.run(prepare())
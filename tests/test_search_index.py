@@ -0,0 +1,64 @@
+from mcp_server.search_index import SearchIndex, tokenize
+from models.search import CorpusDocument
+
+DOCUMENTS = [
+    CorpusDocument(id="nvda-10q", title="NVDA 10-Q", text="Datacenter revenue grew 112% on strong GPU demand.", source="filings"),
+    CorpusDocument(id="aapl-call", title="AAPL earnings call", text="Services revenue reached a record; iPhone demand was stable.", source="transcripts"),
+    CorpusDocument(id="tsla-note", title="TSLA research", text="Margins compressed as price cuts offset delivery growth.", source="research"),
+]
+
+# Test tokenize
+def test_tokenize():
+    assert tokenize("The EPS was $1.25, up 12.4%") == ["eps", "1.25", "up", "12.4"]
+
+# Test search
+def test_search_ranks_matching_documents(tmp_path):
+    index = SearchIndex(tmp_path)
+    index.add(DOCUMENTS)
+
+    hits = index.search("datacenter GPU revenue")
+    assert [hit.id for hit in hits][:2] == ["nvda-10q", "aapl-call"]
+    assert hits[0].source == "filings"
+    assert "Datacenter revenue" in hits[0].snippet
+
+def test_search_without_matches(tmp_path):
+    index = SearchIndex(tmp_path)
+    index.add(DOCUMENTS)
+    assert index.search("cryptocurrency") == []
+    assert SearchIndex(tmp_path / "empty").search("revenue") == []
+
+# Test incremental ingestion
+def test_newer_document_replaces_older(tmp_path):
+    index = SearchIndex(tmp_path)
+    index.add(DOCUMENTS)
+    index.add([CorpusDocument(id="tsla-note", title="TSLA research", text="Energy storage deployments doubled.")])
+
+    assert len(index) == 3
+    assert index.search("margins") == []
+    assert [hit.id for hit in index.search("energy storage")] == ["tsla-note"]
+
+def test_refresh_sees_segments_from_other_processes(tmp_path):
+    reader = SearchIndex(tmp_path)
+    SearchIndex(tmp_path).add(DOCUMENTS)
+    reader.refresh()
+    assert [hit.id for hit in reader.search("iPhone")] == ["aapl-call"]
+
+def test_ingestion_keeps_segments_added_by_other_processes(tmp_path):
+    first, second = SearchIndex(tmp_path), SearchIndex(tmp_path)
+    first.add(DOCUMENTS[:1])
+    second.add(DOCUMENTS[1:2])  # second has not refreshed since first ingested
+    first.add(DOCUMENTS[2:])
+
+    reader = SearchIndex(tmp_path)
+    assert len(reader) == 3
+    assert sorted(hit.id for hit in reader.search("datacenter iPhone margins", limit=5)) == ["aapl-call", "nvda-10q", "tsla-note"]
+
+def test_concurrent_ingestion(tmp_path):
+    from concurrent.futures import ThreadPoolExecutor
+
+    def ingest(n):
+        return SearchIndex(tmp_path).add([CorpusDocument(id=f"doc-{n}", title=f"Doc {n}", text=f"revenue item{n}")])
+
+    with ThreadPoolExecutor(8) as pool:
+        assert sum(pool.map(ingest, range(16))) == 16
+    assert len(SearchIndex(tmp_path)) == 16
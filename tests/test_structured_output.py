@@ -9,6 +9,8 @@ from models.structured_output import (
     FinancialReportWorkflowOutput,
     RESPONSE_FORMAT_REGISTRY,
     _add_additional_properties_false,
+    compact_search_results,
+    dedupe_searches,
     get_mistral_response_format,
 )
 
@@ -210,3 +212,25 @@ def test_mistral_format_has_all_recursive_additional_properties():
         for def_name, def_schema in schema["$defs"].items():
             if def_schema.get("type") == "object":
                 assert def_schema["additionalProperties"] is False, f"{def_name} missing additionalProperties"
+
+# Test dedupe_searches
+def test_dedupe_searches_ignores_case_and_whitespace():
+    plan = FinancialSearchPlan(searches=[
+        FinancialSearchItem(reason="Reason 1", query="AAPL revenue 2024"),
+        FinancialSearchItem(reason="Reason 2", query="  aapl  Revenue 2024"),
+        FinancialSearchItem(reason="Reason 3", query=" "),
+        FinancialSearchItem(reason="Reason 4", query="AAPL margins"),
+    ])
+
+    assert [item.reason for item in dedupe_searches(plan).searches] == ["Reason 1", "Reason 4"]
+
+# Test compact_search_results
+def test_compact_search_results_drops_empty_and_repeated_summaries():
+    results = [
+        AnalysisSummary(summary="Revenue grew 5%."),
+        AnalysisSummary(summary=""),
+        AnalysisSummary(summary="revenue grew  5%."),
+        AnalysisSummary(summary="Margins fell."),
+    ]
+
+    assert [r.summary for r in compact_search_results(results)] == ["Revenue grew 5%.", "Margins fell."]
@@ -0,0 +1,80 @@
+import asyncio
+import json
+
+import pandas as pd
+
+from mcp_server.prices_analysis_server import price_summaries, resolve_ticker
+from mcp_server.symbols import Symbol, SymbolTable, get_symbol_table, normalize
+
+# Test normalize
+def test_normalize_drops_case_punctuation_and_legal_suffixes():
+    assert normalize("The Coca-Cola Company") == "coca cola"
+    assert normalize("Novo Nordisk A/S") == "novo nordisk"
+    assert normalize("Alphabet Inc. Class A") == "alphabet"
+    assert normalize("Procter & Gamble") == "procter and gamble"
+    assert normalize("McDonald's Corporation") == "mcdonalds"
+    assert normalize("The Group") == "the group"
+
+# Test SymbolTable
+def test_resolve_tickers_names_and_aliases():
+    table = get_symbol_table()
+
+    assert table.resolve("Nvidia")[0].ticker == "NVDA"
+    assert table.resolve("nvda")[0].match == "ticker"
+    assert table.resolve("$BRK.B")[0].ticker == "BRK-B"
+    assert table.resolve("Google")[0].ticker == "GOOGL"
+    assert table.resolve("Exxon Mobil Corp")[0].ticker == "XOM"
+
+def test_resolve_prefixes_and_misspellings():
+    table = get_symbol_table()
+
+    [nvidia] = table.resolve("nvid", limit=1)
+    assert (nvidia.ticker, nvidia.match) == ("NVDA", "prefix")
+    assert table.resolve("dynamics")[0].ticker == "GD"
+    for misspelling, ticker in [("Mircosoft", "MSFT"), ("Nvidea", "NVDA"), ("Berkshir Hathway", "BRK-B")]:
+        best = table.resolve(misspelling)[0]
+        assert (best.ticker, best.match) == (ticker, "fuzzy")
+        assert best.score < 1
+
+def test_resolve_ranks_by_score_then_table_order():
+    table = SymbolTable([
+        Symbol("BIG", "Acme Big Corp"),
+        Symbol("SML", "Acme Small Inc."),
+        Symbol("ACM", "Acme", aliases=["Acme Holdings"]),
+    ])
+
+    assert [match.ticker for match in table.resolve("acme")] == ["ACM", "BIG", "SML"]
+    assert [match.ticker for match in table.resolve("acme s", limit=1)] == ["SML"]
+    assert table.resolve("zzzz") == []
+    assert table.resolve("   ") == []
+
+def test_from_csv(tmp_path):
+    path = tmp_path / "symbols.csv"
+    path.write_text("ticker,name,exchange,aliases\nNVDA,NVIDIA Corporation,NASDAQ,Nvidia|GeForce\nXYZ,Block Inc.,,\n")
+    table = SymbolTable.from_csv(path)
+
+    assert len(table) == 2
+    assert table.resolve("geforce")[0].ticker == "NVDA"
+    assert table.resolve("block")[0].exchange is None
+
+# Test resolve_ticker tool
+def test_resolve_ticker_tool_returns_json():
+    candidates = json.loads(asyncio.run(resolve_ticker("Nvidia", limit=2)))
+    assert candidates[0]["ticker"] == "NVDA"
+    assert candidates[0]["score"] == 1
+
+# Test price_summaries
+def test_price_summaries_per_symbol():
+    dates = pd.date_range("2025-01-01", periods=3, freq="D")
+    history = pd.DataFrame(
+        {("NVDA", "Close"): [100., 120., 110.], ("AMD", "Close"): [None, None, None]},
+        index=dates,
+    )
+
+    nvda, amd, missing = price_summaries(history, ["NVDA", "AMD", "XXXX"])
+    assert nvda.last_close == 110
+    assert nvda.change_pct == 10
+    assert (nvda.high, nvda.low) == (120, 100)
+    assert (nvda.start, nvda.end) == ("2025-01-01", "2025-01-03")
+    assert amd.error == "No price data"
+    assert missing.error == "No price data"
@@ -0,0 +1,93 @@
+import hashlib
+
+import pytest
+
+from agents import telemetry
+from agents.telemetry import (
+    GenAIEvent,
+    cap_attribute,
+    get_telemetry_stats,
+    reset_telemetry_stats,
+    sampling_decision,
+)
+from config import settings
+from models.structured_output import AnalysisSummary
+
+
+@pytest.fixture(autouse=True)
+def clean_stats():
+    reset_telemetry_stats()
+    yield
+    reset_telemetry_stats()
+
+# Test cap_attribute
+def test_cap_attribute_small_value_unchanged():
+    value, truncation = cap_attribute("short", max_bytes=100)
+    assert value == "short"
+    assert truncation == {}
+
+def test_cap_attribute_scalar_unchanged():
+    value, truncation = cap_attribute(12345, max_bytes=1)
+    assert value == 12345
+    assert truncation == {}
+
+def test_cap_attribute_truncates_string_with_hash():
+    text = "x" * 1000
+    value, truncation = cap_attribute(text, max_bytes=100)
+    assert value == "x" * 100
+    assert truncation["bytes"] == 1000
+    assert truncation["sha256"] == hashlib.sha256(text.encode()).hexdigest()
+
+def test_cap_attribute_truncates_models():
+    outputs = [AnalysisSummary(summary="y" * 500) for _ in range(4)]
+    value, truncation = cap_attribute(outputs, max_bytes=64)
+    assert isinstance(value, str)
+    assert len(value.encode()) <= 64
+    assert truncation["bytes"] > 2000
+
+def test_cap_attribute_does_not_split_utf8():
+    value, truncation = cap_attribute("é" * 10, max_bytes=5)
+    assert value == "éé"
+    assert truncation["bytes"] == 20
+
+# Test sampling_decision
+def test_sampling_decision_keeps_errors():
+    assert sampling_decision(False, 0., ValueError()) == "error"
+
+def test_sampling_decision_keeps_slow_calls():
+    assert sampling_decision(False, settings.genai_telemetry_slow_call_seconds, None) == "slow"
+
+def test_sampling_decision_head():
+    assert sampling_decision(True, 0., None) == "head"
+    assert sampling_decision(False, 0., None) is None
+
+# Test GenAIEvent
+def test_event_sampled_out(monkeypatch):
+    monkeypatch.setattr(settings, "genai_telemetry_sample_rate", 0.)
+
+    GenAIEvent("Responses API", {"gen_ai.input.messages": "hello"}).emit()
+    stats = get_telemetry_stats()
+    assert stats["events_sampled_out"] == 1
+    assert stats["events_emitted"] == 0
+
+def test_event_error_always_emitted(monkeypatch):
+    monkeypatch.setattr(settings, "genai_telemetry_sample_rate", 0.)
+    sent = []
+    monkeypatch.setattr(telemetry, "_export", lambda message, attributes: sent.append(attributes))
+
+    event = GenAIEvent("Responses API", {"gen_ai.input.messages": "z" * 20000})
+    event.fail(RuntimeError("boom"))
+    event.emit()
+
+    assert get_telemetry_stats()["attributes_truncated"] == 1
+    assert sent[0]["gen_ai.telemetry.sampled_by"] == "error"
+    assert sent[0]["error.type"] == "RuntimeError"
+    assert sent[0]["gen_ai.input.messages.bytes"] == 20000
+
+def test_event_export_failure_does_not_raise(monkeypatch):
+    def export(message, attributes):
+        raise RuntimeError("exporter down")
+
+    monkeypatch.setattr(telemetry, "_export", export)
+    GenAIEvent("Responses API", {}).emit()
+    assert get_telemetry_stats()["events_emitted"] == 0
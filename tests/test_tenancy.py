@@ -0,0 +1,106 @@
+import pytest
+from pydantic import ValidationError
+from temporalio.exceptions import ApplicationError
+
+from config import settings
+from models.agents import QueryModel
+from tasks.utils.tenancy import (
+    DEFAULT_TENANT,
+    TenantLimiter,
+    new_workflow_id,
+    running_batch_workflows_query,
+    task_queue_for,
+    workflow_priority,
+)
+
+# Test QueryModel
+def test_query_model_defaults_to_interactive():
+    query = QueryModel(query="Analyze AAPL")
+    assert query.tenant is None
+    assert query.priority == "interactive"
+
+def test_query_model_rejects_tenant_with_dashes():
+    with pytest.raises(ValidationError):
+        QueryModel(query="Analyze AAPL", tenant="acme-corp")
+
+# Test lanes
+def test_task_queue_per_lane():
+    assert task_queue_for("interactive") == settings.task_queue_url
+    assert task_queue_for("batch") == settings.batch_task_queue
+
+def test_interactive_lane_goes_first():
+    interactive = workflow_priority("acme", "interactive")
+    batch = workflow_priority(None, "batch")
+    assert interactive.priority_key < batch.priority_key
+    assert interactive.fairness_key == "acme"
+    assert batch.fairness_key == DEFAULT_TENANT
+
+# Test workflow ids and quota query
+def test_running_batch_workflows_query_matches_tenant_workflow_ids():
+    workflow_id = new_workflow_id("acme")
+    query = running_batch_workflows_query("acme")
+    prefix = query.split("STARTS_WITH '")[1].rstrip("'")
+
+    assert workflow_id.startswith(prefix)
+    assert not new_workflow_id("acme_corp").startswith(prefix)
+    assert f"TaskQueue = '{settings.batch_task_queue}'" in query
+
+# Test TenantLimiter
+def test_tenant_limiter_caps_each_tenant_separately():
+    limiter = TenantLimiter(max_concurrent=2)
+    limiter.acquire("acme")
+    limiter.acquire("acme")
+
+    with pytest.raises(ApplicationError) as error:
+        limiter.acquire("acme")
+    assert error.value.type == "TenantQuotaExceeded"
+    assert not error.value.non_retryable
+    assert error.value.next_retry_delay.total_seconds() == settings.tenant_quota_retry_seconds
+
+    limiter.acquire("globex")
+    limiter.release("acme")
+    limiter.acquire("acme")
+    assert limiter.in_flight("acme") == 2
+
+def test_tenant_limiter_shares_default_tenant():
+    limiter = TenantLimiter(max_concurrent=1)
+    limiter.acquire(None)
+    with pytest.raises(ApplicationError):
+        limiter.acquire(DEFAULT_TENANT)
+    limiter.release(None)
+    assert limiter.in_flight(None) == 0
+
+# Test quota in LLM activities
+def test_batch_llm_activity_over_quota_fails_fast(monkeypatch):
+    import asyncio
+    import dataclasses
+
+    from temporalio.testing import ActivityEnvironment
+
+    from models.agents import AgentRunInputModel
+    from tasks.activities import financial_agents
+    from tasks.utils import tenancy
+
+    calls = []
+
+    async def start_conversation_async(params, **progress):
+        calls.append(params.tenant)
+        return {"summary": "ok"}
+
+    monkeypatch.setattr(financial_agents, "start_conversation_async", start_conversation_async)
+    monkeypatch.setattr(tenancy, "_limiter", TenantLimiter(max_concurrent=1))
+    params = AgentRunInputModel(id="agent", inputs="AAPL", tenant="acme")
+    batch = ActivityEnvironment()
+    batch.info = dataclasses.replace(batch.info, task_queue=settings.batch_task_queue)
+    interactive = ActivityEnvironment()
+    interactive.info = dataclasses.replace(interactive.info, task_queue=settings.task_queue_url)
+
+    tenancy.get_tenant_limiter().acquire("acme")
+    with pytest.raises(ApplicationError):
+        asyncio.run(batch.run(financial_agents.start_conversation_activity, params))
+    assert asyncio.run(interactive.run(financial_agents.start_conversation_activity, params)) == {"summary": "ok"}
+
+    tenancy.get_tenant_limiter().release("acme")
+    assert asyncio.run(batch.run(financial_agents.start_conversation_activity, params)) == {"summary": "ok"}
+    assert calls == ["acme", "acme"]
+    assert tenancy.get_tenant_limiter().in_flight("acme") == 0
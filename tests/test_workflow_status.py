@@ -0,0 +1,118 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+from temporalio.client import WorkflowExecutionStatus
+from temporalio.service import RPCError, RPCStatusCode
+
+from tasks.utils.workflow_status import (
+    decode_page_token,
+    encode_page_token,
+    list_workflow_statuses,
+    visibility_query,
+)
+
+STARTED = datetime(2026, 1, 5, 9, 0, tzinfo=timezone.utc)
+
+
+class FakeExecution:
+    def __init__(self, workflow_id, status, stage, closed_after=None):
+        self.id = workflow_id
+        self.run_id = f"{workflow_id}-run"
+        self.status = status
+        self.start_time = STARTED
+        self.close_time = STARTED + timedelta(seconds=closed_after) if closed_after else None
+        self._memo = {"stage": stage, "query": f"Analyze {workflow_id}"}
+
+    async def memo(self):
+        return self._memo
+
+
+class FakeIterator:
+    def __init__(self, page, next_page_token):
+        self.current_page = []
+        self.next_page_token = None
+        self._page, self._next = page, next_page_token
+
+    async def fetch_next_page(self):
+        self.current_page, self.next_page_token = self._page, self._next
+
+
+class FakeHandle:
+    def __init__(self, client, workflow_id):
+        self.client, self.workflow_id = client, workflow_id
+
+    async def result(self):
+        self.client.running += 1
+        self.client.max_running = max(self.client.max_running, self.client.running)
+        await asyncio.sleep(0.01)
+        self.client.running -= 1
+        if self.workflow_id in self.client.failing:
+            raise RPCError("history not found", RPCStatusCode.NOT_FOUND, b"")
+        return self.client.results.get(self.workflow_id)
+
+
+class FakeClient:
+    def __init__(self, page, next_page_token=None):
+        self.page, self.next_page_token = page, next_page_token
+        self.list_calls, self.result_ids = [], []
+        self.running = self.max_running = 0
+        self.results, self.failing = {}, set()
+
+    def list_workflows(self, query, page_size, next_page_token):
+        self.list_calls.append((query, page_size, next_page_token))
+        return FakeIterator(self.page, self.next_page_token)
+
+    def get_workflow_handle(self, workflow_id):
+        self.result_ids.append(workflow_id)
+        return FakeHandle(self, workflow_id)
+
+# Test visibility query and page tokens
+def test_visibility_query():
+    assert visibility_query("FinancialResearchWorkflow") == "WorkflowType = 'FinancialResearchWorkflow'"
+    assert visibility_query("FinancialResearchWorkflow", "cancelled").endswith("AND ExecutionStatus = 'Canceled'")
+
+def test_page_token_round_trip():
+    assert decode_page_token(encode_page_token(b"\x00\xffpage")) == b"\x00\xffpage"
+    assert encode_page_token(None) is None and decode_page_token(None) is None
+
+# Test list_workflow_statuses
+def test_lists_page_from_visibility():
+    client = FakeClient([
+        FakeExecution("wf-1", WorkflowExecutionStatus.RUNNING, "search"),
+        FakeExecution("wf-2", WorkflowExecutionStatus.COMPLETED, "completed", closed_after=90),
+    ], next_page_token=b"next")
+
+    page = asyncio.run(list_workflow_statuses(client, "FinancialResearchWorkflow", page_size=2, next_page_token=encode_page_token(b"prev")))
+
+    assert client.list_calls == [("WorkflowType = 'FinancialResearchWorkflow'", 2, b"prev")]
+    assert [(w.workflow_id, w.status, w.stage) for w in page.workflows] == [("wf-1", "running", "search"), ("wf-2", "completed", "completed")]
+    assert page.workflows[1].duration_seconds == 90
+    assert page.workflows[0].query == "Analyze wf-1"
+    assert decode_page_token(page.next_page_token) == b"next"
+    assert client.result_ids == []
+
+def test_fetches_only_requested_completed_results_with_bound():
+    client = FakeClient(
+        [FakeExecution(f"wf-{i}", WorkflowExecutionStatus.COMPLETED, "completed", closed_after=60) for i in range(6)]
+        + [FakeExecution("wf-running", WorkflowExecutionStatus.RUNNING, "writer")]
+    )
+    requested = ["wf-0", "wf-1", "wf-2", "wf-3", "wf-running", "wf-unknown"]
+
+    asyncio.run(list_workflow_statuses(client, "FinancialResearchWorkflow", include_results=requested, results_concurrency=2))
+
+    assert sorted(client.result_ids) == ["wf-0", "wf-1", "wf-2", "wf-3"]
+    assert client.max_running == 2
+
+def test_failed_result_fetch_only_marks_its_entry():
+    client = FakeClient([
+        FakeExecution(f"wf-{i}", WorkflowExecutionStatus.COMPLETED, "completed", closed_after=60) for i in range(3)
+    ])
+    client.failing = {"wf-1"}
+    client.results = {"wf-2": {"unexpected": "shape"}}
+
+    page = asyncio.run(list_workflow_statuses(client, "FinancialResearchWorkflow", include_results=["wf-0", "wf-1", "wf-2"]))
+
+    assert page.workflows[0].result_error is None
+    assert page.workflows[1].result_error == "RPCError: history not found"
+    assert page.workflows[2].result_error.startswith("Invalid result")
+    assert all(w.result is None for w in page.workflows)